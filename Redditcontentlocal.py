@@ -10,28 +10,54 @@
 # with your own flavors. Have fun!
 # ---------------------------------------------------------------
 
-import praw  # Reddit API wrapper - fetches posts/comments
-from moviepy.editor import *  # MoviePy - for video/audio editing
-from google.cloud import texttospeech  # Google TTS - for natural-sounding voices
+import time
+_ENGINE_LOAD_START = time.perf_counter()
 import os
-from PIL import Image  # For future image background support (not used now)
 import random
-from faster_whisper import WhisperModel  # For word-level subtitle timing
 import unicodedata
-from pydub import AudioSegment  # For audio trimming
-from pydub.silence import detect_nonsilent
 import re
 from dotenv import load_dotenv  # For keeping secrets out of your codebase
-from openai import OpenAI  # OpenAI API for rewriting content
 import gc
-import time
+import json
+import shutil
+import sys
+import math
+import subprocess
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing
+# Heavy libraries are imported on first use (see lazy_imports.py):
+#   praw (Reddit), moviepy.editor (video/audio editing), faster_whisper
+#   (word timing), pydub (audio trimming), openai (rewriting), and our
+#   NumPy modules: audio_mixer (soundtrack mix + music ducking),
+#   energy_aligner (Whisper-free word timing) and overlay_cache (overlay
+#   stack blended once per word, not per frame)
+import lazy_imports
+import telemetry  # Per-stage timing/resource logs
+import job_manifest  # Checkpoints so crashed jobs resume
+import asset_pool  # Backgrounds/overlay/music decoded once per batch
+import word_aligner  # Maps recognized words onto the known script
+import tts_backends  # Google TTS (natural-sounding voices) or a local engine
+import background_index  # Durations + keyframes of the background videos
+import job_queue  # Shared queue so several machines can work one batch
+import rate_limits  # Token buckets + adaptive concurrency for Reddit/OpenAI/TTS
+import stage_profiler  # Sampling profiles of chosen stages, on demand
+import title_index  # MinHash/LSH index to spot reworded reposts of used threads
+import subreddit_yield  # Per-subreddit hit rates; favours subreddits that become videos
+import multi_output  # Several platform variants from one composited frame stream
+from duration_planner import (  # Pre-synthesis length estimates
+    TRANSITION_DURATION_ESTIMATE, calibration_key, chars_per_second, estimate_duration,
+    load_calibration, plan_comments, record_synthesis, save_calibration
+)
+try:
+    import msgpack  # Optional: compact binary timelines (TIMELINE_FORMAT = "msgpack")
+except ImportError:
+    msgpack = None
 
 # ---------------------------------------------------------------
 # Load environment variables (keep your API keys safe, kids!)
 # ---------------------------------------------------------------
 load_dotenv()
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
-openAI.api_key = OPENAI_API_KEY
 
 # ---------------------------------------------------------------
 # Set up paths and constants
@@ -42,9 +68,36 @@ REDDIT_CLIENT_SECRET = "rkK0OEceurFnL6xNMNEeN_XZFK1lJg"
 REDDIT_USER_AGENT = "script:ContentMaker:v1.0 (by u/veexer)"
 SUBREDDIT = "showerthoughts"
 VIDEO_WIDTH, VIDEO_HEIGHT = 1080, 1920  # TikTok/Shorts aspect ratio
-BACKGROUND_VIDEO_CHOICES = ["MCPARKOUR.mp4", "MCPARKOUR1.mp4"]
+BACKGROUND_VIDEO_CHOICES = [
+    "MCPARKOUR.mp4", "MCPARKOUR1.mp4", "MCPARKOUR2.mp4", "MCPARKOUR3.mp4",
+    "MCPARKOUR4.mp4", "MCPARKOUR5.mp4", "MCPARKOUR6.mp4", "SSbackground.mp4", "SSBackground2.mp4"
+]
+ADDITIONAL_BG_CHOICES = ["add1.mp4", "add2.mp4", "add3.mp4", "add4.mp4"]
 BACKGROUND_MUSIC_PATH = "Charm - Anno Domini Beats.mp3"
+TRANSITION_SOUND_PATH = r"C:\Users\veexe\Documents\code\EDITING\transition.mp3"
+TRANSITION_FAST_PATH = r"C:\Users\veexe\Documents\code\EDITING\transition_fast.mp3"
+FOLLOW_OVERLAY_PATH = "comments_of_gold.mp4"
 USED_THREADS_FILE = "used_threads.txt"
+# Skip threads whose title is at least this similar (Jaccard over words and
+# word pairs, 0-1) to one we've used already; None matches exact titles only
+NEAR_DUPLICATE_THRESHOLD = 0.75
+
+# Polish translations for subreddit names
+SUBREDDIT_PL_TRANSLATIONS = {
+    "AskReddit": "ZapytajReddita",
+    "AskMen": "ZapytajMężczyzn",
+    "AskWomen": "ZapytajKobiety",
+    "RelationshipAdvice": "PoradyZwiązkowe",
+    "confession": "Wyznania",
+    "relationships": "Związki",
+    "teenagers": "Nastolatkowie",
+    "NoStupidQuestions": "NieMaGłupichPytań",
+    "TrueOffMyChest": "KamieńZSerca",
+    "UnpopularOpinion": "NiepopularnaOpinia",
+    "TooAfraidToAsk": "StrachZapytać",
+    "WouldYouRather": "CoWolałbyś",
+    "showerthoughts": "MyśliSpodPrysznica"
+}
 
 # ---------------------------------------------------------------
 # Audio settings (tweak for your vibe)
@@ -55,6 +108,14 @@ TRANSITION_AUDIO_SPEED = 1.0
 TRANSITION_VOLUME = 0.6
 BG_MUSIC_VOLUME = 0.1
 
+# Learned TTS speaking rates, used to plan videos before synthesizing
+TTS_CALIBRATION = load_calibration()
+
+URL_OR_FILE_PATTERN = re.compile(
+    r"(https?://|www\.|\.jpg|\.jpeg|\.png|\.gif|\.bmp|\.mp4|\.avi|\.mov|\.webm|\.pdf|\.doc|\.xls|\.ppt|\.zip|\.rar|\.7z|\.tar|\.gz|imgur\.com|i\.redd\.it|pic\.twitter\.com)",
+    re.IGNORECASE
+)
+
 # ---------------------------------------------------------------
 # Utility: Remove temp files safely (Windows can be stubborn!)
 # ---------------------------------------------------------------
@@ -76,170 +137,326 @@ def safe_remove(filepath, retries=5, delay=0.5):
 # ---------------------------------------------------------------
 # Fetch Reddit Content
 # ---------------------------------------------------------------
+def used_thread_files():
+    """The shared history file plus every language profile's legacy one."""
+    paths = [USED_THREADS_FILE] + [p["used_threads_file"] for p in LANGUAGE_PROFILES.values()]
+    return list(dict.fromkeys(paths))
+
 def load_used_threads():
-    """Load titles of threads already used, so we don't repeat content."""
-    if not os.path.exists(USED_THREADS_FILE):
-        return set()
-    with open(USED_THREADS_FILE, "r", encoding="utf-8") as f:
-        return set(line.strip() for line in f.readlines())
+    """
+    Load titles of threads already used, so we don't repeat content.
+    Reads the shared file plus every language profile's legacy history.
+    """
+    used = set()
+    for path in used_thread_files():
+        if not os.path.exists(path):
+            continue
+        with open(path, "r", encoding="utf-8") as f:
+            used.update(line.strip() for line in f.readlines())
+    return used
+
+_TITLE_INDEX = None
+
+def used_title_index():
+    """The near-duplicate index over used titles, caught up with the history files."""
+    global _TITLE_INDEX
+    if _TITLE_INDEX is None:
+        _TITLE_INDEX = title_index.open_index(used_thread_files())
+    elif _TITLE_INDEX.sync(used_thread_files()) or _TITLE_INDEX.dirty:
+        _TITLE_INDEX.save()
+    return _TITLE_INDEX
+
+def near_duplicate_of(title, index=None):
+    """(used title, similarity) if `title` is a near-duplicate of a used thread, else None."""
+    if not NEAR_DUPLICATE_THRESHOLD:
+        return None
+    return (index or used_title_index()).query(title, NEAR_DUPLICATE_THRESHOLD)
 
 def save_used_thread(title):
     """Mark a thread as used by saving its title."""
     with open(USED_THREADS_FILE, "a", encoding="utf-8") as f:
         f.write(title.strip() + "\n")
 
-def fetch_reddit_post():
+SUBREDDIT_CHOICES = [
+    "showerthoughts", "AskReddit", "AskMen", "AskWomen", "RelationshipAdvice",
+    "confession", "relationships", "teenagers", "NoStupidQuestions",
+    "TrueOffMyChest", "UnpopularOpinion", "TooAfraidToAsk", "WouldYouRather"
+]
+# Pick subreddits by their track record (see subreddit_yield.py); False = uniformly at random
+ADAPTIVE_SUBREDDITS = True
+
+def title_has_image(title):
+    """Detect if the title is likely an image/link post."""
+    title_lower = title.lower()
+    image_keywords = ['.jpg', '.jpeg', '.png', '.gif', 'imgur.com', 'i.redd.it', 'http', 'https', 'pic.twitter.com']
+    return any(keyword in title_lower for keyword in image_keywords)
+
+def pick_top_post(posts, used_threads, index=None):
+    """
+    Pick the first post we haven't used, preferring ones that aren't
+    just an image/link. With an `index` (see used_title_index), reworded
+    reposts of used threads count as used too.
+    Returns None if every post was used before.
+    """
+    unused = []
+    for post in posts:
+        if post.title.strip() in used_threads:
+            continue
+        match = near_duplicate_of(post.title, index) if index is not None else None
+        if match:
+            print(f"Skipping near-duplicate ({match[1]:.0%} similar) of: {match[0]}")
+            continue
+        unused.append(post)
+    # Try to find a post that isn't just an image/link
+    for post in unused:
+        if not title_has_image(post.title):
+            return post
+    # If all have images/links, just pick an unused one
+    return unused[0] if unused else None
+
+def collect_top_comments(top_post, n=7, max_comment_len=250):
+    """
+    Gather the best `n` comments as "author: body" strings, adding each
+    comment's parent first so replies keep their context.
+    Returns None if the post's comment list can't be retrieved.
+    """
+    # First access of .comments loads the thread from Reddit
+    if not hasattr(rate_limits.call("reddit", lambda: top_post.comments), 'list'):
+        return None
+    comment_map = {}
+    parent_map = {}
+    rate_limits.call("reddit", top_post.comments.replace_more, limit=0)
+    # "Load more" stubs have no body; checked by name so stand-in threads don't need praw
+    all_comments = [
+        c for c in top_post.comments.list()
+        if type(c).__name__ != "MoreComments"
+        and c.body
+        and not c.stickied
+        and len(c.body) < max_comment_len
+    ]
+    all_comments.sort(key=lambda c: getattr(c, 'score', 0), reverse=True)
+    top_comments_pool = all_comments[:25]
+    # Build maps for parent-child relationships
+    for c in top_comments_pool:
+        cid = c.id
+        parent_id = c.parent_id.split('_')[-1] if hasattr(c, 'parent_id') else None
+        comment_map[cid] = c
+        parent_map[cid] = parent_id
+
+    # Helper to recursively add parent before child
+    def add_with_parents(cid, added, result):
+        pid = parent_map.get(cid)
+        if pid and pid in comment_map and pid not in added:
+            add_with_parents(pid, added, result)
+        if cid not in added:
+            c = comment_map[cid]
+            author = c.author.name if c.author else '[deleted]'
+            result.append(f"{author}: {c.body}")
+            added.add(cid)
+
+    added = set()
+    result = []
+    for c in top_comments_pool:
+        add_with_parents(c.id, added, result)
+        if len(result) >= n:
+            break
+    return result[:n]
+
+_REDDIT_CLIENT = None
+
+def reddit_client():
+    """One Reddit client per process."""
+    global _REDDIT_CLIENT
+    if _REDDIT_CLIENT is None:
+        _REDDIT_CLIENT = lazy_imports.load("praw").Reddit(
+            client_id=REDDIT_CLIENT_ID,
+            client_secret=REDDIT_CLIENT_SECRET,
+            user_agent=REDDIT_USER_AGENT
+        )
+    return _REDDIT_CLIENT
+
+def fetch_thread_by_id(thread_id, reddit=None):
+    """
+    Fetch one specific thread (e.g. submitted to the daemon) and its best
+    comments. Returns: title, selftext, comments, subreddit_name
+    """
+    post = (reddit or reddit_client()).submission(id=thread_id)
+    rate_limits.call("reddit", lambda: post.title)  # Submissions load on first attribute access
+    comments = collect_top_comments(post, n=7, max_comment_len=250) or []
+    return post.title, post.selftext, comments, post.subreddit.display_name
+
+def fetch_reddit_post(profiles=None, reddit=None, exclude_titles=None, record_yield=True):
     """
     Fetch a top Reddit post and its best comments.
-    Avoids posts with images/links in the title.
+    Avoids posts with images/links in the title, and threads that are too
+    short to fill MIN_VIDEO_DURATION for any of `profiles` (checked before
+    we spend an OpenAI call on them).
+    Pass `reddit` to use an existing client (or an offline stand-in), and
+    `exclude_titles` to also skip threads taken elsewhere (e.g. by other
+    queue workers). Pass record_yield=False for a look that shouldn't
+    count towards the subreddit's yield (nothing will be rendered).
     Returns: title, selftext, comments, subreddit_name
     """
     N = 7  # Number of comments you want in your video
     MAX_COMMENT_LEN = 250
-    used_threads = load_used_threads()
-    reddit = praw.Reddit(
-        client_id=REDDIT_CLIENT_ID,
-        client_secret=REDDIT_CLIENT_SECRET,
-        user_agent=REDDIT_USER_AGENT
-    )
-    SUBREDDIT_CHOICES = [
-        "showerthoughts", "AskReddit", "AskMen", "AskWomen", "RelationshipAdvice",
-        "confession", "relationships", "teenagers", "NoStupidQuestions",
-        "TrueOffMyChest", "UnpopularOpinion", "TooAfraidToAsk", "WouldYouRather"
-    ]
-    subreddit_name = random.choice(SUBREDDIT_CHOICES)
+    used_threads = load_used_threads() | set(exclude_titles or ())
+    reddit = reddit or reddit_client()
+    if ADAPTIVE_SUBREDDITS:
+        subreddit_name = subreddit_yield.choose(SUBREDDIT_CHOICES)
+    else:
+        subreddit_name = random.choice(SUBREDDIT_CHOICES)
     print(f"Fetching from subreddit: r/{subreddit_name}")
+    note_yield = subreddit_yield.record if record_yield else (lambda *args, **kwargs: None)
 
-    posts = list(reddit.subreddit(subreddit_name).top(time_filter="week", limit=20))
+    posts = rate_limits.call("reddit", lambda: list(reddit.subreddit(subreddit_name).top(time_filter="week", limit=20)))
+    note_yield(subreddit_name, attempts=1, candidates=len(posts))
     if not posts:
         print("No posts found.")
+        note_yield(subreddit_name, rejection="no_posts")
         return None, None, [], subreddit_name
 
-    def title_has_image(title):
-        """Detect if the title is likely an image/link post."""
-        title_lower = title.lower()
-        image_keywords = ['.jpg', '.jpeg', '.png', '.gif', 'imgur.com', 'i.redd.it', 'http', 'https', 'pic.twitter.com']
-        return any(keyword in title_lower for keyword in image_keywords)
-
-    # Try to find a post we haven't used and that isn't just an image/link
-    for post in posts:
-        if post.title.strip() not in used_threads and not title_has_image(post.title):
-            top_post = post
-            break
-    else:
-        # If all have images/links, just pick an unused one
-        for post in posts:
-            if post.title.strip() not in used_threads:
-                top_post = post
-                break
-        else:
-            print("No new posts found that haven't been used before.")
-            return None, None, [], subreddit_name
+    top_post = pick_top_post(posts, used_threads, used_title_index() if NEAR_DUPLICATE_THRESHOLD else None)
+    if top_post is None:
+        print("No new posts found that haven't been used before.")
+        note_yield(subreddit_name, rejection="all_used")
+        return None, None, [], subreddit_name
 
     # Gather top comments, preserving parent-child relationships for context
-    comments = []
-    comment_map = {}
-    parent_map = {}
-    if hasattr(top_post.comments, 'list'):
-        top_post.comments.replace_more(limit=0)
-        all_comments = [
-            c for c in top_post.comments.list()
-            if isinstance(c, praw.models.Comment)
-            and c.body
-            and not c.stickied
-            and len(c.body) < MAX_COMMENT_LEN
-        ]
-        all_comments.sort(key=lambda c: getattr(c, 'score', 0), reverse=True)
-        top_comments_pool = all_comments[:25]
-        # Build maps for parent-child relationships
-        for c in top_comments_pool:
-            cid = c.id
-            parent_id = c.parent_id.split('_')[-1] if hasattr(c, 'parent_id') else None
-            comment_map[cid] = c
-            parent_map[cid] = parent_id
-
-        # Helper to recursively add parent before child
-        def add_with_parents(cid, added, result):
-            pid = parent_map.get(cid)
-            if pid and pid in comment_map and pid not in added:
-                add_with_parents(pid, added, result)
-            if cid not in added:
-                c = comment_map[cid]
-                author = c.author.name if c.author else '[deleted]'
-                result.append(f"{author}: {c.body}")
-                added.add(cid)
-
-        added = set()
-        result = []
-        for c in top_comments_pool:
-            add_with_parents(c.id, added, result)
-            if len(result) >= N:
-                break
-        comments = result[:N]
-        if not comments:
-            print("Not enough comments found. Skipping thread.")
-            save_used_thread(top_post.title)  # Save original title if skipping!
-            return None, None, [], subreddit_name
-    else:
+    comments = collect_top_comments(top_post, n=N, max_comment_len=MAX_COMMENT_LEN)
+    if comments is None:
         print("Could not retrieve comment list.")
         save_used_thread(top_post.title)  # Save original title if skipping!
+        note_yield(subreddit_name, rejection="no_comment_list")
+        return None, None, [], subreddit_name
+    if not comments:
+        print("Not enough comments found. Skipping thread.")
+        save_used_thread(top_post.title)  # Save original title if skipping!
+        note_yield(subreddit_name, rejection="not_enough_comments")
+        return None, None, [], subreddit_name
+    if not thread_can_fill_video(top_post.title, top_post.selftext, comments, profiles):
+        print("Thread is too short to reach the minimum video length. Skipping thread.")
+        save_used_thread(top_post.title)  # Save original title if skipping!
+        note_yield(subreddit_name, rejection="too_short")
         return None, None, [], subreddit_name
 
     return top_post.title, top_post.selftext, comments, subreddit_name
 
 # ---------------------------------------------------------------
-# TTS Generation (Google Cloud TTS)
+# TTS Generation (Google Cloud TTS, or a local engine)
 # ---------------------------------------------------------------
-def text_to_speech_gtts(text, filename):
+def text_to_speech_gtts(text, filename, profile=None):
     """
-    Generate TTS using Google Cloud TTS with a natural US English WaveNet voice.
-    You can swap this out for ElevenLabs, Coqui, or your favorite TTS!
+    Generate TTS with the profile's backend: Google Cloud WaveNet by
+    default (US English male, natural and clear!), or a local engine
+    like espeak/Piper for offline, quota-free batches. See tts_backends.py
+    to plug in ElevenLabs, Coqui, or your favorite TTS!
+    Long texts are synthesized in parallel sentence chunks.
+    Returns the chunks ([{"text", "start", "end"}] in seconds), or None on failure.
     """
-    client = texttospeech.TextToSpeechClient()
-    synthesis_input = texttospeech.SynthesisInput(text=text)
+    profile = profile or LANGUAGE_PROFILES["en"]
+    try:
+        synthesize = tts_backends.get_backend(profile)
+        with telemetry.stage("tts", backend=profile["tts_backend"], voice=tts_backends.voice_id(profile), chars=len(text)) as record:
+            chunks = tts_backends.synthesize_chunked(
+                text, filename, profile, synthesize,
+                call=lambda fn, *args: job_manifest.retry_transient(
+                    rate_limits.call, f"{profile['tts_backend']}_tts", fn, *args, label="tts"
+                )
+            )
+            if record is not None:
+                record["chunks"] = len(chunks)
+        return chunks
+    except Exception as e:
+        print(f"Error generating TTS for '{text[:30]}...': {e}")
+        return None
 
-    voice = texttospeech.VoiceSelectionParams(
-        language_code="en-US",
-        name="en-US-Wavenet-D"  # US English male, natural and clear!
+# ---------------------------------------------------------------
+# Speech Length Estimates (plan before we synthesize!)
+# ---------------------------------------------------------------
+def estimate_speech_seconds(text, profile, speed):
+    """Estimate the final (sped-up, trimmed) length of `text` in the profile's voice."""
+    key = calibration_key(tts_backends.voice_id(profile), profile["tts_speaking_rate"], speed)
+    cps = chars_per_second(
+        TTS_CALIBRATION, key, profile["tts_language_code"],
+        speaking_rate=profile["tts_speaking_rate"], speed=speed
     )
+    return estimate_duration(text, cps)
 
-    audio_config = texttospeech.AudioConfig(
-        audio_encoding=texttospeech.AudioEncoding.MP3,
-        speaking_rate=1.08  # Slightly faster, tweak if you want!
-    )
+def record_speech_seconds(text, profile, speed, duration):
+    """Teach the estimator how long `text` really took in the profile's voice."""
+    key = calibration_key(tts_backends.voice_id(profile), profile["tts_speaking_rate"], speed)
+    record_synthesis(TTS_CALIBRATION, key, text, duration)
 
-    try:
-        response = client.synthesize_speech(
-            input=synthesis_input,
-            voice=voice,
-            audio_config=audio_config
-        )
-        with open(filename, "wb") as out:
-            out.write(response.audio_content)
-        return True
-    except Exception as e:
-        print(f"Error generating TTS for '{text[:30]}...': {e}")
-        return False
+def tts_text_for_comment(comment_text):
+    """Only the comment goes to TTS, not the username in front of it."""
+    if ':' in comment_text:
+        _, comment_body = comment_text.split(':', 1)
+        return comment_body.strip()
+    return comment_text
+
+def plan_video_comments(title, comments, profile, transition_duration=TRANSITION_DURATION_ESTIMATE):
+    """
+    Pick the comments that fit MIN/MAX_VIDEO_DURATION using estimated
+    speech lengths. Comments with links/files are never picked.
+    Returns (set of comment indices, estimated total seconds);
+    the set is empty if the video can't reach MIN_VIDEO_DURATION.
+    """
+    title_seconds = estimate_speech_seconds(title, profile, TITLE_AUDIO_SPEED) if title else 0.0
+    comment_seconds = [
+        0.0 if URL_OR_FILE_PATTERN.search(c) else estimate_speech_seconds(tts_text_for_comment(c), profile, COMMENT_AUDIO_SPEED)
+        for c in comments
+    ]
+    selected, estimated_total = plan_comments(
+        comment_seconds, title_seconds, transition_duration,
+        max_duration=MAX_VIDEO_DURATION, min_duration=MIN_VIDEO_DURATION
+    )
+    return set(selected), estimated_total
+
+def thread_can_fill_video(title, selftext, comments, profiles=None):
+    """True if at least one profile's estimate reaches MIN_VIDEO_DURATION."""
+    profiles = profiles or [LANGUAGE_PROFILES["en"]]
+    candidates = ([f"OP: {selftext.strip()}"] if selftext and selftext.strip() else []) + list(comments)
+    for profile in profiles:
+        planned, estimated_total = plan_video_comments(title, candidates, profile)
+        print(f"[{profile['code']}] Estimated video length: {estimated_total:.1f}s")
+        if planned:
+            return True
+    return False
 
 # ---------------------------------------------------------------
 # Faster Whisper Functions (word-level subtitle timing)
 # ---------------------------------------------------------------
-def get_word_timestamps(audio_path):
+_WHISPER_MODELS = {}
+
+def get_whisper_model(model_size="base"):
+    """
+    Load a Whisper model once per process and hand out the same instance
+    to every language variant (loading it is the slow part!).
+    """
+    if model_size not in _WHISPER_MODELS:
+        print(f"Loading Whisper model '{model_size}'...")
+        WhisperModel = lazy_imports.load("faster_whisper").WhisperModel
+        _WHISPER_MODELS[model_size] = WhisperModel(model_size, device="cpu", compute_type="int8")
+    return _WHISPER_MODELS[model_size]
+
+def get_word_timestamps(audio_path, model_size="base", language=None, beam_size=5):
     """
     Transcribe audio and return word-level timestamps using faster-whisper.
+    Passing the profile's language skips Whisper's language detection.
     You can swap this for OpenAI Whisper or any other ASR!
     """
     try:
-        model = WhisperModel("base", device="cpu", compute_type="int8")
-        segments, _ = model.transcribe(audio_path, word_timestamps=True)
-        word_timings = []
-        for segment in segments:
-            for word in segment.words:
-                word_timings.append({
-                    "word": word.word,
-                    "start": word.start,
-                    "end": word.end
-                })
+        model = get_whisper_model(model_size)
+        with telemetry.stage("alignment", model=model_size, beam_size=beam_size):
+            segments, _ = model.transcribe(audio_path, word_timestamps=True, language=language, beam_size=beam_size)
+            word_timings = []
+            for segment in segments:
+                for word in segment.words:
+                    word_timings.append({
+                        "word": word.word,
+                        "start": word.start,
+                        "end": word.end
+                    })
         return word_timings
     except Exception as e:
         print(f"Error getting word timestamps for {audio_path}: {e}")
@@ -278,40 +495,65 @@ def make_highlighted_subtitle(sentence, highlight_idx, highlight_color="#FF4567"
 # ---------------------------------------------------------------
 # Create word-synced subtitles for a sentence/audio
 # ---------------------------------------------------------------
-def create_word_synced_subtitles(audio_path, sentence, video_width, offset=0, color='white'):
+# Below this share of script words actually heard, captions may drift
+LOW_ALIGNMENT_CONFIDENCE = 0.6
+
+def chunk_windows(chunks, script_words):
     """
-    Create a list of MoviePy TextClips for each word, timed to the audio.
+    (start, end, words) per TTS chunk, or None if the chunks don't line up
+    with the caption words (then the clip is aligned as a whole).
     """
-    word_timings = get_word_timestamps(audio_path)
-    audio_duration = AudioFileClip(audio_path).duration
-    subtitle_font = r"C:\Windows\Fonts\NotoSans-Regular.ttf"  # or 'Arial'
-
-    # Dynamically set subtitle offset based on message length
-    base_offset = 0.01
-    if len(sentence.split()) > 25:
-        subtitle_offset = 0.10  # Try 0.18s for long OP messages
-    else:
-        subtitle_offset = base_offset
+    if not chunks or len(chunks) < 2 or sum(c["words"] for c in chunks) != len(script_words):
+        return None
+    return [(c["start"], c["end"], c["words"]) for c in chunks]
 
+def time_script_words(audio_path, script_words, profile, chunks=None):
+    """
+    Start/end times for every spoken script word, with the profile's
+    word_timing_backend: "energy" (no ASR, just the audio's loudness;
+    falls back to Whisper if it finds no speech) or "whisper".
+    With the clip's TTS `chunks`, each chunk's words are aligned only
+    within that chunk's stretch of audio, so errors can't spread.
+    Returns [] if nothing could be timed.
+    """
+    windows = chunk_windows(chunks, script_words)
+    if profile["word_timing_backend"] == "energy":
+        with telemetry.stage("alignment", backend="energy", words=len(script_words)):
+            timed_words = lazy_imports.load("energy_aligner").estimate_word_timings(audio_path, script_words, windows=windows)
+        if timed_words:
+            return timed_words
+        print(f"Energy word timing found no speech in {audio_path}; falling back to Whisper.")
+
+    word_timings = get_word_timestamps(
+        audio_path,
+        model_size=profile["whisper_model"],
+        language=profile["whisper_language"],
+        beam_size=profile["whisper_beam_size"]
+    )
     if not word_timings:
-        txt = sanitize_text(sentence)
-        if not txt.strip():
-            txt = "..."  # fallback for empty text
-        return [
-            TextClip(
-                txt,
-                fontsize=120,
-                color=color,
-                font=subtitle_font,
-                stroke_color='black',
-                stroke_width=16,
-                bg_color='rgba(0,0,0,0.7)',
-                size=(video_width * 0.85, None),
-                method='pango',
-                align='center',
-                print_cmd=False
-            ).set_position(('center', 'center')).set_duration(audio_duration).set_start(offset)
-        ]
+        return []
+
+    # Aligning by edit distance keeps captions in sync even when Whisper
+    # drops, splits or invents a word.
+    if windows:
+        timed_words, confidence = word_aligner.align_chunks(script_words, word_timings, windows)
+    else:
+        timed_words, confidence = word_aligner.align_words(script_words, word_timings)
+    telemetry.log_event("caption_alignment", audio=os.path.basename(audio_path),
+                        words=len(timed_words), confidence=round(confidence, 3))
+    if confidence < LOW_ALIGNMENT_CONFIDENCE:
+        print(f"Warning: Low caption alignment confidence ({confidence:.0%}) for {audio_path}.")
+    return timed_words
+
+def build_caption_events(audio_path, sentence, offset=0, color='white', profile=None, chunks=None):
+    """
+    Work out when each subtitle word appears, timed to the audio.
+    Pass the clip's TTS `chunks` (from synthesize_clip) to align chunk by chunk.
+    Returns plain dicts (text, start, duration, style) so they can be
+    stored in a timeline and turned into TextClips at any resolution.
+    """
+    profile = profile or LANGUAGE_PROFILES["en"]
+    stroke_width = profile["subtitle_stroke_width"]
 
     if ':' in sentence:
         username, rest = sentence.split(':', 1)
@@ -325,11 +567,30 @@ def create_word_synced_subtitles(audio_path, sentence, video_width, offset=0, co
         words = sentence.split()
         username_len = 0
 
-    clips = []
-    subtitle_offset = 0.01  # Add a small delay (in seconds) to subtitle appearance
-    for idx, word_info in enumerate(word_timings):
-        word = words[username_len + idx] if (username_len + idx) < len(words) else ""
-        txt = sanitize_text(word)
+    # The username isn't spoken, so only the rest of the words get timed
+    timed_words = time_script_words(audio_path, words[username_len:], profile, chunks)
+
+    if not timed_words:
+        audio_clip = lazy_imports.load("moviepy.editor").AudioFileClip(audio_path)
+        audio_duration = audio_clip.duration
+        audio_clip.close()
+        txt = sanitize_text(sentence)
+        if not txt.strip():
+            txt = "..."  # fallback for empty text
+        return [{
+            "text": txt,
+            "start": offset,
+            "duration": audio_duration,
+            "fontsize": 120,
+            "color": color,
+            "stroke_width": stroke_width,
+            "width_ratio": 0.85,
+        }]
+
+    events = []
+    subtitle_offset = profile["subtitle_delay"]  # Small delay (in seconds) to subtitle appearance
+    for word_info in timed_words:
+        txt = sanitize_text(word_info["word"])
         if not txt.strip():
             continue
         start = word_info["start"]
@@ -342,182 +603,897 @@ def create_word_synced_subtitles(audio_path, sentence, video_width, offset=0, co
         else:
             fontsize = 120
 
+        events.append({
+            "text": txt,
+            "start": start + offset + subtitle_offset,
+            "duration": duration,
+            "fontsize": fontsize,
+            "color": color,
+            "stroke_width": stroke_width,
+            "width_ratio": 0.90,
+        })
+    return events
+
+def caption_events_to_clips(events, video_width, scale=1.0):
+    """
+    Turn caption events into MoviePy TextClips. `scale` shrinks fonts and
+    strokes along with the frame (0.5 for a 540x960 draft).
+    """
+    subtitle_font = r"C:\Windows\Fonts\NotoSans-Regular.ttf"  # or 'Arial'
+    TextClip = lazy_imports.load("moviepy.editor").TextClip
+    clips = []
+    for event in events:
         txt_clip = TextClip(
-            txt,
-            fontsize=fontsize,
-            color=color,
+            event["text"],
+            fontsize=max(1, int(event["fontsize"] * scale)),
+            color=event["color"],
             font=subtitle_font,
             stroke_color='black',
-            stroke_width=16,
+            stroke_width=max(1, round(event["stroke_width"] * scale)),
             bg_color='rgba(0,0,0,0.7)',
-            size=(video_width * 0.90, None),
+            size=(video_width * event["width_ratio"], None),
             method='pango',
             align='center',
             print_cmd=False
-        ).set_start(start + offset + subtitle_offset).set_duration(duration).set_position(('center', 'center'))
+        ).set_start(event["start"]).set_duration(event["duration"]).set_position(('center', 'center'))
         clips.append(txt_clip)
     return clips
 
+def create_word_synced_subtitles(audio_path, sentence, video_width, offset=0, color='white', profile=None):
+    """
+    Create a list of MoviePy TextClips for each word, timed to the audio.
+    """
+    events = build_caption_events(audio_path, sentence, offset=offset, color=color, profile=profile)
+    return caption_events_to_clips(events, video_width, scale=video_width / VIDEO_WIDTH)
+
+# ---------------------------------------------------------------
+# Render Profiles (draft previews vs. upload-ready finals)
+# ---------------------------------------------------------------
+CPU_COUNT = os.cpu_count() or 1
+RENDER_PROFILES = {
+    # Quick look before uploading: quarter the pixels, fastest x264 preset
+    "draft": {
+        "width": 540,
+        "height": 960,
+        "fps": 24,
+        "preset": "ultrafast",
+        "crf": 30,
+        "threads": min(4, CPU_COUNT),
+        "audio_bitrate": "96k",
+        "suffix": "_draft",
+    },
+    # What actually gets uploaded
+    "final": {
+        "width": VIDEO_WIDTH,
+        "height": VIDEO_HEIGHT,
+        "fps": 24,
+        "preset": "medium",
+        "crf": 20,
+        "threads": CPU_COUNT,
+        "audio_bitrate": "192k",
+        "suffix": "",
+    },
+}
+RENDER_PROFILE = "final"  # Set to "draft" to review a batch before rendering finals
+
+# Extra platform variants, all encoded from the same frames in one pass
+# (see multi_output.py). Missing settings come from the render profile;
+# the first spec's file is "the" video (tags, manifest). Pick some with
+# --outputs tiktok,shorts,archive or set OUTPUT_SPECS directly.
+OUTPUT_PRESETS = {
+    "tiktok": {"name": "tiktok", "suffix": ""},
+    "shorts": {"name": "shorts", "suffix": "_shorts", "crf": 18, "audio_bitrate": "192k"},
+    "archive": {"name": "archive", "suffix": "_archive", "width": 540, "height": 960,
+                "video_bitrate": "800k", "preset": "slow", "container": "mkv", "audio_bitrate": "64k"},
+}
+OUTPUT_SPECS = []  # Empty: one video with the render profile's settings
+
+# Segmented encoding: a video is cut at comment boundaries into this many
+# pieces, encoded in parallel processes and joined without re-encoding.
+# 1 = encode in one pass.
+RENDER_SEGMENTS = max(1, min(4, CPU_COUNT // 2))
+MIN_SEGMENT_SECONDS = 8  # Shorter pieces aren't worth a process
+
+# Synthesized audio + captions for every video are kept here, so a draft
+# can be re-rendered as a final without refetching or re-synthesizing.
+TIMELINE_ROOT = "timelines"
+TIMELINE_VERSION = 2  # v2 added the overlay layers
+TIMELINE_FORMAT = "json"  # or "msgpack" (pip install msgpack): smaller and faster to load
+TIMELINE_FILES = {"json": "timeline.json", "msgpack": "timeline.msgpack"}
+
+# ---------------------------------------------------------------
+# Shared Visual Layers (decoded once per batch, reused by every video)
+# ---------------------------------------------------------------
+def key_overlay_once(path, width=1300, color=(0, 255, 0), thr=150, s=15):
+    """
+    Green-screen the follow overlay once and memoize every keyed frame,
+    so every video reuses the same RGB frames and alpha mask instead of
+    running mask_color again. Keying time and reuses are reported to the
+    asset pool.
+    """
+    mpy = lazy_imports.load("moviepy.editor")
+    raw = mpy.VideoFileClip(path).resize(width=width)
+    keyed = raw.fx(mpy.vfx.mask_color, color=list(color), thr=thr, s=s)
+    fps = raw.fps or 24
+    last_idx = max(0, int(raw.duration * fps) - 1)
+    frames, masks = {}, {}
+    frame_seconds, mask_seconds = {}, {}  # frame index -> time spent keying it
+
+    def frame_idx(t):
+        return min(int(t * fps), last_idx)
+
+    def memoized(cache, seconds, idx, get_frame):
+        if idx in cache:
+            asset_pool.note_decode(seconds[idx], reused=True)
+            return cache[idx]
+        start = time.perf_counter()
+        cache[idx] = get_frame(idx / fps)
+        seconds[idx] = time.perf_counter() - start
+        asset_pool.note_decode(seconds[idx])
+        return cache[idx]
+
+    def make_frame(t):
+        return memoized(frames, frame_seconds, frame_idx(t), keyed.get_frame)
+
+    def make_mask(t):
+        return memoized(masks, mask_seconds, frame_idx(t), keyed.mask.get_frame)
+
+    mask = mpy.VideoClip(make_mask, ismask=True, duration=raw.duration)
+    overlay = mpy.VideoClip(make_frame, duration=raw.duration).set_mask(mask)
+    overlay.fps = fps
+    overlay.frame_key = frame_idx  # lets the compositor spot the frozen last frame
+    overlay.source_clip = raw  # keep the reader alive until release
+    return overlay
+
+def prepare_shared_layers(render_profile=None, background_video_path=None, plan_only=False):
+    """
+    Get everything that doesn't depend on the language from the asset
+    pool: the background video, the keyed follow overlay, the music bed
+    and the sped-up transition sound, at the render profile's resolution.
+    Pass `background_video_path` to reuse a timeline's background,
+    otherwise one is picked at random. With `plan_only` nothing visual
+    (or the music) is decoded; that's enough to build timelines.
+    Returns a dict you hand to create_video for every language variant,
+    or None if no background video is available.
+    """
+    render_profile = RENDER_PROFILES[render_profile or RENDER_PROFILE]
+    width, height = render_profile["width"], render_profile["height"]
+    if background_video_path is None:
+        available_backgrounds = [p for p in BACKGROUND_VIDEO_CHOICES if os.path.exists(p)]
+        if not available_backgrounds:
+            print(f"Error: None of the background videos {BACKGROUND_VIDEO_CHOICES} were found. Please place one in the project directory.")
+            return None
+        background_video_path = random.choice(available_backgrounds)
+    elif not os.path.exists(background_video_path):
+        print(f"Error: Background video '{background_video_path}' not found. Please place it in the project directory.")
+        return None
+    print(f"Using background video: {background_video_path}")
+
+    index = background_index.get_index(BACKGROUND_VIDEO_CHOICES + ADDITIONAL_BG_CHOICES + [background_video_path])
+    layers = {
+        "keys": [],
+        "size": (width, height),
+        "background_path": background_video_path,
+        "background_info": index["videos"].get(background_video_path),
+        "plan_only": plan_only,
+    }
+
+    def shared(key, opener, closer=None):
+        layers["keys"].append(key)
+        return asset_pool.acquire(key, opener, closer)
+
+    audio_mixer = lazy_imports.load("audio_mixer")
+    sample_rate = audio_mixer.MIX_SAMPLE_RATE
+    layers["transition_pcm"] = shared(
+        ("transition_pcm", TRANSITION_SOUND_PATH, TRANSITION_AUDIO_SPEED, sample_rate),
+        lambda: audio_mixer.cached_pcm(
+            TRANSITION_SOUND_PATH, sample_rate, variant=f"speed{TRANSITION_AUDIO_SPEED}",
+            decode=lambda: decode_transition_sound(sample_rate)
+        ),
+        closer=release_pcm
+    )
+    layers["transition_duration"] = audio_mixer.pcm_duration(layers["transition_pcm"], sample_rate)
+    if plan_only:
+        return layers
+
+    background_source = shared(
+        ("video", background_video_path),
+        lambda: lazy_imports.load("moviepy.editor").VideoFileClip(background_video_path)
+    )
+    layers["background"] = background_source.resize(width=width, height=height).set_position("center")
+
+    layers["follow"] = None
+    if os.path.exists(FOLLOW_OVERLAY_PATH):
+        overlay_width = int(1300 * width / VIDEO_WIDTH)
+        layers["follow"] = shared(
+            ("overlay", FOLLOW_OVERLAY_PATH, overlay_width),
+            lambda: key_overlay_once(FOLLOW_OVERLAY_PATH, width=overlay_width),
+            closer=lambda overlay: overlay.source_clip.close()
+        )
+    else:
+        print(f"{FOLLOW_OVERLAY_PATH} not found, skipping follow animation.")
+
+    # Audio is kept as decoded PCM for the soundtrack mixer
+    layers["music_pcm"] = None
+    if os.path.exists(BACKGROUND_MUSIC_PATH):
+        layers["music_pcm"] = shared(
+            ("pcm", BACKGROUND_MUSIC_PATH, sample_rate),
+            lambda: audio_mixer.cached_pcm(BACKGROUND_MUSIC_PATH, sample_rate),
+            closer=release_pcm
+        )
+    else:
+        print(f"Warning: Background music '{BACKGROUND_MUSIC_PATH}' not found. Continuing without music.")
+    return layers
+
+def decode_transition_sound(sample_rate):
+    """Speed up the transition sound and decode it (the temp file is removed right away)."""
+    speedup_transition(TRANSITION_SOUND_PATH, TRANSITION_FAST_PATH, speed=TRANSITION_AUDIO_SPEED)
+    try:
+        return lazy_imports.load("audio_mixer").decode_pcm(TRANSITION_FAST_PATH, sample_rate)
+    finally:
+        safe_remove(TRANSITION_FAST_PATH)
+
+def release_pcm(pcm):
+    """Decoded PCM is memory or a read-only memory map; nothing to close."""
+
+def release_shared_layers(layers):
+    """Hand the shared layers back to the asset pool (it decides when to close them)."""
+    if not layers:
+        return
+    for key in layers["keys"]:
+        asset_pool.release(key)
+    layers.clear()
+
+def loop_clip_to_duration(clip, duration, concatenate=None, **concat_kwargs):
+    """Loop a (shared) clip until it covers `duration`, without closing the source."""
+    if clip.duration >= duration:
+        return clip.subclip(0, duration)
+    concatenate = concatenate or lazy_imports.load("moviepy.editor").concatenate_videoclips
+    num_loops = int(duration / clip.duration) + 1
+    looped = concatenate([clip] * num_loops, **concat_kwargs)
+    return looped.subclip(0, duration)
+
+# ---------------------------------------------------------------
+# Timelines (everything needed to render a video, minus the pixels)
+# ---------------------------------------------------------------
+def save_timeline(timeline, timeline_dir, fmt=None):
+    """Write timeline.json (or .msgpack) into its directory, next to its audio files."""
+    fmt = fmt or TIMELINE_FORMAT
+    if fmt == "msgpack" and msgpack is None:
+        print("Warning: msgpack is not installed; saving the timeline as JSON.")
+        fmt = "json"
+    path = os.path.join(timeline_dir, TIMELINE_FILES[fmt])
+    if fmt == "msgpack":
+        with open(path, "wb") as f:
+            f.write(msgpack.packb(timeline, use_bin_type=True))
+    else:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(timeline, f, indent=2, ensure_ascii=False)
+    return path
+
+def find_timeline(timeline_dir):
+    """The timeline file in a timeline dir (preferring TIMELINE_FORMAT), or None."""
+    names = [TIMELINE_FILES[TIMELINE_FORMAT]] + list(TIMELINE_FILES.values())
+    for name in dict.fromkeys(names):
+        path = os.path.join(timeline_dir, name)
+        if os.path.exists(path):
+            return path
+    return None
+
+def load_timeline(path):
+    """Load a timeline file (or the one in a timeline dir); returns (timeline, its directory)."""
+    if os.path.isdir(path):
+        path = find_timeline(path)
+        if path is None:
+            raise FileNotFoundError("No timeline file in that directory")
+    timeline_dir = os.path.dirname(os.path.abspath(path))
+    if path.endswith(".msgpack"):
+        if msgpack is None:
+            raise RuntimeError("msgpack is not installed; pip install msgpack to read this timeline")
+        with open(path, "rb") as f:
+            return msgpack.unpackb(f.read(), raw=False), timeline_dir
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f), timeline_dir
+
+def timeline_overlays(timeline):
+    """The timeline's overlay layers; v1 timelines get the classic title card + follow overlay."""
+    if "overlays" in timeline:
+        return timeline["overlays"]
+    return build_overlay_layers(timeline["title"], timeline["duration"])
+
+def build_overlay_layers(title, duration):
+    """Title card at the top, follow animation at the bottom, both for the whole video."""
+    overlays = []
+    if title:
+        overlays.append({"kind": "title", "text": title, "start": 0.0, "duration": duration,
+                         "position": ["center", "top"]})
+    overlays.append({"kind": "follow", "file": FOLLOW_OVERLAY_PATH, "start": 0.0, "duration": duration,
+                     "position": ["center", "bottom"]})
+    return overlays
+
+def make_timeline_dir(output_filename, profile):
+    """A fresh timelines/<lang>_<video name> directory for one video."""
+    base = os.path.splitext(os.path.basename(output_filename))[0]
+    timeline_dir = os.path.join(TIMELINE_ROOT, f"{profile['code']}_{base}")
+    candidate, count = timeline_dir, 1
+    while os.path.exists(candidate):
+        count += 1
+        candidate = f"{timeline_dir}_{count}"
+    os.makedirs(candidate)
+    return candidate
+
+def default_output_filename(profile):
+    """Next free reddit_video_output_N.mp4 in the profile's output dir."""
+    output_dir = profile["output_dir"]
+    output_filename = os.path.join(output_dir, "reddit_video_output_1.mp4")
+    count = 1
+    while os.path.exists(output_filename):
+        count += 1
+        output_filename = os.path.join(output_dir, f"reddit_video_output_{count}.mp4")
+    return output_filename
+
 # ---------------------------------------------------------------
 # Video Creation!
 # ---------------------------------------------------------------
 MAX_VIDEO_DURATION = 120  # seconds
 MIN_VIDEO_DURATION = 30  # seconds
 
-def create_video(title, comments, output_filename=None):
+def create_video(title, comments, output_filename=None, profile=None, layers=None, render_profile=None, manifest=None,
+                 plan_only=False):
     """
     Assemble the final TikTok video from all the pieces!
     This is where the magic happens. 🎬
+    Synthesizes and aligns everything into a stored timeline, then renders
+    it with the render profile ("final" or "draft").
+    Pass `layers` from prepare_shared_layers() to reuse the decoded
+    backgrounds, overlay and music across language variants; without it
+    the layers are prepared (and released) just for this video.
+    With a job `manifest`, finished stages (timeline, render) are
+    checkpointed and skipped when a crashed job is resumed.
+    With `plan_only`, stop after the timeline (render it later, anywhere).
+    Returns the output path (the timeline's path with `plan_only`), or
+    None if the video was skipped.
+    """
+    profile = profile or LANGUAGE_PROFILES["en"]
+    render_profile = render_profile or RENDER_PROFILE
+    code = profile["code"]
+    if manifest and job_manifest.stage_done(manifest, code, "render"):
+        rendered = job_manifest.variant_record(manifest, code)["stages"]["render"].get("output")
+        if rendered and os.path.exists(rendered):
+            print(f"[{code}] Already rendered: {rendered}")
+            return rendered
+    owns_layers = layers is None
+    if owns_layers:
+        layers = prepare_shared_layers(render_profile, plan_only=plan_only)
+        if layers is None:
+            return None
+    try:
+        output_dir = profile["output_dir"]
+        if not os.path.exists(output_dir):
+            os.makedirs(output_dir)
+        if output_filename is None:
+            output_filename = default_output_filename(profile)
+
+        timeline = None
+        if manifest and job_manifest.stage_done(manifest, code, "timeline"):
+            timeline_path = find_timeline(job_manifest.variant_record(manifest, code)["timeline_dir"])
+            if timeline_path:
+                print(f"[{code}] Resuming from stored timeline {timeline_path}")
+                timeline, timeline_dir = load_timeline(timeline_path)
+        if timeline is None:
+            timeline, timeline_dir = build_timeline(title, comments, output_filename, profile, layers, manifest=manifest)
+            if timeline is None:
+                if manifest:
+                    job_manifest.mark_stage(manifest, code, "timeline", status="skipped")
+                return None
+            if manifest:
+                job_manifest.mark_stage(manifest, code, "timeline")
+        if plan_only:
+            return find_timeline(timeline_dir)
+
+        written_path = render_timeline(timeline, timeline_dir, render_profile=render_profile, layers=layers)
+        if manifest and written_path:
+            job_manifest.mark_stage(manifest, code, "render", output=written_path, render_profile=render_profile)
+        return written_path
+    finally:
+        if owns_layers:
+            release_shared_layers(layers)
+
+def synthesize_clip(text, name, timeline_dir, profile, speed, trim=True):
+    """
+    TTS + speed-up (+ silence trim) for one clip, kept in the timeline dir
+    as <name>_fast.mp3 / <name>_fast_trimmed.mp3; intermediates are removed.
+    Returns (path, duration, chunks), or (None, 0, None) if synthesis failed.
+    `chunks` are the TTS chunks' {"start", "end", "words"} in the final clip.
+    """
+    raw_path = os.path.join(timeline_dir, f"{name}.mp3")
+    tts_chunks = text_to_speech_gtts(text, raw_path, profile=profile)
+    if not tts_chunks:
+        return None, 0, None
+    fast_path = os.path.join(timeline_dir, f"{name}_fast.mp3")
+    final_path = os.path.join(timeline_dir, f"{name}_fast_trimmed.mp3") if trim else fast_path
+    trimmed_start = 0.0
+    with telemetry.stage("speed_trim", clip=name):
+        speedup_audio(raw_path, fast_path, speed=speed)
+        if trim:
+            trimmed_start = trim_silence(fast_path, final_path)
+    for intermediate in [raw_path] + ([fast_path] if trim else []):
+        if os.path.exists(intermediate):
+            safe_remove(intermediate)
+
+    try:
+        audio_clip = lazy_imports.load("moviepy.editor").AudioFileClip(final_path)
+        duration = audio_clip.duration
+        audio_clip.close()
+    except Exception as e:
+        print(f"Error loading audio for {name}: {e}. It will be skipped.")
+        return None, 0, None
+    if duration <= 0:
+        return None, 0, None
+    record_speech_seconds(text, profile, speed, duration)
+
+    # Chunk offsets follow the audio through the speed-up and the trim
+    def to_clip_time(t):
+        return min(duration, max(0.0, t / speed - trimmed_start))
+    chunks = [
+        {"start": to_clip_time(c["start"]), "end": to_clip_time(c["end"]), "words": len(c["text"].split())}
+        for c in tts_chunks
+    ]
+    return final_path, duration, chunks
+
+def build_timeline(title, comments, output_filename, profile, layers, manifest=None):
+    """
+    Synthesize the title and planned comments, align their subtitles and
+    store it all as a timeline (JSON + audio files) in timelines/.
+    With a job `manifest`, every clip and its word timings are checkpointed
+    as soon as they exist, and clips from a crashed attempt are reused.
+    Returns (timeline, timeline_dir), or (None, None) if the video was skipped.
     """
     color_palette = [
         "#FF4500", "#00BFFF", "#FFD700", "#32CD32",
         "#FF69B4", "#FFFFFF", "#00FFFF", "#FFA500",
     ]
-
-    BACKGROUND_VIDEO_CHOICES = [
-        "MCPARKOUR.mp4", "MCPARKOUR1.mp4"
-    ]
-    background_video_path = random.choice(BACKGROUND_VIDEO_CHOICES)
-    if not os.path.exists(background_video_path):
-        print(f"Error: Background video '{background_video_path}' not found. Please place it in the project directory.")
-        return
-    print(f"Using background video: {background_video_path}")
-
-    background_video_full = VideoFileClip(background_video_path)
-
-    background_music_clip = None
-    if os.path.exists(BACKGROUND_MUSIC_PATH):
-        background_music_clip = AudioFileClip(BACKGROUND_MUSIC_PATH)
+    code = profile["code"]
+    variant = job_manifest.variant_record(manifest, code) if manifest else None
+    artifacts = variant["artifacts"] if variant else {}
+    transition_duration = layers["transition_duration"]
+
+    # --- Plan which comments make the cut (before any TTS!) ---
+    if variant and variant["plan"] is not None:
+        planned_comments = set(variant["plan"])
+        print(f"Resuming with the stored plan ({len(planned_comments)} comments).")
     else:
-        print(f"Warning: Background music '{BACKGROUND_MUSIC_PATH}' not found. Continuing without music.")
+        planned_comments, estimated_duration = plan_video_comments(title, comments, profile, transition_duration)
+        if not planned_comments:
+            print(f"Video would be too short (~{estimated_duration:.2f}s estimated). Skipping before TTS.")
+            return None, None
+        print(f"Planned {len(planned_comments)}/{len(comments)} comments, ~{estimated_duration:.1f}s estimated.")
+        if variant:
+            variant["plan"] = sorted(planned_comments)
+            job_manifest.save_manifest(manifest)
+
+    if variant and variant["timeline_dir"] and os.path.isdir(variant["timeline_dir"]):
+        timeline_dir = variant["timeline_dir"]
+    else:
+        timeline_dir = make_timeline_dir(output_filename, profile)
+        if variant:
+            variant["timeline_dir"] = timeline_dir
+            job_manifest.save_manifest(manifest)
+
+    def clip_for(key, text, speed, trim):
+        """A checkpointed clip if one survived, otherwise a fresh synthesis."""
+        if manifest:
+            artifact = job_manifest.reusable_artifact(manifest, code, key, timeline_dir, text)
+            if artifact:
+                print(f"Reusing checkpointed audio for {key}.")
+                return artifact
+        path, duration, chunks = synthesize_clip(text, key, timeline_dir, profile, speed, trim=trim)
+        if path is None:
+            return None
+        if manifest:
+            job_manifest.record_artifact(manifest, code, key, path, text, duration, chunks=chunks)
+        else:
+            artifacts[key] = {"file": os.path.basename(path), "duration": duration, "captions": None, "chunks": chunks}
+        return artifacts[key]
 
-    # Prepare the sped-up transition sound
-    transition_path = r"C:\Users\veexe\Documents\code\EDITING\transition.mp3"
-    transition_fast_path = r"C:\Users\veexe\Documents\code\EDITING\transition_fast.mp3"
-    speedup_transition(transition_path, transition_fast_path, speed=TRANSITION_AUDIO_SPEED)
-    transition_audio_clip = AudioFileClip(transition_fast_path).volumex(TRANSITION_VOLUME)
-    transition_duration = transition_audio_clip.duration
+    def discard_timeline():
+        shutil.rmtree(timeline_dir, ignore_errors=True)
+        if variant:
+            variant["timeline_dir"] = None
+            variant["artifacts"] = {}
+            job_manifest.save_manifest(manifest)
 
     cumulative_comment_audio_duration = 0
-    tts_audio_clips_to_concat = []
-    all_comment_audio_clips = []
-    all_comment_subtitle_clips = []
-    audio_files_to_cleanup = [transition_fast_path]
+    audio_segments = []
+    caption_events = []
 
     # --- Handle Title Audio ---
-    title_audio_path = "temp_title.mp3"
-    title_audio_clip = None
-    title_duration = 0
-
+    title_artifact = None
     if title:
         print(f"Processing title audio: {title[:60]}...")
-        if text_to_speech_gtts(title, title_audio_path):
-            audio_files_to_cleanup.append(title_audio_path)
-            spedup_title_audio_path = "temp_title_fast.mp3"
-            speedup_audio(title_audio_path, spedup_title_audio_path, speed=TITLE_AUDIO_SPEED)
-            audio_files_to_cleanup.append(spedup_title_audio_path)
-            try:
-                title_audio_clip = AudioFileClip(spedup_title_audio_path)
-                title_duration = title_audio_clip.duration
-            except Exception as e:
-                print(f"Error loading audio for title: {e}. Title audio will be skipped.")
-                title_audio_clip = None
+        title_artifact = clip_for("title", title, TITLE_AUDIO_SPEED, trim=False)
 
-    if title_audio_clip:
-        tts_audio_clips_to_concat.append(title_audio_clip)
-        tts_audio_clips_to_concat.append(transition_audio_clip)
+    if title_artifact:
+        title_duration = title_artifact["duration"]
+        audio_segments.append({"kind": "tts", "file": title_artifact["file"], "start": 0.0, "duration": title_duration})
+        audio_segments.append({"kind": "transition", "start": title_duration, "duration": transition_duration})
         cumulative_comment_audio_duration += title_duration + transition_duration
 
-    url_or_file_pattern = re.compile(
-        r"(https?://|www\.|\.jpg|\.jpeg|\.png|\.gif|\.bmp|\.mp4|\.avi|\.mov|\.webm|\.pdf|\.doc|\.xls|\.ppt|\.zip|\.rar|\.7z|\.tar|\.gz|imgur\.com|i\.redd\.it|pic\.twitter\.com)",
-        re.IGNORECASE
-    )
-
     for i, comment_text in enumerate(comments):
-        if url_or_file_pattern.search(comment_text):
+        if i not in planned_comments:
             continue
 
         print(f"Processing comment {i+1}/{len(comments)}: {comment_text[:60]}...")
-        audio_path = f"temp_comment_{i}.mp3"
+        key = f"comment_{i}"
 
         # Only pass the comment (not username) to TTS
-        if ':' in comment_text:
-            _, comment_body = comment_text.split(':', 1)
-            tts_text = comment_body.strip()
-        else:
-            tts_text = comment_text
-
-        if not text_to_speech_gtts(tts_text, audio_path):
-            continue
-
-        spedup_audio_path = f"temp_comment_{i}_fast.mp3"
-        speedup_audio(audio_path, spedup_audio_path, speed=COMMENT_AUDIO_SPEED)
-        trimmed_audio_path = f"temp_comment_{i}_fast_trimmed.mp3"
-        trim_silence(spedup_audio_path, trimmed_audio_path)
-        audio_files_to_cleanup.extend([audio_path, spedup_audio_path, trimmed_audio_path])
-        audio_path = trimmed_audio_path
-
-        try:
-            current_audio_clip = AudioFileClip(audio_path)
-            comment_duration = current_audio_clip.duration
-            if comment_duration <= 0:
-                current_audio_clip.close()
-                continue
-        except Exception as e:
+        artifact = clip_for(key, tts_text_for_comment(comment_text), COMMENT_AUDIO_SPEED, trim=True)
+        if artifact is None:
             continue
+        comment_duration = artifact["duration"]
 
-        # Check if adding this comment would exceed max duration
+        # Estimates can be off: never exceed max duration for real
         projected_duration = cumulative_comment_audio_duration + comment_duration + transition_duration
         if projected_duration > MAX_VIDEO_DURATION:
-            current_audio_clip.close()
-            break  # Stop adding more comments
-
-        comment_color = color_palette[i % len(color_palette)]
-
-        subtitle_clips = create_word_synced_subtitles(
-            audio_path,
-            comment_text,
-            VIDEO_WIDTH,
-            offset=cumulative_comment_audio_duration,
-            color=comment_color
+            continue  # The next planned comment may still fit
+
+        if artifact["captions"] is None:
+            # Word timings are stored relative to the clip, so they survive a resume
+            captions = build_caption_events(
+                os.path.join(timeline_dir, artifact["file"]),
+                comment_text,
+                color=color_palette[i % len(color_palette)],
+                profile=profile,
+                chunks=artifact.get("chunks")
+            )
+            if manifest:
+                job_manifest.record_captions(manifest, code, key, captions)
+            else:
+                artifact["captions"] = captions
+        caption_events.extend(
+            dict(event, start=event["start"] + cumulative_comment_audio_duration) for event in artifact["captions"]
         )
 
-        all_comment_subtitle_clips.extend(subtitle_clips)
-        all_comment_audio_clips.append(current_audio_clip)
-        tts_audio_clips_to_concat.append(transition_audio_clip)
-        tts_audio_clips_to_concat.append(current_audio_clip)
+        comment_start = cumulative_comment_audio_duration + transition_duration
+        audio_segments.append({"kind": "transition", "start": cumulative_comment_audio_duration, "duration": transition_duration})
+        audio_segments.append({"kind": "tts", "file": artifact["file"], "start": comment_start, "duration": comment_duration})
         cumulative_comment_audio_duration = projected_duration
 
+    save_calibration(TTS_CALIBRATION)
+
     # After loop, check if total duration is at least MIN_VIDEO_DURATION
     if cumulative_comment_audio_duration < MIN_VIDEO_DURATION:
         print(f"Video too short ({cumulative_comment_audio_duration:.2f}s). Skipping.")
-        background_video_full.close()
-        for aud_file in audio_files_to_cleanup:
-            if os.path.exists(aud_file): os.remove(aud_file)
-        return
+        discard_timeline()
+        return None, None
 
-    # Combine audio clips: Title audio first, followed by comment audio (TTS track)
-    if tts_audio_clips_to_concat:
-        final_audio_clip = concatenate_audioclips(tts_audio_clips_to_concat)
-    else:
-        print("No TTS audio clips generated. Cannot create video.")
-        background_video_full.close()
-        for aud_file in audio_files_to_cleanup:
-            if os.path.exists(aud_file): os.remove(aud_file)
-        return
-
-    total_video_duration = final_audio_clip.duration
+    total_video_duration = cumulative_comment_audio_duration
 
     # --- Ensure last subtitle isn't cut off ---
-    if all_comment_subtitle_clips:
-        last_sub_end = max([clip.end for clip in all_comment_subtitle_clips])
+    if caption_events:
+        last_sub_end = max(event["start"] + event["duration"] for event in caption_events)
         if last_sub_end > total_video_duration:
             print(f"[INFO] Extending video duration from {total_video_duration:.2f}s to {last_sub_end + 0.1:.2f}s to fit last subtitle.")
             total_video_duration = last_sub_end + 0.1
 
-    # --- Handle Title Text Clip (visible for the whole video) ---
+    timeline = {
+        "version": TIMELINE_VERSION,
+        "language": profile["code"],
+        "title": title,
+        "duration": total_video_duration,
+        "background": layers["background_path"],
+        # Random keyframe-aligned start, so videos don't all open on the same frames
+        "background_offset": background_index.pick_segment_start(layers["background_info"], total_video_duration),
+        "audio": audio_segments,
+        "captions": caption_events,
+        "overlays": build_overlay_layers(title, total_video_duration),
+        "output": output_filename,
+    }
+    print(f"Timeline saved to {save_timeline(timeline, timeline_dir)}")
+    return timeline, timeline_dir
+
+def render_timeline(timeline, timeline_dir, render_profile=None, layers=None, output_filename=None, outputs=None):
+    """
+    Render a stored timeline into an MP4 with the given render profile.
+    No fetching, rewriting or TTS happens here, so a draft can be turned
+    into a final (or vice versa) straight from timelines/.
+    `outputs` (default OUTPUT_SPECS) lists extra platform variants, all
+    encoded from the same frames; see multi_output.py.
+    Returns the (first) output path, or None if writing failed.
+    """
+    render_profile_name = render_profile or RENDER_PROFILE
+    render_profile = RENDER_PROFILES[render_profile_name]
+    width, height = render_profile["width"], render_profile["height"]
+
+    owns_layers = (
+        layers is None
+        or layers["plan_only"]
+        or layers["size"] != (width, height)
+        or layers["background_path"] != timeline["background"]
+    )
+    if owns_layers:
+        layers = prepare_shared_layers(render_profile_name, background_video_path=timeline["background"])
+        if layers is None:
+            return None
+
+    if output_filename is None:
+        base, ext = os.path.splitext(timeline["output"])
+        output_filename = f"{base}{render_profile['suffix']}{ext}"
+
+    specs = OUTPUT_SPECS if outputs is None else outputs
+    output_specs = multi_output.resolve_specs(specs, render_profile) if specs else None
+    if output_specs:
+        output_paths = [multi_output.output_path(output_filename, spec) for spec in output_specs]
+        output_filename = output_paths[0]
+    else:
+        output_paths = [output_filename]
+
+    segments = plan_segments(timeline, render_profile["fps"], RENDER_SEGMENTS)
+    final_video, owned_clips = None, []
+    if len(segments) == 1:
+        with telemetry.stage("composite_setup", render_profile=render_profile_name):
+            final_video, owned_clips = compose_timeline(timeline, timeline_dir, render_profile, layers)
+
+    output_dir = os.path.dirname(output_filename)
+    if output_dir and not os.path.exists(output_dir):
+        os.makedirs(output_dir)
+
+    written = False
+    try:
+        with telemetry.stage("soundtrack_mix", duration=timeline["duration"]):
+            soundtrack_path = render_soundtrack(timeline, timeline_dir, layers, render_profile)
+        print(f"Writing {render_profile_name} video to {', '.join(output_paths)}...")
+        with telemetry.stage("encode", render_profile=render_profile_name, duration=timeline["duration"],
+                             segments=len(segments), outputs=len(output_paths)):
+            if final_video is not None and output_specs:
+                multi_output.encode(
+                    final_video, output_specs, output_paths, render_profile["fps"], soundtrack=soundtrack_path,
+                    soundtrack_format=("aac", render_profile["audio_bitrate"]), threads=render_profile["threads"]
+                )
+                cache_stats = final_video.overlay_cache_stats
+            elif final_video is not None:
+                write_composed_video(final_video, output_filename, render_profile, soundtrack=soundtrack_path)
+                cache_stats = final_video.overlay_cache_stats
+            else:
+                cache_stats = encode_segments(
+                    timeline, timeline_dir, render_profile_name, segments, soundtrack_path, output_filename,
+                    output_specs, output_paths
+                )
+        overlay_cache = lazy_imports.load("overlay_cache")
+        print(f"Overlay cache: {overlay_cache.hit_rate(cache_stats):.1%} hit rate "
+              f"({cache_stats['rebuilds']} rebuilds over {cache_stats['frames']} frames)")
+        telemetry.log_event("overlay_cache", output=os.path.basename(output_filename),
+                            hit_rate=round(overlay_cache.hit_rate(cache_stats), 4), **cache_stats)
+        print("Video generation complete! 🎉")
+        written = True
+    except Exception as e:
+        print(f"Error writing final video file: {e}")
+    finally:
+        with telemetry.stage("cleanup"):
+            # Close the clips this video owns; the shared layers belong to
+            # the asset pool and stay open for the next video.
+            close_clips(owned_clips)
+            if owns_layers:
+                release_shared_layers(layers)
+
+    return output_filename if written else None
+
+def mix_timeline_audio(timeline, timeline_dir, layers, sample_rate=None):
+    """
+    The timeline's whole soundtrack as one PCM array: TTS clips and
+    transitions at their stored offsets over the looping, ducked music.
+    """
+    audio_mixer = lazy_imports.load("audio_mixer")
+    sample_rate = sample_rate or audio_mixer.MIX_SAMPLE_RATE
+    segments = []
+    for segment in timeline["audio"]:
+        if segment["kind"] == "tts":
+            pcm = audio_mixer.decode_pcm(os.path.join(timeline_dir, segment["file"]), sample_rate)
+            segments.append({"pcm": pcm, "start": segment["start"], "gain": 1.0, "speech": True})
+        else:
+            segments.append({"pcm": layers["transition_pcm"], "start": segment["start"], "gain": TRANSITION_VOLUME})
+    return audio_mixer.mix_soundtrack(
+        timeline["duration"], segments,
+        music=layers["music_pcm"], music_gain=BG_MUSIC_VOLUME, sample_rate=sample_rate
+    )
+
+def render_soundtrack(timeline, timeline_dir, layers, render_profile):
+    """
+    Mix the soundtrack once and encode it to AAC in the timeline dir
+    (soundtrack<suffix>.m4a), ready to be muxed into the video as-is.
+    """
+    sample_rate = lazy_imports.load("audio_mixer").MIX_SAMPLE_RATE
+    mix = mix_timeline_audio(timeline, timeline_dir, layers, sample_rate)
+    soundtrack_path = os.path.join(timeline_dir, f"soundtrack{render_profile['suffix']}.m4a")
+    soundtrack = lazy_imports.load("moviepy.audio.AudioClip").AudioArrayClip(mix, fps=sample_rate)
+    soundtrack.write_audiofile(
+        soundtrack_path,
+        fps=sample_rate,
+        codec="aac",
+        bitrate=render_profile["audio_bitrate"],
+        logger=None
+    )
+    return soundtrack_path
+
+def write_composed_video(final_video, output_filename, render_profile, soundtrack=None):
+    """
+    Encode a composed clip with the render profile's x264/AAC settings.
+    A pre-encoded `soundtrack` file is muxed in as-is instead of the clip's audio.
+    """
+    final_video.write_videofile(
+        output_filename,
+        fps=render_profile["fps"],
+        codec="libx264",
+        audio=soundtrack if soundtrack else True,
+        audio_codec="aac",
+        audio_bitrate=render_profile["audio_bitrate"],
+        preset=render_profile["preset"],
+        threads=render_profile["threads"],
+        ffmpeg_params=["-crf", str(render_profile["crf"])]
+    )
+
+# ---------------------------------------------------------------
+# Segmented Encoding (parallel pieces, joined by stream copy)
+# ---------------------------------------------------------------
+def plan_segments(timeline, fps, count=RENDER_SEGMENTS):
+    """
+    Split the video into up to `count` frame ranges [(first, end)), cut at
+    transition sounds (comment boundaries) nearest to equal lengths.
+    Cuts land on whole frames, and every piece starts with a keyframe of
+    its own, so the pieces can be concatenated without re-encoding.
+    """
+    total_frames = int(math.ceil(timeline["duration"] * fps - 1e-6))
+    min_frames = MIN_SEGMENT_SECONDS * fps
+    count = min(count, int(total_frames // min_frames))
+    if count <= 1:
+        return [(0, total_frames)]
+    boundaries = sorted({
+        int(round(segment["start"] * fps)) for segment in timeline["audio"]
+        if segment["kind"] == "transition" and segment["start"] > 0
+    })
+    cuts = []
+    for k in range(1, count):
+        previous = cuts[-1] if cuts else 0
+        candidates = [b for b in boundaries if b >= previous + min_frames and b <= total_frames - min_frames]
+        if not candidates:
+            break
+        cuts.append(min(candidates, key=lambda b: abs(b - total_frames * k / count)))
+    frames = [0] + cuts + [total_frames]
+    return list(zip(frames, frames[1:]))
+
+def render_segment(timeline, timeline_dir, render_profile_name, first_frame, end_frame, segment_path, threads,
+                   profile_settings=None, output_specs=None):
+    """
+    Encode frames [first_frame, end_frame) of a timeline, video only.
+    Runs in a worker process with its own decoded layers.
+    With `output_specs` (resolved), every spec is encoded from the same
+    frames and `segment_path` is a list with one path per spec.
+    Returns the overlay cache stats, plus the sampled stacks under
+    "profile" when the encoding stage is being profiled.
+    """
+    if profile_settings:
+        stage_profiler.apply(profile_settings)
+        with stage_profiler.Sampler() as sampler:
+            stats = render_segment(timeline, timeline_dir, render_profile_name, first_frame, end_frame,
+                                   segment_path, threads, output_specs=output_specs)
+        return dict(stats, profile=sampler.counts)
+    render_profile = dict(RENDER_PROFILES[render_profile_name], threads=threads)
+    fps = render_profile["fps"]
+    layers = prepare_shared_layers(render_profile_name, background_video_path=timeline["background"])
+    if layers is None:
+        raise RuntimeError(f"Background video '{timeline['background']}' not available")
+    owned_clips = []
+    try:
+        final_video, owned_clips = compose_timeline(timeline, timeline_dir, render_profile, layers)
+        # End half a frame early so MoviePy's frame times give exactly end - first frames
+        segment = final_video.subclip(first_frame / fps, (end_frame - 0.5) / fps)
+        if output_specs:
+            multi_output.encode(segment, output_specs, segment_path, fps, threads=threads)
+        else:
+            segment.write_videofile(
+                segment_path,
+                fps=fps,
+                codec="libx264",
+                audio=False,
+                preset=render_profile["preset"],
+                threads=threads,
+                ffmpeg_params=["-crf", str(render_profile["crf"])],
+                logger=None
+            )
+        return dict(final_video.overlay_cache_stats)
+    finally:
+        close_clips(owned_clips)
+        release_shared_layers(layers)
+
+def concat_segments(segment_paths, soundtrack_path, output_filename, audio_args=("-c:a", "copy"), container_args=None):
+    """
+    Join the encoded pieces (video stream copy) and mux the whole
+    soundtrack in once, copied unless `audio_args` say otherwise.
+    """
+    list_path = output_filename + ".segments.txt"
+    with open(list_path, "w", encoding="utf-8") as f:
+        for path in segment_paths:
+            escaped = os.path.abspath(path).replace("'", "'\\''")
+            f.write(f"file '{escaped}'\n")
+    try:
+        result = subprocess.run(
+            [lazy_imports.load("moviepy.config").get_setting("FFMPEG_BINARY"), "-y", "-v", "error",
+             "-f", "concat", "-safe", "0", "-i", list_path, "-i", soundtrack_path,
+             "-map", "0:v:0", "-map", "1:a:0", "-c:v", "copy", *audio_args,
+             *(["-movflags", "+faststart"] if container_args is None else container_args), output_filename],
+            capture_output=True, text=True
+        )
+        if result.returncode != 0:
+            raise RuntimeError(f"ffmpeg concat failed: {result.stderr.strip()}")
+    finally:
+        safe_remove(list_path)
+
+def encode_segments(timeline, timeline_dir, render_profile_name, segments, soundtrack_path, output_filename,
+                    output_specs=None, output_paths=None):
+    """
+    Encode the segments in parallel processes, then join them.
+    With `output_specs` (resolved), each segment is encoded once per spec
+    from the same frames, and each spec's pieces are joined into its
+    entry of `output_paths`.
+    Returns the combined overlay cache stats.
+    """
+    render_profile = RENDER_PROFILES[render_profile_name]
+    fps = render_profile["fps"]
+    threads = max(1, render_profile["threads"] // len(segments))
+    segment_dir = os.path.join(timeline_dir, f"segments{render_profile['suffix']}")
+    os.makedirs(segment_dir, exist_ok=True)
+    if output_specs:
+        segment_paths = [
+            [os.path.join(segment_dir, f"segment_{i:02d}_{j}.{spec['container']}") for j, spec in enumerate(output_specs)]
+            for i in range(len(segments))
+        ]
+    else:
+        segment_paths = [os.path.join(segment_dir, f"segment_{i:02d}.mp4") for i in range(len(segments))]
+    print(f"Encoding {len(segments)} segments in parallel: "
+          + ", ".join(f"{first / fps:.1f}-{end / fps:.1f}s" for first, end in segments))
+    sampler = stage_profiler.active()  # Profile the segments too if this stage is profiled
+    profile_settings = stage_profiler.settings() if sampler else None
+    try:
+        # "spawn": a forked child would share this process's open video readers
+        with ProcessPoolExecutor(max_workers=len(segments), mp_context=multiprocessing.get_context("spawn")) as pool:
+            futures = [
+                pool.submit(render_segment, timeline, timeline_dir, render_profile_name, first, end, path, threads,
+                            profile_settings, output_specs)
+                for (first, end), path in zip(segments, segment_paths)
+            ]
+            segment_stats = [future.result() for future in futures]
+        if output_specs:
+            for j, (spec, path) in enumerate(zip(output_specs, output_paths)):
+                concat_segments(
+                    [paths[j] for paths in segment_paths], soundtrack_path, path,
+                    audio_args=multi_output.audio_args(spec, "aac", render_profile["audio_bitrate"]),
+                    container_args=multi_output.container_args(spec)
+                )
+        else:
+            concat_segments(segment_paths, soundtrack_path, output_filename)
+    finally:
+        shutil.rmtree(segment_dir, ignore_errors=True)
+    for i, stats in enumerate(segment_stats):
+        if "profile" in stats:
+            sampler.add(stats.pop("profile"), prefix=(f"segment {i}",))
+    return {key: sum(stats[key] for stats in segment_stats) for key in segment_stats[0]}
+
+def close_clips(clips):
+    """Close every clip in the list, reporting (but surviving) failures."""
+    for clip in clips:
+        if clip:
+            try:
+                clip.close()
+            except Exception as e:
+                print(f"Error closing clip: {e}")
+
+def make_title_clip(title, duration, width, scale=1.0):
+    """
+    The title card at the top: subreddit in orange, the hook in white.
+    Returns None if there's no title (or nothing to show it for).
+    """
     title_text_clip = None
-    if title and total_video_duration > 0:
+    if title and duration > 0:
         if title.startswith("[r/"):
             end_idx = title.find("]")
             if end_idx != -1:
@@ -533,186 +1509,81 @@ def create_video(title, comments, output_filename=None):
         colored_title = f"<span foreground='#FF4500'>{subreddit_part}</span> <span foreground='white'>{rest_title}</span>"
         colored_title = sanitize_text(colored_title)
 
-        title_text_clip = TextClip(
+        title_text_clip = lazy_imports.load("moviepy.editor").TextClip(
             colored_title,
-            fontsize=60,
+            fontsize=max(1, int(60 * scale)),
             font='Noto-Sans',
             stroke_color='black',
-            stroke_width=3,
+            stroke_width=max(1, round(3 * scale)),
             bg_color='rgba(0,0,0,0.6)',
-            size=(VIDEO_WIDTH * 0.85, None),
+            size=(width * 0.85, None),
             method='pango',
             align='center',
             print_cmd=False
-        ).set_position(('center', 'top')).set_duration(total_video_duration)
-
-    # --- Background Video Handling ---
-    if total_video_duration <= 0:
-        print("Total video duration is zero or less. Cannot create video.")
-        background_video_full.close()
-        for aud_file in audio_files_to_cleanup:
-            if os.path.exists(aud_file): os.remove(aud_file)
-        if final_audio_clip: final_audio_clip.close()
-        return
-
-    slide_background_clip = None
-    if background_video_full.duration < total_video_duration:
-        num_loops = int(total_video_duration / background_video_full.duration) + 1
-        looped_bg_clips_list = [background_video_full.copy() for _ in range(num_loops)]
-        looped_bg_clips_list = [
-            bg_clip.resize(width=VIDEO_WIDTH, height=VIDEO_HEIGHT).set_position("center")
-            for bg_clip in looped_bg_clips_list
-        ]
-        temp_bg_concat = concatenate_videoclips(looped_bg_clips_list, method="chain")
-        if temp_bg_concat is not None:
-            slide_background_clip = temp_bg_concat.subclip(0, total_video_duration)
-            temp_bg_concat.close()
-        else:
-            print("Failed to concatenate background video clips.")
-        for clip_copy in looped_bg_clips_list:
-            try:
-                clip_copy.close()
-            except Exception as e:
-                print(f"Error closing copied clip: {e}")
-    else:
-        slide_background_clip = background_video_full.subclip(0, total_video_duration)
-
-    # --- Secondary Background (Visual Stimulation) ---
-    ADDITIONAL_BG_CHOICES = ["add1.mp4", "add2.mp4", "add3.mp4", "add4.mp4"]
-    additional_bg_path = random.choice(ADDITIONAL_BG_CHOICES)
-    additional_bg_clip = None
-    if os.path.exists(additional_bg_path):
-        additional_bg_clip_full = VideoFileClip(additional_bg_path).subclip(0, min(background_video_full.duration, total_video_duration))
-        if additional_bg_clip_full.duration < total_video_duration:
-            num_loops = int(total_video_duration / additional_bg_clip_full.duration) + 1
-            looped_clips = [additional_bg_clip_full.copy() for _ in range(num_loops)]
-            temp_bg = concatenate_videoclips(looped_clips, method="chain")
-            additional_bg_clip_full = temp_bg.subclip(0, total_video_duration)
-            temp_bg.close()
-            for clip in looped_clips:
-                try:
-                    clip.close()
-                except Exception as e:
-                    print(f"Error closing additional bg clip copy: {e}")
-        target_width = int(VIDEO_WIDTH * 0.8)
-        target_height = int(VIDEO_HEIGHT * 0.3)
-        additional_bg_clip = additional_bg_clip_full.resize(width=target_width)
-        if additional_bg_clip.h > target_height:
-            y_center = additional_bg_clip.h // 2
-            additional_bg_clip = additional_bg_clip.crop(
-                x_center=target_width // 2,
-                y_center=y_center,
-                width=target_width,
-                height=target_height
-            )
-        additional_bg_clip = additional_bg_clip.set_position(
-            ("center", VIDEO_HEIGHT - target_height)
-        )
-    else:
-        print(f"Warning: Additional background video '{additional_bg_path}' not found. Skipping.")
-
-    if background_music_clip:
-        if background_music_clip.duration < total_video_duration:
-            num_music_loops = int(total_video_duration / background_music_clip.duration) + 1
-            looped_music_clips = [background_music_clip.copy() for _ in range(num_music_loops)]
-            temp_music_concat = concatenate_audioclips(looped_music_clips)
-            bg_music_for_video = temp_music_concat.subclip(0, total_video_duration)
-            temp_music_concat.close()
-            for clip_copy in looped_music_clips:
-                try:
-                    clip_copy.close()
-                except Exception as e:
-                    print(f"Error closing copied music clip: {e}")
-        else:
-            bg_music_for_video = background_music_clip.subclip(0, total_video_duration)
-
-        bg_music_for_video = bg_music_for_video.volumex(BG_MUSIC_VOLUME)
-        final_audio_clip = CompositeAudioClip([final_audio_clip, bg_music_for_video])
-
-    # --- Add TikTok follow animation (greenscreen removal) ---
-    follow_path = "comments_of_gold.mp4"
-    follow_clip = None
-
-    if os.path.exists(follow_path) and total_video_duration > 0:
-        raw_follow = VideoFileClip(follow_path).subclip(0, min(total_video_duration, VideoFileClip(follow_path).duration))
-        # Remove green background with a strong filter
-        follow_clip = raw_follow.fx(vfx.mask_color, color=[0,255,0], thr=150, s=15)
-        # Make it huge and centered at the bottom
-        follow_clip = follow_clip.resize(width=1300)
-        follow_clip = follow_clip.set_position(("center", "bottom"))
-        follow_clip = follow_clip.set_start(0).set_duration(total_video_duration)
-    else:
-        print("comment_of_gold.mp4 not found or total video duration is zero, skipping follow animation.")
-
-    elements_for_final_composite = [slide_background_clip]
-    if title_text_clip:
-        elements_for_final_composite.append(title_text_clip)
-    if follow_clip:
-        elements_for_final_composite.append(follow_clip)
-    elements_for_final_composite.extend(all_comment_subtitle_clips)
-
-    if not elements_for_final_composite:
-        print("No elements to composite. Exiting video creation.")
-        background_video_full.close()
-        if background_music_clip: background_music_clip.close()
-        if final_audio_clip: final_audio_clip.close()
-        for aud_file in audio_files_to_cleanup:
-            if os.path.exists(aud_file): os.remove(aud_file)
-        return
-
-    final_video = CompositeVideoClip(elements_for_final_composite, size=(VIDEO_WIDTH, VIDEO_HEIGHT))
-    final_video = final_video.set_audio(final_audio_clip)
-    final_video = final_video.set_duration(total_video_duration)
-
-    output_dir = r"D:\autoedit\60\Reddit"
-    if not os.path.exists(output_dir):
-        os.makedirs(output_dir)
-    if output_filename is None:
-        output_filename = os.path.join(output_dir, "reddit_video_output_1.mp4")
-        count = 1
-        while os.path.exists(output_filename):
-            count += 1
-            output_filename = os.path.join(output_dir, f"reddit_video_output_{count}.mp4")
-
-    try:
-        print(f"Writing final video to {output_filename}...")
-        final_video.write_videofile(output_filename, fps=24, codec="libx264", audio_codec="aac")
-        print("Video generation complete! 🎉")
-    except Exception as e:
-        print(f"Error writing final video file: {e}")
-    finally:
-        # Close all open video/audio clips before deleting files!
-        for clip in [background_video_full, background_music_clip, final_audio_clip, title_audio_clip, transition_audio_clip]:
-            if clip:
-                try:
-                    clip.close()
-                except Exception as e:
-                    print(f"Error closing clip: {e}")
-
-        for clip in all_comment_audio_clips:
-            try:
-                clip.close()
-            except Exception as e:
-                print(f"Error closing comment audio clip: {e}")
+        ).set_position(('center', 'top')).set_duration(duration)
 
-        for clip in elements_for_final_composite:
-            try:
-                clip.close()
-            except Exception as e:
-                print(f"Error closing composite element: {e}")
+    return title_text_clip
 
-        # Remove references to help garbage collection
-        del background_video_full, background_music_clip, final_audio_clip, title_audio_clip, transition_audio_clip
-        del all_comment_audio_clips, elements_for_final_composite
+def compose_timeline(timeline, timeline_dir, render_profile, layers):
+    """
+    Build the MoviePy video composite for a timeline at the render
+    profile's resolution, using already prepared shared layers. The
+    soundtrack is mixed separately (see render_soundtrack).
+    Returns (final_video, clips this video owns and must close).
+    """
+    width, height = render_profile["width"], render_profile["height"]
+    scale = width / VIDEO_WIDTH
+    total_video_duration = timeline["duration"]
+    overlay_layers = timeline_overlays(timeline)
+
+    # --- Title card(s) + word-synced subtitles ---
+    with telemetry.stage("subtitle_build", captions=len(timeline["captions"])):
+        title_clips = {}  # overlay index -> clip
+        for i, overlay in enumerate(overlay_layers):
+            if overlay["kind"] == "title":
+                title_clip = make_title_clip(overlay["text"], overlay["duration"], width, scale)
+                if title_clip:
+                    title_clips[i] = title_clip.set_start(overlay["start"]).set_position(tuple(overlay["position"]))
+        all_comment_subtitle_clips = caption_events_to_clips(timeline["captions"], width, scale=scale)
+
+    # The shared background is already resized; only the segment is per-video
+    background = layers["background"]
+    background_offset = timeline.get("background_offset", 0.0)
+    if background_offset:
+        background = background.subclip(background_offset)
+    slide_background_clip = loop_clip_to_duration(background, total_video_duration, method="chain")
+
+    # --- Overlay layers in timeline order, subtitles on top ---
+    overlays = []
+    for i, overlay in enumerate(overlay_layers):
+        if i in title_clips:
+            overlays.append(title_clips[i])
+        elif overlay["kind"] == "follow" and layers["follow"] is not None:
+            # TikTok follow animation (pre-keyed, shared across variants);
+            # it holds its last frame for the rest of the overlay
+            follow_clip = layers["follow"].subclip(0, min(overlay["duration"], layers["follow"].duration))
+            follow_clip = follow_clip.set_position(tuple(overlay["position"]))
+            overlays.append(follow_clip.set_start(overlay["start"]).set_duration(overlay["duration"]))
+    overlays.extend(all_comment_subtitle_clips)
+
+    # Title, follow overlay and subtitles are pre-blended into one cached
+    # stack, re-blended only when a word changes (or the follow animation
+    # advances); every frame is then one masked blend over the background.
+    final_video = lazy_imports.load("overlay_cache").cached_composite(
+        slide_background_clip, overlays, (width, height), total_video_duration
+    )
 
-        # Force garbage collection to release file handles
-        gc.collect()
-        time.sleep(0.2)  # Give Windows a moment to catch up
+    owned_clips = list(title_clips.values()) + all_comment_subtitle_clips
+    return final_video, owned_clips
 
-        # Now it's safe to delete temp files!
-        for aud_file in audio_files_to_cleanup:
-            if os.path.exists(aud_file):
-                safe_remove(aud_file)
+def rerender_timeline(timeline_path, render_profile="final"):
+    """Re-render a stored timeline (e.g. a reviewed draft) with another render profile."""
+    timeline, timeline_dir = load_timeline(timeline_path)
+    with telemetry.job(f"rerender_{render_profile}") as render_job:
+        written = render_timeline(timeline, timeline_dir, render_profile=render_profile)
+    if written:
+        stage_profiler.write_job_profile(render_job, os.path.splitext(written)[0])
+    return written
 
 # ---------------------------------------------------------------
 # Utility Functions
@@ -735,9 +1606,9 @@ def speedup_audio(input_path, output_path, speed):
     """
     Speed up an audio file using MoviePy.
     """
-    from moviepy.editor import AudioFileClip, vfx
-    audio = AudioFileClip(input_path)
-    faster_audio = audio.fx(vfx.speedx, speed)
+    mpy = lazy_imports.load("moviepy.editor")
+    audio = mpy.AudioFileClip(input_path)
+    faster_audio = audio.fx(mpy.vfx.speedx, speed)
     faster_audio.write_audiofile(output_path, logger=None)
     audio.close()
     faster_audio.close()
@@ -746,9 +1617,9 @@ def speedup_transition(input_path, output_path, speed):
     """
     Speed up the transition sound effect.
     """
-    from moviepy.editor import AudioFileClip, vfx
-    audio = AudioFileClip(input_path)
-    faster_audio = audio.fx(vfx.speedx, speed)
+    mpy = lazy_imports.load("moviepy.editor")
+    audio = mpy.AudioFileClip(input_path)
+    faster_audio = audio.fx(mpy.vfx.speedx, speed)
     faster_audio.write_audiofile(output_path, logger=None)
     audio.close()
     faster_audio.close()
@@ -756,9 +1627,13 @@ def speedup_transition(input_path, output_path, speed):
 def trim_silence(input_path, output_path, silence_thresh=-40, min_silence_len=250):
     """
     Trim silence from the start and end of an audio file.
+    Returns how many seconds were cut from the start.
     """
-    audio = AudioSegment.from_file(input_path, format="mp3")
-    nonsilent_ranges = detect_nonsilent(audio, min_silence_len=min_silence_len, silence_thresh=silence_thresh)
+    audio = lazy_imports.load("pydub").AudioSegment.from_file(input_path, format="mp3")
+    nonsilent_ranges = lazy_imports.load("pydub.silence").detect_nonsilent(
+        audio, min_silence_len=min_silence_len, silence_thresh=silence_thresh
+    )
+    start_trim = 0
     if nonsilent_ranges:
         start_trim = nonsilent_ranges[0][0]
         end_trim = nonsilent_ranges[-1][1]
@@ -766,6 +1641,7 @@ def trim_silence(input_path, output_path, silence_thresh=-40, min_silence_len=25
     else:
         trimmed_audio = audio
     trimmed_audio.export(output_path, format="mp3")
+    return start_trim / 1000.0
 
 # ---------------------------------------------------------------
 # Rewrite Reddit Content for TikTok Engagement (OpenAI)
@@ -792,16 +1668,59 @@ def rewrite_content_for_engagement(title, op_message, comments):
         "\n".join([f"{i+1}. {c}" for i, c in enumerate(comments)])
     )
 
+    return request_script_rewrite(
+        prompt,
+        "You're a creative, funny Reddit script writer for video content, who knows how to keep TikTok viewers hooked.",
+        0.7,
+        title, op_message, comments
+    )
+
+def translate_content_to_polish(title, op_message, comments):
+    """
+    Use OpenAI to rewrite Reddit content as a natural Polish video script.
+    Returns translated title, op_message, comments, a TikTok-friendly filename, and tags.
+    """
+    prompt = (
+        "Rewrite the following Reddit post (title, OP message, and comments) for a video script in Polish language. "
+        "1. The TITLE should be rewritten as a strong hook that grabs attention, while keeping the OP's tone and staying relevant to the original title and message. "
+        "2. Remove all emotes (like 😊, 😂, etc.) from the entire output, as TTS cannot read them. "
+        "3. Do NOT mention TikTok or video unless the original title or message does. "
+        "4. Maintain the original context and meaning, but feel free to use humor, slang, or informal language typical for Reddit (but don't overdo it). "
+        "5. End with an additional comment containing a question or encouragement for viewers to comment their opinion on the topic. "
+        "6. Make sure the rewritten content flows naturally and feels like something a real Redditor would say. "
+        "7. Ensure the content sounds as if written by a Polish Reddit user using natural Polish language, slang and humor, while keeping the original context. "
+        "8. Don't include any usernames in the comments, just the message itself. "
+        "9. Suggest a short, catchy, filesystem-safe filename for the TikTok video (no special characters, max 60 chars, use underscores or dashes, no spaces). "
+        "10. Suggest a list of 5 ideal TikTok tags/hashtags (as a list of strings, no # needed). "
+        "Return your response ONLY as a JSON with the following fields: 'title', 'op_message', 'comments' (list), 'tiktok_filename', 'tiktok_tags' (list):\n\n"
+        f"Title: {title}\n"
+        f"OP: {op_message}\n"
+        f"Comments:\n" +
+        "\n".join([f"{i+1}. {c}" for i, c in enumerate(comments)])
+    )
+    return request_script_rewrite(
+        prompt,
+        "You're a creative, funny Reddit script writer for video content, who captures the essence of Polish internet culture.",
+        0.4,
+        title, op_message, comments
+    )
+
+def request_script_rewrite(prompt, system_prompt, temperature, title, op_message, comments):
+    """
+    Send a rewrite prompt to OpenAI and parse the JSON it sends back.
+    Falls back to the original content if the response can't be parsed.
+    """
     import json
     import re
 
-    client = OpenAI(api_key=OPENAI_API_KEY)
-    response = client.responses.create(
+    client = lazy_imports.load("openai").OpenAI(api_key=OPENAI_API_KEY)
+    response = rate_limits.call(
+        "openai", client.responses.create,
         model="gpt-4.1",
         input=[
             {
                 "role": "system",
-                "content": "You're a creative, funny Reddit script writer for video content, who knows how to keep TikTok viewers hooked."
+                "content": system_prompt
             },
             {
                 "role": "user",
@@ -813,7 +1732,7 @@ def rewrite_content_for_engagement(title, op_message, comments):
                 "type": "text"
             }
         },
-        temperature=0.7,
+        temperature=temperature,
         max_output_tokens=2048,
         top_p=1,
         store=True
@@ -871,68 +1790,650 @@ def extract_comments(comments):
     return extracted
 
 def replace_subreddit_mentions(text, en_name, pl_name):
-    """No-op for English version, just return the text unchanged."""
-    return text
+    """Replace all r/EnglishSubreddit with r/LocalizedSubreddit in the given text."""
+    if not text or en_name == pl_name:
+        return text
+    return text.replace(f"r/{en_name}", f"r/{pl_name}")
 
 # ---------------------------------------------------------------
-# Main Script Entry Point
+# Language Profiles (one fetched thread -> one video per profile)
 # ---------------------------------------------------------------
-if __name__ == "__main__":
-    # How many videos do you want to generate? Set x!
-    x = 30
-    generated = 0
-    attempts = 0
-    while generated < x:
-        attempts += 1
-        print(f"\n--- Attempt {attempts} | Successful videos: {generated}/{x} ---")
-        try:
-            post_title, op_message, top_comments, subreddit_name = fetch_reddit_post()
-            if post_title or top_comments:
-                if post_title and len(post_title) > 200:
-                    print("Skipped thread due to long title.")
-                    save_used_thread(post_title)
-                    continue
+# Everything that changes between language variants lives here.
+# Add a new dict to render another language from the same thread!
+LANGUAGE_PROFILES = {
+    "en": {
+        "code": "en",
+        "tts_language_code": "en-US",
+        "tts_voice_name": "en-US-Wavenet-D",  # US English male, natural and clear!
+        "tts_speaking_rate": 1.08,  # Slightly faster, tweak if you want!
+        "tts_backend": "google",  # or "espeak"/"piper" for local, offline synthesis
+        "espeak_voice": "en-us",
+        "piper_model": None,  # path to a Piper .onnx voice, e.g. "voices/en_US-ryan-medium.onnx"
+        "whisper_model": "base",
+        "whisper_language": "en",
+        "whisper_beam_size": 5,  # Lower (or model "tiny") for speed; see benchmark.py --captions
+        "word_timing_backend": "whisper",  # or "energy": no ASR at all, milliseconds per clip
+        "rewrite": rewrite_content_for_engagement,
+        "subreddit_translations": {},
+        "subtitle_stroke_width": 16,
+        "subtitle_delay": 0.01,
+        "output_dir": r"D:\autoedit\60\Reddit",
+        "used_threads_file": "used_threads.txt",
+    },
+    "pl": {
+        "code": "pl",
+        "tts_language_code": "pl-PL",
+        "tts_voice_name": "pl-PL-Wavenet-B",  # Best for AskReddit style!
+        "tts_speaking_rate": 1.08,
+        "tts_backend": "google",
+        "espeak_voice": "pl",
+        "piper_model": None,
+        "whisper_model": "base",
+        "whisper_language": "pl",
+        "whisper_beam_size": 5,
+        "word_timing_backend": "whisper",
+        "rewrite": translate_content_to_polish,
+        "subreddit_translations": SUBREDDIT_PL_TRANSLATIONS,
+        "subtitle_stroke_width": 10,
+        "subtitle_delay": 0.0,
+        "output_dir": r"D:\autoedit\60\RedditPL",
+        "used_threads_file": "used_threads_pl.txt",
+    },
+}
+DEFAULT_PROFILES = ["en", "pl"]
+
+def build_variant(profile, post_title, op_message, top_comments, subreddit_name, layers, manifest=None, plan_only=False):
+    """
+    Rewrite the fetched thread with the profile's prompt and render it.
+    Stages are timed under their own telemetry job, summarized in
+    <video>_telemetry.json next to the tags file.
+    The rewritten script is checkpointed in the job `manifest`, so a
+    resumed job never pays for the same rewrite twice.
+    Returns the video path (the timeline's with `plan_only`), or None if
+    the variant was skipped.
+    """
+    thread_job = telemetry.current_job()
+    job_name = f"{thread_job['name']}_{profile['code']}" if thread_job else profile["code"]
+    with telemetry.job(job_name, language=profile["code"], subreddit=subreddit_name) as video_job:
+        return _build_variant(
+            profile, post_title, op_message, top_comments, subreddit_name, layers, video_job, manifest, plan_only
+        )
 
-                print("Rewriting content for engagement via OpenAI...")
-                rewritten_title, rewritten_op_message, rewritten_comments, tiktok_filename, tiktok_tags = rewrite_content_for_engagement(
-                    post_title, op_message, top_comments
-                )
+def rewrite_variant_script(profile, post_title, op_message, top_comments, manifest=None):
+    """The profile's rewrite of the thread, from the manifest if we already paid for it."""
+    code = profile["code"]
+    if manifest and job_manifest.stage_done(manifest, code, "rewrite"):
+        print(f"[{code}] Reusing checkpointed rewrite.")
+        script = job_manifest.variant_record(manifest, code)["script"]
+        return script["title"], script["op_message"], script["comments"], script["filename"], script["tags"]
+
+    print(f"[{code}] Rewriting content via OpenAI...")
+    with telemetry.stage("rewrite"):
+        script = job_manifest.retry_transient(
+            profile["rewrite"], post_title, op_message, top_comments, label=f"{code} rewrite"
+        )
+    if manifest:
+        title, op, comments, filename, tags = script
+        job_manifest.variant_record(manifest, code)["script"] = {
+            "title": title, "op_message": op, "comments": comments, "filename": filename, "tags": tags,
+        }
+        job_manifest.mark_stage(manifest, code, "rewrite")
+    return script
+
+def _build_variant(profile, post_title, op_message, top_comments, subreddit_name, layers, video_job, manifest=None,
+                   plan_only=False):
+    rewritten_title, rewritten_op_message, rewritten_comments, tiktok_filename, tiktok_tags = rewrite_variant_script(
+        profile, post_title, op_message, top_comments, manifest
+    )
 
-                display_title = f"[r/{subreddit_name}] {rewritten_title}" if rewritten_title else ""
-                if rewritten_op_message and rewritten_op_message.strip():
-                    op_comment = f"OP: {rewritten_op_message.strip()}"
-                    comments_for_video = [op_comment] + rewritten_comments
-                else:
-                    comments_for_video = rewritten_comments
-
-                output_dir = r"D:\autoedit\60\Reddit"
-                if not os.path.exists(output_dir):
-                    os.makedirs(output_dir)
-                # Ensure filename is safe and unique
-                safe_filename = "".join(c for c in tiktok_filename if c.isalnum() or c in ('_', '-')).rstrip()
-                base_filename = safe_filename[:60] or "reddit_video"
-                video_path = os.path.join(output_dir, f"{base_filename}.mp4")
-                tags_path = os.path.join(output_dir, f"{base_filename}_tags.txt")
-
-                # Pass the video_path to create_video so it saves with the AI filename
-                create_video(display_title, comments_for_video, output_filename=video_path)
-
-                # Save tags and title for upload
-                with open(tags_path, "w", encoding="utf-8") as f:
-                    f.write(f"Title: {rewritten_title}\n")
-                    f.write("Tags: " + ", ".join(f"#{tag}" for tag in tiktok_tags) + "\n")
+    local_subreddit = profile["subreddit_translations"].get(subreddit_name, subreddit_name)
+    rewritten_title = replace_subreddit_mentions(rewritten_title, subreddit_name, local_subreddit)
+    if rewritten_op_message:
+        rewritten_op_message = replace_subreddit_mentions(rewritten_op_message, subreddit_name, local_subreddit)
+    rewritten_comments = [
+        replace_subreddit_mentions(c, subreddit_name, local_subreddit) for c in rewritten_comments
+    ]
+
+    display_title = f"[r/{local_subreddit}] {rewritten_title}" if rewritten_title else ""
+    if rewritten_op_message and rewritten_op_message.strip():
+        op_comment = f"OP: {rewritten_op_message.strip()}"
+        comments_for_video = [op_comment] + rewritten_comments
+    else:
+        comments_for_video = rewritten_comments
 
+    output_dir = profile["output_dir"]
+    if not os.path.exists(output_dir):
+        os.makedirs(output_dir)
+    # Ensure filename is safe and unique
+    safe_filename = "".join(c for c in tiktok_filename if c.isalnum() or c in ('_', '-')).rstrip()
+    base_filename = safe_filename[:60] or "reddit_video"
+    video_path = os.path.join(output_dir, f"{base_filename}.mp4")
+    tags_path = os.path.join(output_dir, f"{base_filename}_tags.txt")
+    telemetry_path = os.path.join(output_dir, f"{base_filename}_telemetry.json")
+
+    # Pass the video_path to create_video so it saves with the AI filename
+    written_path = create_video(
+        display_title, comments_for_video, output_filename=video_path, profile=profile, layers=layers,
+        manifest=manifest, plan_only=plan_only
+    )
+    if not written_path:
+        return None
+
+    # Save tags and title for upload
+    with open(tags_path, "w", encoding="utf-8") as f:
+        f.write(f"Title: {rewritten_title}\n")
+        f.write("Tags: " + ", ".join(f"#{tag}" for tag in tiktok_tags) + "\n")
+    video_job["meta"]["timeline" if plan_only else "video"] = written_path
+    telemetry.write_job_summary(video_job, telemetry_path)
+    stage_profiler.write_job_profile(video_job, os.path.join(output_dir, base_filename))
+    return written_path
+
+def process_thread(profiles, manifest=None, claim_thread=None, exclude_titles=None, plan_only=False):
+    """
+    Fetch one thread and render it once per language profile, sharing
+    the decoded layers between variants.
+    Every fetched thread gets a job manifest; pass a `manifest` from
+    job_manifest.incomplete_jobs() to resume a crashed job instead of
+    fetching a new thread.
+    `claim_thread(title, thread)` (queue workers) must return True before
+    a freshly fetched thread is used; False means another worker has it.
+    With `plan_only`, only timelines are built and the job is left
+    "planned" for render_planned_jobs() (or any later batch) to render.
+    Returns the list of written videos, or None if we should stop the
+    batch (no background videos available).
+    A freshly fetched thread's outcome and time go into its subreddit's
+    yield record.
+    """
+    layers = None
+    attempt = None  # Yield record of a freshly fetched thread: {"subreddit", "start", "outcome"}
+    try:
+        if manifest is None:
+            attempt_start = time.perf_counter()
+            with telemetry.stage("fetch"):
+                post_title, op_message, top_comments, subreddit_name = fetch_reddit_post(
+                    profiles, exclude_titles=exclude_titles
+                )
+            # fetch_reddit_post recorded its own rejections
+            attempt = {"subreddit": subreddit_name, "start": attempt_start, "outcome": None}
+            if not (post_title or top_comments):
+                print("Failed to fetch any Reddit content.")
+                return []
+            if post_title and len(post_title) > 200:
+                print("Skipped thread due to long title.")
+                save_used_thread(post_title)
+                attempt["outcome"] = "long_title"
+                return []
+            thread = {"title": post_title, "selftext": op_message, "comments": top_comments, "subreddit": subreddit_name}
+            if claim_thread and not claim_thread(post_title or " ".join(top_comments), thread):
+                print("Another worker already claimed this thread. Skipping.")
                 if post_title:
                     save_used_thread(post_title)
-                generated += 1
-            else:
-                print("Failed to fetch any Reddit content.")
+                attempt["outcome"] = "claimed"
+                return []
+            attempt["outcome"] = "error"  # Until we know better
+            manifest = job_manifest.create_manifest(
+                post_title, op_message, top_comments, subreddit_name, [p["code"] for p in profiles]
+            )
+            # The manifest owns this thread now; never fetch it again
+            if post_title:
+                save_used_thread(post_title)
+        else:
+            thread = manifest["thread"]
+            post_title, op_message, top_comments, subreddit_name = (
+                thread["title"], thread["selftext"], thread["comments"], thread["subreddit"]
+            )
+            print(f"Resuming job {manifest['job_id']} (attempt {manifest['attempts']}): {post_title[:60]}")
+
+        with telemetry.stage("prepare_layers"):
+            layers = prepare_shared_layers(background_video_path=manifest["background"], plan_only=plan_only)
+        if layers is None:
+            attempt = None  # Not the thread's fault
+            return None
+        if manifest["background"] != layers["background_path"]:
+            manifest["background"] = layers["background_path"]
+            job_manifest.save_manifest(manifest)
+
+        written = []
+        failed = False
+        for profile in profiles:
+            try:
+                video_path = build_variant(
+                    profile, post_title, op_message, top_comments, subreddit_name, layers,
+                    manifest=manifest, plan_only=plan_only
+                )
+                if video_path:
+                    written.append(video_path)
+            except Exception as e:
+                failed = True
+                print(f"[{profile['code']}] Error building variant: {e}")
+                import traceback
+                traceback.print_exc()
+
+        # A failed variant leaves the job open, so the next run resumes it
+        if not failed:
+            job_manifest.finish_job(manifest, status="planned" if plan_only else "done")
+        if attempt:
+            attempt["outcome"] = len(written) or "no_video"
+        return written
+    finally:
+        release_shared_layers(layers)
+        if attempt:
+            outcome = attempt["outcome"]
+            subreddit_yield.record(
+                attempt["subreddit"],
+                rejection=outcome if isinstance(outcome, str) else None,
+                videos=outcome if isinstance(outcome, int) else 0,
+                seconds=time.perf_counter() - attempt["start"]
+            )
+
+def thread_manifest(thread_id, profile_codes):
+    """A job manifest for a specific thread id (the thread is marked used)."""
+    title, selftext, comments, subreddit_name = fetch_thread_by_id(thread_id)
+    if not comments:
+        raise ValueError(f"Thread {thread_id} has no usable comments")
+    manifest = job_manifest.create_manifest(title, selftext, comments, subreddit_name, profile_codes)
+    save_used_thread(title)
+    return manifest
+
+def script_manifest(script, profile_codes):
+    """
+    A job manifest for a ready-made script ({"title", "comments", and
+    optionally "op_message", "subreddit", "filename", "tags"}): the
+    rewrite stage is already done, so no OpenAI call is made.
+    """
+    title = script.get("title", "")
+    comments = list(script["comments"])
+    op_message = script.get("op_message", "")
+    manifest = job_manifest.create_manifest(
+        title, op_message, comments, script.get("subreddit", "AskReddit"), profile_codes
+    )
+    for code in profile_codes:
+        job_manifest.variant_record(manifest, code)["script"] = {
+            "title": title,
+            "op_message": op_message,
+            "comments": comments,
+            "filename": script.get("filename") or title or "reddit_video",
+            "tags": list(script.get("tags", [])),
+        }
+        job_manifest.mark_stage(manifest, code, "rewrite", source="submitted")
+    return manifest
+
+def render_planned_jobs():
+    """Render every job a plan-only batch left behind, from its stored timelines."""
+    planned = [m for m in job_manifest.incomplete_jobs() if m.get("status") == "planned"]
+    print(f"Rendering {len(planned)} planned job(s) with the '{RENDER_PROFILE}' profile.")
+    rendered = 0
+    with asset_pool.batch():
+        for manifest in planned:
+            profiles = [LANGUAGE_PROFILES[code] for code in manifest["profiles"]]
+            try:
+                with telemetry.job(f"render_{manifest['job_id']}"):
+                    written = process_thread(profiles, manifest=manifest)
+            except Exception as e:
+                print(f"Error rendering job {manifest['job_id']}: {e}")
+                import traceback
+                traceback.print_exc()
+                continue
+            if written is None:
+                break
+            rendered += len(written)
+    asset_pool.print_report()
+    print(f"Rendered {rendered} video(s).")
+
+def resumable_jobs():
+    """Unfinished job manifests worth another attempt (hopeless ones are marked failed)."""
+    manifests = []
+    for manifest in job_manifest.incomplete_jobs():
+        if manifest.get("attempts", 1) >= job_manifest.MAX_JOB_ATTEMPTS:
+            print(f"Giving up on job {manifest['job_id']} after {manifest['attempts']} attempts.")
+            job_manifest.finish_job(manifest, status="failed")
+            continue
+        manifests.append(manifest)
+    return manifests
+
+def run_batch(x=30, profile_codes=None, plan_only=False):
+    """
+    Generate `x` threads' worth of videos, one variant per language profile.
+    Each thread is fetched once, and backgrounds, overlay, music and the
+    transition sound come from the asset pool, so they're decoded once per
+    batch; only TTS, captions and encoding run per variant.
+    Jobs a previous run left unfinished (or only planned) are resumed first.
+    With `plan_only`, new threads only get as far as their timelines;
+    render them later with render_planned_jobs().
+    Batch throughput is logged to the telemetry log after every attempt.
+    """
+    profiles = [LANGUAGE_PROFILES[code] for code in (profile_codes or DEFAULT_PROFILES)]
+    pending_jobs = [] if plan_only else resumable_jobs()
+    if pending_jobs:
+        print(f"Resuming {len(pending_jobs)} unfinished job(s) first.")
+    generated = 0
+    attempts = 0
+    videos_written = 0
+    batch_start = time.perf_counter()
+    # Backgrounds, overlay, music and transition stay decoded between threads
+    with asset_pool.batch():
+        while generated < x:
+            attempts += 1
+            print(f"\n--- Attempt {attempts} | Successful threads: {generated}/{x} ---")
+            try:
+                manifest = pending_jobs.pop(0) if pending_jobs else None
+                if manifest is not None:
+                    manifest["attempts"] = manifest.get("attempts", 1) + 1
+                    job_manifest.save_manifest(manifest)
+                with telemetry.job(f"attempt{attempts}"):
+                    written = process_thread(profiles, manifest=manifest, plan_only=plan_only)
+                if written is None:
+                    break
+                if written:
+                    generated += 1
+                    videos_written += len(written)
+            except Exception as e:
+                print(f"Error during video generation attempt {attempts}: {e}")
+                print("Don't worry, skipping to the next one! 🚀")
+                import traceback
+                traceback.print_exc()
+            finally:
+                elapsed = time.perf_counter() - batch_start
+                telemetry.log_event(
+                    "batch_progress",
+                    attempts=attempts,
+                    threads=generated,
+                    videos=videos_written,
+                    elapsed_s=round(elapsed, 2),
+                    videos_per_hour=round(videos_written * 3600 / elapsed, 2) if elapsed > 0 else None,
+                    asset_pool=asset_pool.stats(),
+                    rate_limits=rate_limits.stats()
+                )
+    asset_pool.print_report()
+    rate_limits.print_report()
+    subreddit_yield.print_report(SUBREDDIT_CHOICES)
+    telemetry.log_event("subreddit_yield", **subreddit_yield.summary(SUBREDDIT_CHOICES))
+
+# ---------------------------------------------------------------
+# Render Farm: shared job queue
+# ---------------------------------------------------------------
+# One machine: "sqlite:job_queue.sqlite3". Several: run `queue-server` on
+# one node and point every worker at it, e.g. "http://queue-node:8766"
+QUEUE_URL = job_queue.DEFAULT_QUEUE_URL
+WORKER_CONCURRENCY = 1  # Worker processes per machine
+
+def submit_queue_batch(x=30, profile_codes=None, queue_url=None):
+    """Queue `x` threads' worth of videos for the workers. Returns the batch id."""
+    broker = job_queue.open_broker(queue_url or QUEUE_URL)
+    batch_id = job_queue.submit_batch(broker, x, {"profiles": list(profile_codes or DEFAULT_PROFILES)})
+    print(f"Queued batch {batch_id}: {x} thread(s).")
+    return batch_id
+
+def queue_job_manifest(job):
+    """
+    The manifest for a queue job that already claimed a thread (a lease
+    that expired on another worker): the local checkpoint if this machine
+    has one, otherwise a fresh manifest from the thread stored in the queue.
+    """
+    thread = (job.get("progress") or {}).get("thread")
+    if not thread:
+        return None
+    job_id = job_manifest.job_id_for_thread(thread["title"] or " ".join(thread["comments"]))
+    path = job_manifest.manifest_path(job_id)
+    if os.path.exists(path):
+        manifest = job_manifest.load_manifest(path)
+        manifest["attempts"] = manifest.get("attempts", 1) + 1
+        job_manifest.save_manifest(manifest)
+        return manifest
+    return job_manifest.create_manifest(
+        thread["title"], thread["selftext"], thread["comments"], thread["subreddit"], job["payload"]["profiles"]
+    )
+
+def run_queue_job(broker, job, worker):
+    """
+    Work one leased queue job, heartbeating while it runs.
+    Returns the written videos, or None if this worker should stop.
+    """
+    profiles = [LANGUAGE_PROFILES[code] for code in job["payload"].get("profiles") or DEFAULT_PROFILES]
+    print(f"\n--- Queue job {job['job_id']} (attempt {job['attempts']}) on {worker} ---")
+    written = []
+    with job_queue.Heartbeat(broker, job, worker) as heartbeat:
+        def claim_thread(title, thread):
+            if not broker.claim_thread(title, job["job_id"], worker):
+                return False
+            heartbeat.update(stage="render", thread=thread)
+            return True
+
+        try:
+            manifest = queue_job_manifest(job)
+            heartbeat.update(stage="render" if manifest else "fetch")
+            with telemetry.job(f"queue_{job['job_id']}"):
+                written = process_thread(
+                    profiles, manifest=manifest, claim_thread=claim_thread,
+                    exclude_titles=broker.claimed_threads()
+                )
         except Exception as e:
-            print(f"Error during video generation attempt {attempts}: {e}")
-            print("Don't worry, skipping to the next one! 🚀")
+            print(f"Error in queue job {job['job_id']}: {e}")
             import traceback
             traceback.print_exc()
-            continue
+
+    if written is None:
+        broker.release(job["job_id"], worker, progress=heartbeat.progress)
+    elif written:
+        broker.complete(job["job_id"], worker, result={"videos": written, "worker": worker})
+    elif job["attempts"] >= job_queue.MAX_SLOT_ATTEMPTS:
+        print(f"Giving up on queue job {job['job_id']} after {job['attempts']} attempts.")
+        broker.complete(job["job_id"], worker, status="failed")
+    else:
+        broker.release(job["job_id"], worker, progress=heartbeat.progress)
+    return written
+
+def run_worker(queue_url=None):
+    """
+    Pull jobs from the shared queue until it has nothing queued or leased
+    left. Run one per process, on as many machines as you like.
+    """
+    broker = job_queue.open_broker(queue_url or QUEUE_URL)
+    worker = job_queue.worker_name()
+    videos_written = 0
+    worker_start = time.perf_counter()
+    with asset_pool.batch():
+        while True:
+            job = broker.claim(worker)
+            if job is None:
+                counts = broker.counts()
+                if not counts.get("queued") and not counts.get("leased"):
+                    break
+                time.sleep(job_queue.POLL_SECONDS)  # Others still working; their leases may expire
+                continue
+            written = run_queue_job(broker, job, worker)
+            if written is None:
+                break
+            videos_written += len(written)
+            elapsed = time.perf_counter() - worker_start
+            telemetry.log_event(
+                "worker_progress",
+                worker=worker,
+                job=job["job_id"],
+                videos=videos_written,
+                elapsed_s=round(elapsed, 2),
+                videos_per_hour=round(videos_written * 3600 / elapsed, 2) if elapsed > 0 else None,
+                queue=broker.counts()
+            )
+    asset_pool.print_report()
+    print(f"Worker {worker} done: {videos_written} video(s). Queue: {broker.counts()}")
+
+def run_workers(concurrency=None, queue_url=None):
+    """Run `concurrency` worker processes on this machine (WORKER_CONCURRENCY by default)."""
+    import multiprocessing
+    concurrency = concurrency or WORKER_CONCURRENCY
+    if concurrency <= 1:
+        run_worker(queue_url)
+        return
+    processes = [multiprocessing.Process(target=run_worker, args=(queue_url,)) for _ in range(concurrency)]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+
+def serve_queue(host="127.0.0.1", port=job_queue.QUEUE_SERVER_PORT, queue_url=None, insecure=False):
+    """Serve this node's queue (a sqlite: URL) to workers on other machines."""
+    queue_url = queue_url or QUEUE_URL
+    if not queue_url.startswith("sqlite:"):
+        raise ValueError(f"queue-server serves a local sqlite: queue, not {queue_url}")
+    job_queue.serve_broker(job_queue.open_broker(queue_url), host, port, insecure=insecure)
+
+def print_queue_status(queue_url=None):
+    broker = job_queue.open_broker(queue_url or QUEUE_URL)
+    print(f"Queue {queue_url or QUEUE_URL}: {broker.counts()}")
+    for job in broker.jobs("leased"):
+        progress = job["progress"] or {}
+        title = (progress.get("thread") or {}).get("title") or ""
+        print(f"  {job['job_id']} on {job['worker']} ({progress.get('stage', '?')}) {title[:60]}")
+
+# ---------------------------------------------------------------
+# Command Line
+# ---------------------------------------------------------------
+def print_stats():
+    """Used threads, jobs, timelines, calibration and queue at a glance (no heavy imports)."""
+    print(f"Used threads: {len(load_used_threads())}")
+    if os.path.exists(title_index.TITLE_INDEX_FILE):
+        print(f"Title index: {len(title_index.TitleIndex.load())} titles "
+              f"(near-duplicate threshold {NEAR_DUPLICATE_THRESHOLD})")
+    counts = job_manifest.job_counts()
+    print("Jobs: " + (", ".join(f"{status} {n}" for status, n in sorted(counts.items())) or "none"))
+    timelines = os.listdir(TIMELINE_ROOT) if os.path.isdir(TIMELINE_ROOT) else []
+    print(f"Stored timelines: {len(timelines)}")
+    print(f"TTS calibration buckets: {len(TTS_CALIBRATION)}")
+    if os.path.exists(subreddit_yield.YIELD_FILE):
+        subreddit_yield.print_report(SUBREDDIT_CHOICES)
+    # The mixer's setting if it's loaded, else its default (stats shouldn't import NumPy)
+    pcm_cache_dir = getattr(sys.modules.get("audio_mixer"), "PCM_CACHE_DIR", "pcm_cache")
+    if os.path.isdir(pcm_cache_dir):
+        cached = [os.path.join(pcm_cache_dir, f) for f in os.listdir(pcm_cache_dir)]
+        size_mb = sum(os.path.getsize(f) for f in cached) / 1e6
+        print(f"PCM cache: {len(cached)} file(s), {size_mb:.1f} MB")
+    scheme, _, location = QUEUE_URL.partition(":")
+    if scheme != "sqlite" or os.path.exists(location):
+        try:
+            print(f"Queue {QUEUE_URL}: {job_queue.open_broker(QUEUE_URL).counts()}")
+        except OSError as e:
+            print(f"Queue {QUEUE_URL}: unreachable ({e})")
+
+def print_thread(profiles):
+    """Fetch a thread the way a batch would and show it (nothing is rendered)."""
+    title, selftext, comments, subreddit_name = fetch_reddit_post(profiles, record_yield=False)
+    if not (title or comments):
+        print("Nothing usable found.")
+        return
+    print(f"\n[r/{subreddit_name}] {title}")
+    if selftext:
+        print(f"OP: {selftext[:300]}")
+    for comment in comments:
+        print(f"  - {comment}")
+
+def build_parser():
+    import argparse
+    parser = argparse.ArgumentParser(description="Reddit-to-TikTok video generator.")
+    parser.add_argument("--profiles", default=",".join(DEFAULT_PROFILES),
+                        help="Comma-separated language profiles (default: %(default)s).")
+    parser.add_argument("--render-profile", choices=sorted(RENDER_PROFILES), default=None,
+                        help=f"Encoder settings (default: {RENDER_PROFILE}).")
+    parser.add_argument("--outputs", default="",
+                        help=f"Encode these variants in one pass ({', '.join(OUTPUT_PRESETS)}); default: one video.")
+    parser.add_argument("--profile-stages", default="",
+                        help="Sample these telemetry stages (e.g. encode,subtitle_build) and write flamegraphs.")
+    parser.add_argument("--profile-jobs", default="",
+                        help="Sample only jobs matching these patterns (e.g. 'attempt3*'); all stages unless --profile-stages.")
+    parser.add_argument("--profile-interval", type=float, default=None, help="Seconds between profile samples.")
+    commands = parser.add_subparsers(dest="command")
+
+    batch = commands.add_parser("batch", help="Fetch, rewrite, synthesize and render N threads (the default).")
+    batch.add_argument("count", type=int, nargs="?", default=30)
+    plan = commands.add_parser("plan", help="Build timelines for N threads without rendering.")
+    plan.add_argument("count", type=int, nargs="?", default=30)
+    render = commands.add_parser("render", help="Render a stored timeline, or every planned job.")
+    render.add_argument("timeline", help="timeline.json / timeline dir, or 'planned'")
+    render.add_argument("profile", nargs="?", choices=sorted(RENDER_PROFILES), help="Render profile.")
+    fetch = commands.add_parser("fetch", help="Show the thread a batch would pick next, or check a title.")
+    fetch.add_argument("--used", metavar="TITLE", help="Only check whether this title was used already.")
+    commands.add_parser("stats", help="Used threads, jobs, timelines, caches and queue.")
+
+    submit = commands.add_parser("submit", help="Queue N threads for render-farm workers.")
+    submit.add_argument("count", type=int, nargs="?", default=30)
+    submit.add_argument("queue_url", nargs="?")
+    worker = commands.add_parser("worker", help="Work the shared queue with N processes.")
+    worker.add_argument("processes", type=int, nargs="?")
+    worker.add_argument("queue_url", nargs="?")
+    queue_status = commands.add_parser("queue-status", help="Show the shared queue.")
+    queue_status.add_argument("queue_url", nargs="?")
+    queue_server = commands.add_parser("queue-server", help="Serve this node's sqlite queue to other machines.")
+    queue_server.add_argument("queue_url", nargs="?", help="Local sqlite: queue to serve (default: QUEUE_URL).")
+    queue_server.add_argument("--host", default="127.0.0.1",
+                              help="Address to listen on; use 0.0.0.0 for other machines (needs JOB_QUEUE_TOKEN).")
+    queue_server.add_argument("--port", type=int, default=job_queue.QUEUE_SERVER_PORT)
+    queue_server.add_argument("--insecure", action="store_true",
+                              help="Allow listening beyond localhost without JOB_QUEUE_TOKEN.")
+    return parser
+
+def main(argv=None):
+    global RENDER_PROFILE, OUTPUT_SPECS
+    startup_seconds = time.perf_counter() - _ENGINE_LOAD_START
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.outputs:
+        names = [name.strip() for name in args.outputs.split(",") if name.strip()]
+        unknown = [name for name in names if name not in OUTPUT_PRESETS]
+        if unknown:
+            parser.error(f"Unknown outputs: {', '.join(unknown)}. Choose from: {', '.join(OUTPUT_PRESETS)}")
+        OUTPUT_SPECS = [OUTPUT_PRESETS[name] for name in names]
+    profile_codes = [code.strip() for code in args.profiles.split(",") if code.strip()]
+    stage_profiler.configure(
+        {name.strip() for name in args.profile_stages.split(",") if name.strip()},
+        {pattern.strip() for pattern in args.profile_jobs.split(",") if pattern.strip()},
+        args.profile_interval
+    )
+    if getattr(args, "profile", None) or args.render_profile:
+        RENDER_PROFILE = getattr(args, "profile", None) or args.render_profile
+    command = args.command or "batch"
+    try:
+        if command == "batch":
+            # Every thread is rendered once per profile, with the RENDER_PROFILE
+            # encoder settings ("draft" for quick previews).
+            run_batch(getattr(args, "count", 30), profile_codes)
+        elif command == "plan":
+            run_batch(args.count, profile_codes, plan_only=True)
+        elif command == "render" and args.timeline == "planned":
+            render_planned_jobs()
+        elif command == "render":
+            rerender_timeline(args.timeline, RENDER_PROFILE if (args.profile or args.render_profile) else "final")
+        elif command == "fetch" and args.used:
+            used = args.used.strip() in load_used_threads()
+            match = None if used else near_duplicate_of(args.used)
+            if match:
+                print(f"Near-duplicate ({match[1]:.0%} similar) of used thread: {match[0]}")
+            else:
+                print(f"{'Used' if used else 'Not used'}: {args.used.strip()}")
+        elif command == "fetch":
+            print_thread([LANGUAGE_PROFILES[code] for code in profile_codes])
+        elif command == "stats":
+            print_stats()
+        elif command == "submit":
+            submit_queue_batch(args.count, profile_codes, args.queue_url)
+        elif command == "worker":
+            run_workers(args.processes, args.queue_url)
+        elif command == "queue-status":
+            print_queue_status(args.queue_url)
+        elif command == "queue-server":
+            try:
+                serve_queue(args.host, args.port, args.queue_url, args.insecure)
+            except ValueError as e:
+                parser.error(str(e))
+    finally:
+        lazy_imports.report(startup_seconds)
+
+# ---------------------------------------------------------------
+# Main Script Entry Point
+# ---------------------------------------------------------------
+if __name__ == "__main__":
+    # python Redditcontentlocal.py                 -> batch of 30 (see `batch -h`)
+    # python Redditcontentlocal.py -h              -> all subcommands
+    main()
 
 # ---------------------------------------------------------------
 # End of script! Go make some viral videos! 😎
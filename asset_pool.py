@@ -0,0 +1,124 @@
+# ---------------------------------------------------------------
+# Shared Asset Pool ♻️
+# ---------------------------------------------------------------
+# One process-wide pool for the inputs every video needs: background
+# videos, the keyed follow overlay, the music bed and the sped-up
+# transition sound. Each is opened/decoded once and handed out to
+# every job that asks for it, with a reference count.
+#
+#   with asset_pool.batch():
+#       music = asset_pool.acquire(("audio", path), lambda: AudioFileClip(path))
+#       ...  # use time-sliced views: music.subclip(...), .set_start(...)
+#       asset_pool.release(("audio", path))
+#
+# Inside a batch, an asset nobody uses any more stays open for the next
+# job (up to MAX_IDLE_ASSETS of them); outside a batch it's closed as
+# soon as its last user releases it. Jobs must never close pooled
+# clips themselves, only release them.
+# ---------------------------------------------------------------
+
+import time
+from contextlib import contextmanager
+
+# Idle assets kept open during a batch (each video reader is an ffmpeg process)
+MAX_IDLE_ASSETS = 6
+
+_assets = {}       # key -> entry (see acquire)
+_batch_depth = 0
+_stats = {"opens": 0, "reuses": 0, "open_seconds": 0.0, "saved_seconds": 0.0}
+
+def acquire(key, opener, closer=None):
+    """
+    Return the pooled asset for `key`, opening it with opener() on first use.
+    `closer(asset)` is called once the asset is retired (default: asset.close()).
+    Every acquire must be paired with a release(key).
+    """
+    entry = _assets.get(key)
+    if entry is not None:
+        entry["refs"] += 1
+        entry["reuses"] += 1
+        entry["last_used"] = time.monotonic()
+        _stats["reuses"] += 1
+        _stats["saved_seconds"] += entry["open_seconds"]
+        return entry["asset"]
+
+    start = time.perf_counter()
+    asset = opener()
+    open_seconds = time.perf_counter() - start
+    _assets[key] = {
+        "asset": asset,
+        "closer": closer,
+        "refs": 1,
+        "reuses": 0,
+        "open_seconds": open_seconds,
+        "last_used": time.monotonic(),
+    }
+    _stats["opens"] += 1
+    _stats["open_seconds"] += open_seconds
+    return asset
+
+def release(key):
+    """Drop one reference; the asset is retired when it's unused (and no batch wants it)."""
+    entry = _assets.get(key)
+    if entry is None:
+        return
+    entry["refs"] = max(0, entry["refs"] - 1)
+    entry["last_used"] = time.monotonic()
+    if entry["refs"] == 0:
+        if _batch_depth == 0:
+            _retire(key)
+        else:
+            _trim_idle()
+
+def _retire(key):
+    entry = _assets.pop(key)
+    try:
+        if entry["closer"] is not None:
+            entry["closer"](entry["asset"])
+        else:
+            entry["asset"].close()
+    except Exception as e:
+        print(f"Error closing pooled asset {key}: {e}")
+
+def _trim_idle():
+    idle = sorted((e["last_used"], k) for k, e in _assets.items() if e["refs"] == 0)
+    for _, key in idle[:max(0, len(idle) - MAX_IDLE_ASSETS)]:
+        _retire(key)
+
+@contextmanager
+def batch():
+    """Keep released assets open for the next job until the batch ends."""
+    global _batch_depth
+    _batch_depth += 1
+    try:
+        yield
+    finally:
+        _batch_depth -= 1
+        if _batch_depth == 0:
+            for key in [k for k, e in _assets.items() if e["refs"] == 0]:
+                _retire(key)
+
+def note_decode(seconds, reused=False):
+    """
+    Account for decode work done lazily inside an asset (e.g. memoized
+    overlay frames): `reused=True` means a cached result saved `seconds`.
+    """
+    if reused:
+        _stats["saved_seconds"] += seconds
+    else:
+        _stats["open_seconds"] += seconds
+
+def stats():
+    """How much opening/decoding the pool did, and how much it saved."""
+    return {
+        "opens": _stats["opens"],
+        "reuses": _stats["reuses"],
+        "open_seconds": round(_stats["open_seconds"], 3),
+        "saved_seconds": round(_stats["saved_seconds"], 3),
+        "live_assets": len(_assets),
+    }
+
+def print_report():
+    s = stats()
+    print(f"Asset pool: {s['opens']} opens, {s['reuses']} reuses, "
+          f"{s['open_seconds']:.1f}s spent decoding, ~{s['saved_seconds']:.1f}s saved.")
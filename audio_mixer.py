@@ -0,0 +1,124 @@
+# ---------------------------------------------------------------
+# Soundtrack Mixer 🎚️
+# ---------------------------------------------------------------
+# Renders a video's whole soundtrack (TTS clips, transition sounds and
+# the looping music bed) into one float32 PCM array, in one go, instead
+# of letting MoviePy re-evaluate a tree of composite/looped/volumex
+# clips chunk by chunk while the video encodes.
+#
+# The music loops by slicing and is ducked under speech, using the TTS
+# segment boundaries we already know from the timeline.
+#
+# Sources every video uses (music bed, transition sound) are decoded
+# once into pcm_cache/ as .npy files, keyed by a hash of the source file
+# and the sample format, and memory-mapped from then on: no decoder
+# process, and the mixer reads slices straight from the page cache.
+# ---------------------------------------------------------------
+
+import hashlib
+import os
+
+import numpy as np
+
+import lazy_imports
+
+MIX_SAMPLE_RATE = 44100
+MIX_CHANNELS = 2
+
+PCM_CACHE_DIR = "pcm_cache"
+
+# Music volume multiplier while someone is talking (1.0 = no ducking)
+MUSIC_DUCK_GAIN = 0.5
+# Fade into/out of the ducked level over this long
+MUSIC_DUCK_RAMP = 0.08  # seconds
+
+def decode_pcm(path, sample_rate=MIX_SAMPLE_RATE, channels=MIX_CHANNELS):
+    """Decode any audio file to a float32 (samples, channels) array in [-1, 1]."""
+    audio = lazy_imports.load("pydub").AudioSegment.from_file(path)
+    audio = audio.set_frame_rate(sample_rate).set_channels(channels).set_sample_width(2)
+    samples = np.array(audio.get_array_of_samples(), dtype=np.float32)
+    return samples.reshape(-1, channels) / 32768.0
+
+def _source_hash(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()[:20]
+
+def cached_pcm(path, sample_rate=MIX_SAMPLE_RATE, channels=MIX_CHANNELS, variant="", decode=None):
+    """
+    Decoded PCM for `path` as a read-only memory map of a cached .npy file,
+    decoding it (with decode(), default decode_pcm) the first time this
+    exact source file is used at this sample rate/channel count.
+    `variant` tells apart different processings of the same source
+    (e.g. a sped-up transition).
+    """
+    name = f"{_source_hash(path)}_{sample_rate}_{channels}{'_' + variant if variant else ''}.npy"
+    cache_path = os.path.join(PCM_CACHE_DIR, name)
+    if not os.path.exists(cache_path):
+        print(f"Caching decoded audio of {os.path.basename(path)}...")
+        pcm = decode() if decode else decode_pcm(path, sample_rate, channels)
+        os.makedirs(PCM_CACHE_DIR, exist_ok=True)
+        tmp_path = cache_path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            np.save(f, np.ascontiguousarray(pcm, dtype=np.float32))
+        os.replace(tmp_path, cache_path)
+    return np.load(cache_path, mmap_mode="r")
+
+def pcm_duration(pcm, sample_rate=MIX_SAMPLE_RATE):
+    return len(pcm) / sample_rate
+
+def _moving_average(values, window):
+    """Box-filter `values` (edge-padded, same length) in O(n) with a cumulative sum."""
+    if window <= 1 or len(values) == 0:
+        return values
+    left, right = window // 2, window - window // 2 - 1
+    padded = np.concatenate([np.full(left, values[0]), values, np.full(right, values[-1])])
+    sums = np.concatenate([[0.0], np.cumsum(padded, dtype=np.float64)])
+    return ((sums[window:] - sums[:-window]) / window).astype(np.float32)
+
+def duck_envelope(n_samples, speech_ranges, duck_gain=MUSIC_DUCK_GAIN, ramp_samples=0):
+    """
+    Per-sample gain for the music bed: 1.0 in the gaps, `duck_gain` under
+    every (start, end) sample range of speech, with linear ramps between.
+    """
+    envelope = np.ones(n_samples, dtype=np.float32)
+    for start, end in speech_ranges:
+        envelope[max(0, start):min(n_samples, end)] = duck_gain
+    return _moving_average(envelope, ramp_samples)
+
+def mix_soundtrack(duration, segments, music=None, music_gain=1.0,
+                   duck_gain=MUSIC_DUCK_GAIN, duck_ramp=MUSIC_DUCK_RAMP, sample_rate=MIX_SAMPLE_RATE):
+    """
+    Mix everything into one (samples, channels) float32 array.
+    `segments` is a list of dicts: {"pcm", "start" (seconds), "gain", "speech" (bool)}.
+    `music` (if given) is looped to fill the whole duration and ducked
+    under the speech segments.
+    """
+    n_samples = int(round(duration * sample_rate))
+    mix = np.zeros((n_samples, MIX_CHANNELS), dtype=np.float32)
+    speech_ranges = []
+    for segment in segments:
+        start = int(round(segment["start"] * sample_rate))
+        if start >= n_samples:
+            continue
+        pcm = segment["pcm"][:n_samples - start]
+        mix[start:start + len(pcm)] += pcm * segment.get("gain", 1.0)
+        if segment.get("speech"):
+            speech_ranges.append((start, start + len(pcm)))
+
+    if music is not None and len(music):
+        envelope = None
+        if speech_ranges and duck_gain != 1.0:
+            envelope = duck_envelope(n_samples, speech_ranges, duck_gain, int(duck_ramp * sample_rate))[:, None]
+        # Loop the bed one slice at a time (slices of a memory map are views)
+        for start in range(0, n_samples, len(music)):
+            end = min(n_samples, start + len(music))
+            piece = music[:end - start] * music_gain
+            if envelope is not None:
+                piece *= envelope[start:end]
+            mix[start:end] += piece
+
+    np.clip(mix, -1.0, 1.0, out=mix)
+    return mix
@@ -0,0 +1,130 @@
+# ---------------------------------------------------------------
+# Background Asset Index 🗂️
+# ---------------------------------------------------------------
+# Scans the background videos once and remembers what we need to cut
+# them up quickly: duration, fps, resolution and keyframe timestamps.
+# Stored in background_index.json and only re-scanned when a file's
+# size or modification time changes.
+#
+# With the keyframes known, every video can start at a random
+# keyframe-aligned offset (instead of the same parkour frames every
+# time), and seeking there doesn't decode from an earlier keyframe.
+# ---------------------------------------------------------------
+
+import json
+import os
+import random
+import re
+import shutil
+import subprocess
+
+import lazy_imports
+
+INDEX_FILE = "background_index.json"
+INDEX_VERSION = 1
+PROBE_TIMEOUT = 600  # seconds, keyframe scans of long sources take a while
+
+_index = None  # Loaded once per process
+
+def _file_signature(path):
+    stat = os.stat(path)
+    return {"size": stat.st_size, "mtime": int(stat.st_mtime)}
+
+def scan_keyframes(path):
+    """Timestamps (seconds) of every keyframe in the first video stream."""
+    ffprobe = shutil.which("ffprobe")
+    if ffprobe:
+        result = subprocess.run(
+            [ffprobe, "-v", "error", "-select_streams", "v:0", "-skip_frame", "nokey",
+             "-show_entries", "frame=pts_time", "-of", "csv=p=0", path],
+            capture_output=True, text=True, timeout=PROBE_TIMEOUT
+        )
+        times = [float(line.strip().rstrip(",")) for line in result.stdout.splitlines()
+                 if line.strip().rstrip(",") not in ("", "N/A")]
+    else:
+        # No ffprobe: let MoviePy's ffmpeg decode keyframes only and log them
+        result = subprocess.run(
+            [lazy_imports.load("moviepy.config").get_setting("FFMPEG_BINARY"), "-hide_banner", "-skip_frame", "nokey", "-i", path,
+             "-an", "-vf", "showinfo", "-f", "null", "-"],
+            capture_output=True, text=True, timeout=PROBE_TIMEOUT
+        )
+        times = [float(t) for t in re.findall(r"pts_time:\s*([0-9.]+)", result.stderr)]
+    return sorted(set(round(t, 3) for t in times))
+
+def probe_video(path):
+    """Index entry for one video: duration, fps, resolution and keyframes."""
+    infos = lazy_imports.load("moviepy.video.io.ffmpeg_reader").ffmpeg_parse_infos(path)
+    width, height = infos.get("video_size") or (None, None)
+    try:
+        keyframes = scan_keyframes(path)
+    except (OSError, subprocess.SubprocessError, ValueError) as e:
+        print(f"Warning: Could not scan keyframes of {path}: {e}")
+        keyframes = []
+    return {
+        **_file_signature(path),
+        "duration": infos.get("duration"),
+        "fps": infos.get("video_fps"),
+        "width": width,
+        "height": height,
+        "keyframes": keyframes,
+    }
+
+def load_index(path=None):
+    path = path or INDEX_FILE
+    if not os.path.exists(path):
+        return {"version": INDEX_VERSION, "videos": {}}
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            index = json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"Warning: Could not read background index '{path}': {e}. Rebuilding.")
+        return {"version": INDEX_VERSION, "videos": {}}
+    if index.get("version") != INDEX_VERSION:
+        return {"version": INDEX_VERSION, "videos": {}}
+    return index
+
+def save_index(index, path=None):
+    path = path or INDEX_FILE
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(index, f, indent=2)
+    os.replace(tmp_path, path)
+
+def build_index(video_paths, path=None):
+    """Index every existing video, re-probing only new or changed files."""
+    index = load_index(path)
+    changed = False
+    for video_path in video_paths:
+        if not os.path.exists(video_path):
+            continue
+        entry = index["videos"].get(video_path)
+        if entry and {k: entry.get(k) for k in ("size", "mtime")} == _file_signature(video_path):
+            continue
+        print(f"Indexing background video {video_path}...")
+        index["videos"][video_path] = probe_video(video_path)
+        changed = True
+    if changed:
+        save_index(index, path)
+    return index
+
+def get_index(video_paths):
+    """The process-wide index, built (or refreshed) on first use."""
+    global _index
+    if _index is None or any(os.path.exists(p) and p not in _index["videos"] for p in video_paths):
+        _index = build_index(video_paths)
+    return _index
+
+def pick_segment_start(entry, duration, rng=random):
+    """
+    A random keyframe to start a `duration`-long segment from, so it fits
+    without looping. Falls back to any offset without keyframes, and to 0
+    if the video is shorter than `duration` (it'll have to loop).
+    """
+    video_duration = (entry or {}).get("duration") or 0
+    latest_start = video_duration - duration
+    if latest_start <= 0:
+        return 0.0
+    candidates = [k for k in entry.get("keyframes", []) if k <= latest_start]
+    if candidates:
+        return rng.choice(candidates)
+    return round(rng.uniform(0, latest_start), 3)
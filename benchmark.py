@@ -0,0 +1,736 @@
+# ---------------------------------------------------------------
+# Offline Stage Benchmarks 🏁
+# ---------------------------------------------------------------
+# Times every stage of the pipeline without Reddit, OpenAI or Google
+# credentials. All inputs are generated on the fly (seeded!):
+#   - synthetic Reddit comment trees
+#   - sine/noise "TTS" speech stand-ins
+#   - a colour-bar background video and a green-screen overlay
+#
+# Usage:
+#   python benchmark.py                          # run, write bench_results.json
+#   python benchmark.py --save-baseline          # ...and store it as the baseline
+#   python benchmark.py --baseline bench_baseline.json --tolerance 0.25
+#   python benchmark.py --stages trim_silence,write_videofile
+#
+# Exits with status 1 if any stage regressed against the baseline.
+# get_word_timestamps needs the Whisper model already downloaded.
+#
+# Caption accuracy vs speed per Whisper model/beam size, measured on
+# the real TTS clips your past jobs left in jobs/ + timelines/:
+#   python benchmark.py --captions --caption-models tiny,base,small
+#
+# The API rate limiter against a local stand-in server that throttles:
+#   python benchmark.py --rate-limits
+# ---------------------------------------------------------------
+
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+import wave
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+from moviepy.editor import AudioFileClip, VideoClip
+from pydub import AudioSegment
+
+import Redditcontentlocal as engine
+import audio_mixer
+import energy_aligner
+import job_manifest
+import rate_limits
+import word_aligner
+
+DEFAULT_RESULTS_PATH = "bench_results.json"
+DEFAULT_BASELINE_PATH = "bench_baseline.json"
+DEFAULT_CAPTION_RESULTS_PATH = "bench_captions.json"
+
+# Changes smaller than this are timer noise, never a regression
+MIN_REGRESSION_SECONDS = 0.05
+
+FIXTURE_SAMPLE_RATE = 24000
+FAKE_WORDS = (
+    "honestly my roommate once tried to microwave a whole pineapple and the landlord "
+    "still talks about it every single time we pay rent late which is always"
+).split()
+
+# ---------------------------------------------------------------
+# Fixtures: synthetic Reddit threads
+# ---------------------------------------------------------------
+class FakeAuthor:
+    def __init__(self, name):
+        self.name = name
+
+class FakeComment:
+    def __init__(self, cid, parent_id, body, score, author):
+        self.id = cid
+        self.parent_id = parent_id
+        self.body = body
+        self.score = score
+        self.author = FakeAuthor(author)
+        self.stickied = False
+
+class FakeCommentForest:
+    def __init__(self, comments):
+        self._comments = comments
+
+    def replace_more(self, limit=0):
+        return []
+
+    def list(self):
+        return list(self._comments)
+
+class FakePost:
+    def __init__(self, title, selftext, comments):
+        self.title = title
+        self.selftext = selftext
+        self.comments = FakeCommentForest(comments)
+
+class FakeSubreddit:
+    def __init__(self, posts):
+        self._posts = posts
+
+    def top(self, time_filter="week", limit=20):
+        return self._posts[:limit]
+
+class FakeReddit:
+    """Just enough of praw.Reddit for fetch_reddit_post."""
+    def __init__(self, posts):
+        self._posts = posts
+
+    def subreddit(self, name):
+        return FakeSubreddit(self._posts)
+
+def fake_sentence(rng, min_words=6, max_words=30):
+    return " ".join(rng.choice(FAKE_WORDS) for _ in range(rng.randint(min_words, max_words))).capitalize() + "."
+
+def make_comment_tree(rng, post_idx, num_comments=300):
+    """A thread of top-level comments and nested replies with random scores."""
+    comments = []
+    for i in range(num_comments):
+        cid = f"c{post_idx}_{i}"
+        if comments and rng.random() < 0.6:
+            parent_id = f"t1_{rng.choice(comments).id}"
+        else:
+            parent_id = f"t3_p{post_idx}"
+        comments.append(FakeComment(cid, parent_id, fake_sentence(rng), rng.randint(0, 5000), f"user{rng.randint(1, 999)}"))
+    return comments
+
+def make_fake_reddit(rng, num_posts=20):
+    posts = [
+        FakePost(f"Benchmark thread {rng.random():.8f}: {fake_sentence(rng, 5, 12)}", fake_sentence(rng, 20, 40), make_comment_tree(rng, i))
+        for i in range(num_posts)
+    ]
+    return FakeReddit(posts)
+
+# ---------------------------------------------------------------
+# Fixtures: audio
+# ---------------------------------------------------------------
+def write_wav(path, samples, sample_rate=FIXTURE_SAMPLE_RATE):
+    pcm = (np.clip(samples, -1.0, 1.0) * 32767).astype(np.int16)
+    with wave.open(path, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(sample_rate)
+        wav.writeframes(pcm.tobytes())
+
+def wav_to_mp3(wav_path, mp3_path):
+    AudioSegment.from_wav(wav_path).export(mp3_path, format="mp3")
+    os.remove(wav_path)
+    return mp3_path
+
+def speech_standin(rng, num_words, sample_rate=FIXTURE_SAMPLE_RATE):
+    """
+    Word-like tone bursts with pauses between them, padded with silence
+    front and back (like real TTS output before trim_silence).
+    """
+    parts = [np.zeros(int(0.4 * sample_rate))]
+    for _ in range(num_words):
+        length = rng.uniform(0.15, 0.45)
+        t = np.arange(int(length * sample_rate)) / sample_rate
+        pitch = rng.uniform(110, 240)
+        envelope = np.sin(np.pi * t / length)
+        tone = 0.5 * np.sin(2 * np.pi * pitch * t) + 0.2 * np.sin(2 * np.pi * 2 * pitch * t)
+        noise = np.random.default_rng(rng.randint(0, 2**32 - 1)).normal(0, 0.05, t.size)
+        parts.append(envelope * (tone + noise))
+        parts.append(np.zeros(int(rng.uniform(0.05, 0.25) * sample_rate)))
+    parts.append(np.zeros(int(0.4 * sample_rate)))
+    return np.concatenate(parts)
+
+def make_speech_mp3(rng, path, num_words):
+    wav_path = path[:-4] + ".wav"
+    write_wav(wav_path, speech_standin(rng, num_words))
+    return wav_to_mp3(wav_path, path)
+
+def make_music_mp3(path, seconds=20.0, sample_rate=FIXTURE_SAMPLE_RATE):
+    t = np.arange(int(seconds * sample_rate)) / sample_rate
+    chord = sum(np.sin(2 * np.pi * f * t) for f in (220.0, 277.18, 329.63)) / 3
+    beat = (np.sin(2 * np.pi * 2 * t) > 0.9).astype(float) * np.random.default_rng(1).normal(0, 0.3, t.size)
+    wav_path = path[:-4] + ".wav"
+    write_wav(wav_path, 0.4 * chord + beat)
+    return wav_to_mp3(wav_path, path)
+
+def make_transition_mp3(path, seconds=0.4, sample_rate=FIXTURE_SAMPLE_RATE):
+    t = np.arange(int(seconds * sample_rate)) / sample_rate
+    chirp = np.sin(2 * np.pi * (300 + 2000 * t) * t) * np.exp(-4 * t)
+    wav_path = path[:-4] + ".wav"
+    write_wav(wav_path, chirp)
+    return wav_to_mp3(wav_path, path)
+
+# ---------------------------------------------------------------
+# Fixtures: video
+# ---------------------------------------------------------------
+COLOUR_BARS = np.array([
+    [192, 192, 192], [192, 192, 0], [0, 192, 192], [0, 192, 0],
+    [192, 0, 192], [192, 0, 0], [0, 0, 192],
+], dtype=np.uint8)
+
+def make_colour_bar_video(path, width, height, seconds=8.0, fps=24):
+    """Scrolling SMPTE-ish colour bars, so every frame is different."""
+    bar_idx = (np.arange(width) * len(COLOUR_BARS)) // width
+
+    def make_frame(t):
+        shift = int(t * width / 4) % width
+        row = COLOUR_BARS[np.roll(bar_idx, shift)]
+        return np.broadcast_to(row, (height, width, 3)).copy()
+
+    clip = VideoClip(make_frame, duration=seconds)
+    clip.write_videofile(path, fps=fps, codec="libx264", preset="ultrafast", audio=False, logger=None)
+    clip.close()
+    return path
+
+def make_green_screen_video(path, width=720, height=405, seconds=5.0, fps=24):
+    """A white box bouncing over pure green, like comments_of_gold.mp4."""
+    def make_frame(t):
+        frame = np.zeros((height, width, 3), dtype=np.uint8)
+        frame[:, :, 1] = 255
+        box = height // 3
+        x = int((width - box) * (0.5 + 0.5 * np.sin(2 * np.pi * t / seconds)))
+        frame[box:2 * box, x:x + box] = 255
+        return frame
+
+    clip = VideoClip(make_frame, duration=seconds)
+    clip.write_videofile(path, fps=fps, codec="libx264", preset="ultrafast", audio=False, logger=None)
+    clip.close()
+    return path
+
+def build_fixtures(workdir, seed, render_profile):
+    """Generate every fixture into `workdir` and point the engine at them."""
+    rng = random.Random(seed)
+    profile = engine.RENDER_PROFILES[render_profile]
+    fixtures = {"reddit_seed": seed}
+
+    fixtures["speech"] = make_speech_mp3(rng, os.path.join(workdir, "speech.mp3"), num_words=40)
+    fixtures["speech_words"] = " ".join(rng.choice(FAKE_WORDS) for _ in range(40))
+    fixtures["music"] = make_music_mp3(os.path.join(workdir, "music.mp3"))
+    fixtures["transition"] = make_transition_mp3(os.path.join(workdir, "transition.mp3"))
+    fixtures["background"] = make_colour_bar_video(os.path.join(workdir, "bars.mp4"), profile["width"], profile["height"])
+    fixtures["overlay"] = make_green_screen_video(os.path.join(workdir, "green.mp4"))
+
+    # Point the engine's asset paths at the fixtures (no real files touched)
+    engine.BACKGROUND_VIDEO_CHOICES = [fixtures["background"]]
+    engine.background_index.INDEX_FILE = os.path.join(workdir, "background_index.json")
+    audio_mixer.PCM_CACHE_DIR = os.path.join(workdir, "pcm_cache")
+    engine.title_index.TITLE_INDEX_FILE = os.path.join(workdir, "title_index.json")
+    engine.subreddit_yield.YIELD_FILE = os.path.join(workdir, "subreddit_yield.json")
+    engine.BACKGROUND_MUSIC_PATH = fixtures["music"]
+    engine.TRANSITION_SOUND_PATH = fixtures["transition"]
+    engine.TRANSITION_FAST_PATH = os.path.join(workdir, "transition_fast.mp3")
+    engine.FOLLOW_OVERLAY_PATH = fixtures["overlay"]
+    engine.USED_THREADS_FILE = os.path.join(workdir, "used_threads.txt")
+    for lang in engine.LANGUAGE_PROFILES.values():
+        lang["used_threads_file"] = engine.USED_THREADS_FILE
+    return fixtures
+
+def build_fixture_timeline(rng, workdir, fixtures, num_comments=6):
+    """A stored timeline made of speech stand-ins, like build_timeline writes."""
+    timeline_dir = os.path.join(workdir, "timeline")
+    os.makedirs(timeline_dir, exist_ok=True)
+    transition = AudioFileClip(fixtures["transition"])
+    transition_duration = transition.duration
+    transition.close()
+
+    audio, captions, cursor = [], [], 0.0
+    for i in range(num_comments):
+        name = f"comment_{i}.mp3"
+        make_speech_mp3(rng, os.path.join(timeline_dir, name), num_words=rng.randint(10, 25))
+        clip = AudioFileClip(os.path.join(timeline_dir, name))
+        duration = clip.duration
+        clip.close()
+        audio.append({"kind": "transition", "start": cursor, "duration": transition_duration})
+        audio.append({"kind": "tts", "file": name, "start": cursor + transition_duration, "duration": duration})
+        words = fake_sentence(rng, 8, 16).split()
+        step = duration / len(words)
+        for j, word in enumerate(words):
+            captions.append({
+                "text": word, "start": cursor + j * step, "duration": step, "fontsize": 120,
+                "color": "#FFD700", "stroke_width": 16, "width_ratio": 0.90,
+            })
+        cursor += transition_duration + duration
+
+    title = "[r/AskReddit] Benchmark thread"
+    timeline = {
+        "version": engine.TIMELINE_VERSION,
+        "language": "en",
+        "title": title,
+        "duration": cursor,
+        "background": fixtures["background"],
+        "audio": audio,
+        "captions": captions,
+        "overlays": engine.build_overlay_layers(title, cursor),
+        "output": os.path.join(workdir, "bench_output.mp4"),
+    }
+    return timeline, timeline_dir
+
+# ---------------------------------------------------------------
+# Stages
+# ---------------------------------------------------------------
+def stage_fetch_selection(ctx):
+    random.seed(ctx["seed"])
+    engine.fetch_reddit_post(reddit=ctx["reddit"])
+
+def stage_speedup_audio(ctx):
+    engine.speedup_audio(ctx["fixtures"]["speech"], os.path.join(ctx["workdir"], "speech_fast.mp3"), speed=engine.COMMENT_AUDIO_SPEED)
+
+def stage_trim_silence(ctx):
+    engine.trim_silence(ctx["fixtures"]["speech"], os.path.join(ctx["workdir"], "speech_trimmed.mp3"))
+
+def stage_get_word_timestamps(ctx):
+    engine.get_word_timestamps(ctx["fixtures"]["speech"], model_size=ctx["whisper_model"], language="en")
+
+def stage_energy_word_timing(ctx):
+    energy_aligner.estimate_word_timings(ctx["fixtures"]["speech"], ctx["fixtures"]["speech_words"].split())
+
+def stage_create_word_synced_subtitles(ctx):
+    clips = engine.create_word_synced_subtitles(
+        ctx["fixtures"]["speech"], ctx["fixtures"]["speech_words"], engine.VIDEO_WIDTH, color="#FFD700"
+    )
+    engine.close_clips(clips)
+
+def stage_background_loop(ctx):
+    """Loop the background past its length and decode a frame every half second."""
+    looped = engine.loop_clip_to_duration(ctx["layers"]["background"], ctx["timeline"]["duration"], method="chain")
+    for t in np.arange(0, looped.duration, 0.5):
+        looped.get_frame(t)
+
+def stage_compositing(ctx):
+    """Build the composite and blend a frame every half second."""
+    final_video, owned = engine.compose_timeline(ctx["timeline"], ctx["timeline_dir"], ctx["render_profile"], ctx["layers"])
+    for t in np.arange(0, final_video.duration, 0.5):
+        final_video.get_frame(t)
+    engine.close_clips(owned)
+
+def stage_soundtrack_mix(ctx):
+    engine.mix_timeline_audio(ctx["timeline"], ctx["timeline_dir"], ctx["layers"])
+
+def stage_write_videofile(ctx):
+    final_video, owned = engine.compose_timeline(ctx["timeline"], ctx["timeline_dir"], ctx["render_profile"], ctx["layers"])
+    try:
+        soundtrack = engine.render_soundtrack(ctx["timeline"], ctx["timeline_dir"], ctx["layers"], ctx["render_profile"])
+        engine.write_composed_video(
+            final_video, os.path.join(ctx["workdir"], "bench_output.mp4"), ctx["render_profile"], soundtrack=soundtrack
+        )
+    finally:
+        engine.close_clips(owned)
+
+# Every OUTPUT_PRESETS variant from one frame stream; compare with write_videofile x presets
+def stage_multi_output_encode(ctx):
+    render_profile = ctx["render_profile"]
+    final_video, owned = engine.compose_timeline(ctx["timeline"], ctx["timeline_dir"], render_profile, ctx["layers"])
+    try:
+        soundtrack = engine.render_soundtrack(ctx["timeline"], ctx["timeline_dir"], ctx["layers"], render_profile)
+        specs = engine.multi_output.resolve_specs(list(engine.OUTPUT_PRESETS.values()), render_profile)
+        paths = [engine.multi_output.output_path(os.path.join(ctx["workdir"], "bench_multi.mp4"), s) for s in specs]
+        engine.multi_output.encode(
+            final_video, specs, paths, render_profile["fps"], soundtrack=soundtrack,
+            soundtrack_format=("aac", render_profile["audio_bitrate"]), threads=render_profile["threads"]
+        )
+    finally:
+        engine.close_clips(owned)
+
+STAGES = {
+    "fetch_selection": stage_fetch_selection,
+    "speedup_audio": stage_speedup_audio,
+    "trim_silence": stage_trim_silence,
+    "get_word_timestamps": stage_get_word_timestamps,
+    "energy_word_timing": stage_energy_word_timing,
+    "create_word_synced_subtitles": stage_create_word_synced_subtitles,
+    "background_loop": stage_background_loop,
+    "compositing": stage_compositing,
+    "soundtrack_mix": stage_soundtrack_mix,
+    "write_videofile": stage_write_videofile,
+    "multi_output_encode": stage_multi_output_encode,
+}
+
+# ---------------------------------------------------------------
+# Running & comparing
+# ---------------------------------------------------------------
+def time_stage(fn, ctx, repeat):
+    """Run a stage `repeat` times; returns wall-clock seconds per run."""
+    runs = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(ctx)
+        runs.append(time.perf_counter() - start)
+    return runs
+
+def run_benchmarks(stage_names, repeat=3, seed=1234, render_profile="draft", whisper_model="base"):
+    """Build fixtures, time every requested stage and return the results dict."""
+    random.seed(seed)
+    np.random.seed(seed)
+    workdir = tempfile.mkdtemp(prefix="reddit_bench_")
+    results = {
+        "meta": {
+            "seed": seed,
+            "repeat": repeat,
+            "render_profile": render_profile,
+            "whisper_model": whisper_model,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "stages": {},
+    }
+    layers = None
+    # The fake Reddit has no quota: without this, fetch_selection would time
+    # the reddit token bucket's sleeps (rate_limits.call passes unknown services through)
+    reddit_limit = rate_limits.SERVICE_LIMITS.pop("reddit", None)
+    rate_limits.reset("reddit")
+    try:
+        print(f"Building fixtures in {workdir} (seed {seed})...")
+        fixtures = build_fixtures(workdir, seed, render_profile)
+        rng = random.Random(seed)
+        timeline, timeline_dir = build_fixture_timeline(rng, workdir, fixtures)
+        layers = engine.prepare_shared_layers(render_profile, background_video_path=fixtures["background"])
+        ctx = {
+            "seed": seed,
+            "workdir": workdir,
+            "fixtures": fixtures,
+            "reddit": make_fake_reddit(random.Random(seed)),
+            "timeline": timeline,
+            "timeline_dir": timeline_dir,
+            "render_profile": engine.RENDER_PROFILES[render_profile],
+            "layers": layers,
+            "whisper_model": whisper_model,
+        }
+        if "get_word_timestamps" in stage_names:
+            # Model loading is a one-off per process; keep it out of the stage time
+            start = time.perf_counter()
+            engine.get_whisper_model(whisper_model)
+            results["meta"]["whisper_load_seconds"] = time.perf_counter() - start
+
+        for name in stage_names:
+            print(f"Timing {name}...")
+            runs = time_stage(STAGES[name], ctx, repeat)
+            results["stages"][name] = {
+                "median": statistics.median(runs),
+                "min": min(runs),
+                "runs": runs,
+            }
+            print(f"  {name}: median {statistics.median(runs):.3f}s")
+    finally:
+        engine.release_shared_layers(layers)
+        shutil.rmtree(workdir, ignore_errors=True)
+        if reddit_limit is not None:
+            rate_limits.SERVICE_LIMITS["reddit"] = reddit_limit
+    return results
+
+def compare_to_baseline(results, baseline, tolerance):
+    """
+    Stages whose median got slower than baseline * (1 + tolerance) and by
+    more than MIN_REGRESSION_SECONDS. Returns a list of dicts.
+    """
+    regressions = []
+    for name, stage in results["stages"].items():
+        base = baseline.get("stages", {}).get(name)
+        if not base:
+            continue
+        limit = base["median"] * (1 + tolerance)
+        if stage["median"] > limit and stage["median"] - base["median"] > MIN_REGRESSION_SECONDS:
+            regressions.append({
+                "stage": name,
+                "baseline": base["median"],
+                "current": stage["median"],
+                "ratio": stage["median"] / base["median"] if base["median"] > 0 else float("inf"),
+            })
+    return regressions
+
+def print_report(results, baseline=None):
+    print("\n--- Benchmark results ---")
+    for name, stage in results["stages"].items():
+        line = f"{name:<30} {stage['median']:8.3f}s (min {stage['min']:.3f}s)"
+        base = (baseline or {}).get("stages", {}).get(name)
+        if base and base["median"] > 0:
+            line += f"   vs baseline {base['median']:.3f}s ({stage['median'] / base['median']:.2f}x)"
+        print(line)
+
+# ---------------------------------------------------------------
+# Caption accuracy vs speed (real TTS clips)
+# ---------------------------------------------------------------
+# A caption within this many seconds of the reference timing counts as in sync
+CAPTION_SYNC_TOLERANCE = 0.1
+
+def collect_caption_samples(limit=40):
+    """Synthesized comment clips + the exact text sent to TTS, from job manifests."""
+    samples = []
+    if not os.path.isdir(job_manifest.JOBS_DIR):
+        return samples
+    for job_id in sorted(os.listdir(job_manifest.JOBS_DIR)):
+        path = job_manifest.manifest_path(job_id)
+        if not os.path.exists(path):
+            continue
+        manifest = job_manifest.load_manifest(path)
+        for code, variant in manifest.get("variants", {}).items():
+            timeline_dir = variant.get("timeline_dir")
+            profile = engine.LANGUAGE_PROFILES.get(code)
+            if not timeline_dir or profile is None:
+                continue
+            for key, artifact in variant.get("artifacts", {}).items():
+                audio_path = os.path.join(timeline_dir, artifact["file"])
+                if not key.startswith("comment_") or not os.path.exists(audio_path):
+                    continue
+                samples.append({
+                    "audio": audio_path,
+                    "words": artifact["text"].split(),
+                    "duration": artifact["duration"],
+                    "language": profile["whisper_language"],
+                })
+                if len(samples) >= limit:
+                    return samples
+    return samples
+
+def time_caption_alignment(samples, model_size, beam_size):
+    """Align every sample with one model/beam; returns per-sample timings and the seconds spent."""
+    engine.get_whisper_model(model_size)  # Loading is a one-off, keep it out of the timing
+    aligned, seconds = [], 0.0
+    for sample in samples:
+        start = time.perf_counter()
+        word_timings = engine.get_word_timestamps(
+            sample["audio"], model_size=model_size, language=sample["language"], beam_size=beam_size
+        )
+        timed, confidence = word_aligner.align_words(sample["words"], word_timings, sample["duration"])
+        seconds += time.perf_counter() - start
+        aligned.append({"timed": timed, "confidence": confidence})
+    return aligned, seconds
+
+def time_energy_alignment(samples):
+    """The Whisper-free energy backend on the same samples (always fully 'matched')."""
+    aligned, seconds = [], 0.0
+    for sample in samples:
+        start = time.perf_counter()
+        timed = energy_aligner.estimate_word_timings(sample["audio"], sample["words"])
+        seconds += time.perf_counter() - start
+        aligned.append({"timed": timed, "confidence": None})
+    return aligned, seconds
+
+def run_caption_benchmark(samples, model_sizes, beam_sizes):
+    """
+    Caption accuracy against speed for every model/beam combination and
+    the energy backend. The biggest model with the widest beam is the
+    timing reference.
+    """
+    audio_seconds = sum(s["duration"] for s in samples)
+    combos = [(m, b) for m in model_sizes for b in beam_sizes]
+    reference_combo = (model_sizes[-1], max(beam_sizes))
+    print(f"Aligning {len(samples)} clips ({audio_seconds:.0f}s of speech) with reference {reference_combo}...")
+    reference, _ = time_caption_alignment(samples, *reference_combo)
+
+    rows = []
+    for model_size, beam_size in combos + [("energy", None)]:
+        print(f"Timing {model_size}" + (f" (beam {beam_size})..." if beam_size else "..."))
+        if beam_size is None:
+            aligned, seconds = time_energy_alignment(samples)
+        else:
+            aligned, seconds = time_caption_alignment(samples, model_size, beam_size)
+        confidences = [r["confidence"] for r in aligned if r["confidence"] is not None]
+        errors = []
+        for result, ref in zip(aligned, reference):
+            for word, ref_word in zip(result["timed"], ref["timed"]):
+                errors.append(abs(word["start"] - ref_word["start"]))
+        rows.append({
+            "model": model_size,
+            "beam_size": beam_size,
+            "seconds": round(seconds, 3),
+            "realtime_factor": round(audio_seconds / seconds, 1) if seconds > 0 else None,
+            "confidence": round(statistics.mean(confidences), 3) if confidences else None,
+            "mean_start_error_ms": round(1000 * statistics.mean(errors), 1) if errors else None,
+            "in_sync": round(sum(e <= CAPTION_SYNC_TOLERANCE for e in errors) / len(errors), 3) if errors else None,
+        })
+    return {"reference": list(reference_combo), "clips": len(samples), "audio_seconds": audio_seconds, "results": rows}
+
+def print_caption_report(report):
+    print(f"\n--- Caption accuracy vs speed (reference {report['reference'][0]}, beam {report['reference'][1]}) ---")
+    print(f"{'model':<8} {'beam':>4} {'seconds':>8} {'x realtime':>10} {'confidence':>10} {'start err':>10} {'in sync':>8}")
+    for row in report["results"]:
+        error = f"{row['mean_start_error_ms']:.0f}ms" if row["mean_start_error_ms"] is not None else "-"
+        in_sync = f"{row['in_sync']:.0%}" if row["in_sync"] is not None else "-"
+        confidence = f"{row['confidence']:.0%}" if row["confidence"] is not None else "-"
+        print(f"{row['model']:<8} {row['beam_size'] or '-':>4} {row['seconds']:>8.2f} {row['realtime_factor'] or 0:>10.1f} "
+              f"{confidence:>10} {error:>10} {in_sync:>8}")
+
+# ---------------------------------------------------------------
+# Rate limiting vs a throttling stand-in API
+# ---------------------------------------------------------------
+# A local HTTP server that allows STANDIN_QUOTA_PER_SECOND requests per
+# second and answers 429 above that, hammered by STANDIN_CLIENTS threads
+# with and without rate_limits in front of them.
+STANDIN_QUOTA_PER_SECOND = 20
+STANDIN_CLIENTS = 8
+STANDIN_RETRY_SECONDS = 0.5
+
+def start_throttling_server(quota_per_second):
+    """A localhost API with a token-bucket quota. Returns (server, url)."""
+    quota = rate_limits.TokenBucket(quota_per_second, quota_per_second)
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            allowed = quota.try_take()
+            self.send_response(200 if allowed else 429)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_port}/"
+
+def run_rate_limit_benchmark(requests_total=200, limited=True):
+    """Send requests_total requests from STANDIN_CLIENTS threads; retry every 429."""
+    server, url = start_throttling_server(STANDIN_QUOTA_PER_SECOND)
+    rate_limits.SERVICE_LIMITS["standin"] = {
+        "rate": STANDIN_QUOTA_PER_SECOND * 0.9, "burst": STANDIN_QUOTA_PER_SECOND // 2,
+        "concurrency": STANDIN_CLIENTS, "max_concurrency": STANDIN_CLIENTS,
+    }
+    rate_limits.reset("standin")
+    counts = {"ok": 0, "throttled": 0}
+    counts_lock = threading.Lock()
+    remaining = iter(range(requests_total))
+
+    def fetch():
+        urllib.request.urlopen(url, timeout=10).read()
+
+    def client():
+        for _ in remaining:
+            while True:
+                try:
+                    rate_limits.call("standin", fetch) if limited else fetch()
+                    with counts_lock:
+                        counts["ok"] += 1
+                    break
+                except urllib.error.HTTPError as e:
+                    if e.code != 429:
+                        raise
+                    with counts_lock:
+                        counts["throttled"] += 1
+                    time.sleep(STANDIN_RETRY_SECONDS)
+
+    start = time.perf_counter()
+    threads = [threading.Thread(target=client) for _ in range(STANDIN_CLIENTS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    seconds = time.perf_counter() - start
+    server.shutdown()
+    server.server_close()
+    return {
+        "limited": limited,
+        "requests": requests_total,
+        "seconds": round(seconds, 2),
+        "requests_per_second": round(requests_total / seconds, 1),
+        "throttled": counts["throttled"],
+        "limiter": rate_limits.stats().get("standin") if limited else None,
+    }
+
+def print_rate_limit_report(rows):
+    print(f"\n--- Stand-in API, quota {STANDIN_QUOTA_PER_SECOND}/s, {STANDIN_CLIENTS} clients ---")
+    print(f"{'mode':<10} {'requests':>8} {'seconds':>8} {'req/s':>7} {'429s':>6} {'waited':>8}")
+    for row in rows:
+        waited = f"{row['limiter']['wait_s']:.1f}s" if row["limiter"] else "-"
+        print(f"{'limited' if row['limited'] else 'unlimited':<10} {row['requests']:>8} {row['seconds']:>8.2f} "
+              f"{row['requests_per_second']:>7.1f} {row['throttled']:>6} {waited:>8}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline per-stage benchmarks with synthetic fixtures.")
+    parser.add_argument("--stages", default=",".join(STAGES), help="Comma-separated stages to run.")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("--render-profile", default="draft", choices=sorted(engine.RENDER_PROFILES))
+    parser.add_argument("--whisper-model", default="base")
+    parser.add_argument("--out", default=DEFAULT_RESULTS_PATH)
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE_PATH)
+    parser.add_argument("--tolerance", type=float, default=0.20, help="Allowed slowdown before flagging (0.2 = 20%%).")
+    parser.add_argument("--save-baseline", action="store_true", help="Also store these results as the new baseline.")
+    parser.add_argument("--captions", action="store_true", help="Benchmark caption accuracy vs speed per Whisper model instead.")
+    parser.add_argument("--caption-models", default="tiny,base,small", help="Smallest to biggest; the last one is the reference.")
+    parser.add_argument("--caption-beams", default="1,5")
+    parser.add_argument("--caption-limit", type=int, default=40, help="Max TTS clips to align.")
+    parser.add_argument("--rate-limits", action="store_true", help="Benchmark the API rate limiter against a local throttling server instead.")
+    parser.add_argument("--rate-limit-requests", type=int, default=200)
+    args = parser.parse_args()
+
+    if args.rate_limits:
+        rows = [run_rate_limit_benchmark(args.rate_limit_requests, limited) for limited in (False, True)]
+        print_rate_limit_report(rows)
+        return 0
+
+    if args.captions:
+        samples = collect_caption_samples(args.caption_limit)
+        if not samples:
+            parser.error(f"No synthesized clips found in {job_manifest.JOBS_DIR}/; run a batch first.")
+        report = run_caption_benchmark(
+            samples,
+            [m.strip() for m in args.caption_models.split(",") if m.strip()],
+            [int(b) for b in args.caption_beams.split(",") if b.strip()]
+        )
+        with open(DEFAULT_CAPTION_RESULTS_PATH, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print_caption_report(report)
+        print(f"Results written to {DEFAULT_CAPTION_RESULTS_PATH}")
+        return 0
+
+    stage_names = [s.strip() for s in args.stages.split(",") if s.strip()]
+    unknown = [s for s in stage_names if s not in STAGES]
+    if unknown:
+        parser.error(f"Unknown stages: {', '.join(unknown)}. Choose from: {', '.join(STAGES)}")
+
+    results = run_benchmarks(stage_names, args.repeat, args.seed, args.render_profile, args.whisper_model)
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    print(f"Results written to {args.out}")
+
+    baseline = None
+    if os.path.exists(args.baseline):
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+    print_report(results, baseline)
+
+    if args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"Baseline saved to {args.baseline}")
+        return 0
+
+    if baseline:
+        regressions = compare_to_baseline(results, baseline, args.tolerance)
+        for r in regressions:
+            print(f"REGRESSION: {r['stage']} {r['baseline']:.3f}s -> {r['current']:.3f}s ({r['ratio']:.2f}x)")
+        if regressions:
+            return 1
+        print("No regressions against the baseline. 🎉")
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,383 @@
+# ---------------------------------------------------------------
+# Generator Daemon 🔥
+# ---------------------------------------------------------------
+# A long-running generator that keeps everything warm between videos:
+# imported libraries, Whisper models, the TTS and Reddit clients and
+# the decoded backgrounds/overlay/music in the asset pool. Jobs come in
+# over a small local HTTP API (TCP on localhost, or a Unix socket):
+#
+#   POST /jobs        {"thread_id": "1abcde"}                 -> 202 {"job_id", ...}
+#                     {"script": {"title": ..., "comments": [...]}}
+#                     optional: "profiles": ["en"], "render_profile": "draft",
+#                               "outputs": ["tiktok", "shorts", "archive"]
+#   GET  /jobs/<id>   status, and the output paths once it's done
+#   GET  /jobs        every known job
+#   GET  /health      queue depth, capacity and workers
+#
+# Jobs wait in a bounded queue for a pool of worker processes
+# (--workers, default 1), each warmed up once and kept warm. When the
+# queue is full, POST /jobs answers 429 with a Retry-After header, so a
+# scheduler can keep feeding the daemon without piling up work it can't
+# get through.
+#
+#   python daemon.py --port 8765 --workers 2 --queue-size 8
+#   python daemon.py --socket /tmp/reddit-videos.sock
+#   curl -X POST localhost:8765/jobs -d '{"thread_id": "1abcde"}'
+# ---------------------------------------------------------------
+
+import argparse
+import json
+import multiprocessing
+import os
+import queue
+import socketserver
+import threading
+import time
+import traceback
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import Redditcontentlocal as engine
+import asset_pool
+import lazy_imports
+import rate_limits
+import telemetry
+
+DAEMON_HOST = "127.0.0.1"
+DAEMON_PORT = 8765
+# Worker processes, each with its own warm models and asset pool. One
+# is usually right: a MoviePy render already uses every core, and each
+# worker holds its own copy of the Whisper models and decoded layers.
+DAEMON_WORKERS = 1
+# Jobs waiting for a worker; more are refused with 429 until there's room
+DAEMON_QUEUE_SIZE = 8
+RETRY_AFTER_SECONDS = 60
+# Finished jobs remembered for status queries
+DAEMON_HISTORY = 500
+MAX_REQUEST_BYTES = 1 << 20
+# How often the collector checks for workers that died mid-job
+WORKER_CHECK_SECONDS = 2.0
+
+_jobs = {}  # job_id -> job record (see submit_job)
+_jobs_lock = threading.Lock()
+_default_profiles = list(engine.DEFAULT_PROFILES)
+_started = time.time()
+# Worker pool, set up by start_workers(): the bounded job queue, the
+# queue workers report back on, and index -> {"process", "job_id"}
+_pool = {"jobs": None, "events": None, "workers": {}, "profiles": [], "warm": True}
+
+# ---------------------------------------------------------------
+# Warm-up
+# ---------------------------------------------------------------
+def warm_up(profile_codes):
+    """
+    Pay every one-off cost before the first job: imports, models, and the
+    decoded layers for every background a job may pick (at the default
+    render profile's size). Call it inside asset_pool.batch(), or the
+    layers are dropped again as soon as they're released.
+    """
+    start = time.perf_counter()
+    for name in ("moviepy.editor", "pydub", "openai", "praw"):
+        lazy_imports.load(name)
+    for code in profile_codes:
+        profile = engine.LANGUAGE_PROFILES[code]
+        if profile.get("word_timing_backend", "whisper") == "whisper":
+            engine.get_whisper_model(profile["whisper_model"])
+    engine.reddit_client()
+    # Jobs pick their background at random, so open them all; the open
+    # batch keeps them (and the overlay and music) for later jobs
+    for path in engine.BACKGROUND_VIDEO_CHOICES:
+        if os.path.exists(path):
+            engine.release_shared_layers(engine.prepare_shared_layers(background_video_path=path))
+    print(f"Warm-up done in {time.perf_counter() - start:.1f}s.")
+    lazy_imports.report()
+
+# ---------------------------------------------------------------
+# Jobs
+# ---------------------------------------------------------------
+def _public(record):
+    return {key: value for key, value in record.items() if key != "request"}
+
+def validate_request(request):
+    """Raise ValueError if a job request can't be run."""
+    if not isinstance(request, dict):
+        raise ValueError("Expected a JSON object")
+    if bool(request.get("thread_id")) == bool(request.get("script")):
+        raise ValueError("Give exactly one of 'thread_id' or 'script'")
+    script = request.get("script")
+    if script is not None:
+        comments = script.get("comments") if isinstance(script, dict) else None
+        if not comments or not all(isinstance(c, str) and c.strip() for c in comments):
+            raise ValueError("'script' needs a non-empty 'comments' list of strings")
+    for code in request.get("profiles") or []:
+        if code not in engine.LANGUAGE_PROFILES:
+            raise ValueError(f"Unknown profile '{code}'")
+    render_profile = request.get("render_profile")
+    if render_profile and render_profile not in engine.RENDER_PROFILES:
+        raise ValueError(f"Unknown render profile '{render_profile}'")
+    for name in request.get("outputs") or []:
+        if name not in engine.OUTPUT_PRESETS:
+            raise ValueError(f"Unknown output '{name}'")
+
+def submit_job(request):
+    """Queue a validated request. Returns the job record, or None if the queue is full."""
+    record = {
+        "job_id": uuid.uuid4().hex[:12],
+        "kind": "thread" if request.get("thread_id") else "script",
+        "status": "queued",
+        "profiles": list(request.get("profiles") or _default_profiles),
+        "render_profile": request.get("render_profile") or engine.RENDER_PROFILE,
+        "variants": list(request.get("outputs") or []),
+        "worker": None,
+        "submitted": time.time(),
+        "started": None,
+        "finished": None,
+        "outputs": [],
+        "error": None,
+        "request": request,
+    }
+    with _jobs_lock:
+        try:
+            _pool["jobs"].put_nowait(dict(record))
+        except queue.Full:
+            return None
+        _jobs[record["job_id"]] = record
+        _forget_old_jobs()
+    return record
+
+def _forget_old_jobs():
+    finished = [r for r in _jobs.values() if r["status"] in ("done", "failed")]
+    for record in sorted(finished, key=lambda r: r["finished"])[:max(0, len(finished) - DAEMON_HISTORY)]:
+        del _jobs[record["job_id"]]
+
+def _count(status):
+    with _jobs_lock:
+        return sum(1 for r in _jobs.values() if r["status"] == status)
+
+def run_job(record):
+    """Build the job's manifest (thread or ready-made script) and render it."""
+    request = record["request"]
+    profiles = [engine.LANGUAGE_PROFILES[code] for code in record["profiles"]]
+    engine.RENDER_PROFILE = record["render_profile"]
+    if record["variants"]:
+        engine.OUTPUT_SPECS = [engine.OUTPUT_PRESETS[name] for name in record["variants"]]
+    if record["kind"] == "thread":
+        with telemetry.stage("fetch"):
+            manifest = engine.thread_manifest(request["thread_id"], record["profiles"])
+    else:
+        manifest = engine.script_manifest(request["script"], record["profiles"])
+    written = engine.process_thread(profiles, manifest=manifest)
+    if written is None:
+        raise RuntimeError("No background video available")
+    if not written:
+        raise RuntimeError("Nothing was rendered (thread too short?)")
+    return written
+
+# ---------------------------------------------------------------
+# Worker pool
+# ---------------------------------------------------------------
+# Workers are processes rather than threads: the engine's render
+# settings, the asset pool and telemetry are module state, one job at a
+# time per process.
+def worker_main(index, jobs, events, profile_codes, warm):
+    """A worker process: warm up once, then run jobs until it gets None."""
+    default_render_profile, default_outputs = engine.RENDER_PROFILE, engine.OUTPUT_SPECS
+    # One batch for the worker's whole life, so warmed-up layers stay decoded
+    with asset_pool.batch():
+        if warm:
+            warm_up(profile_codes)
+        while True:
+            record = jobs.get()
+            if record is None:
+                break
+            job_id = record["job_id"]
+            events.put(("running", index, job_id, {"started": time.time()}))
+            try:
+                with telemetry.job(f"daemon_{job_id}"):
+                    outputs = run_job(record)
+                status, error = "done", None
+            except Exception as e:
+                traceback.print_exc()
+                outputs, status, error = [], "failed", f"{type(e).__name__}: {e}"
+            finally:
+                engine.RENDER_PROFILE, engine.OUTPUT_SPECS = default_render_profile, default_outputs
+            events.put(("finished", index, job_id,
+                        {"status": status, "outputs": outputs, "error": error, "finished": time.time()}))
+            telemetry.log_event("daemon_job", job=job_id, worker=index, status=status,
+                                asset_pool=asset_pool.stats(), rate_limits=rate_limits.stats())
+
+# "spawn": a forked worker would inherit the server's threads and sockets
+_context = multiprocessing.get_context("spawn")
+
+def _start_worker(index):
+    process = _context.Process(target=worker_main, name=f"daemon-worker-{index}", daemon=True,
+                               args=(index, _pool["jobs"], _pool["events"], _pool["profiles"], _pool["warm"]))
+    process.start()
+    _pool["workers"][index] = {"process": process, "job_id": None}
+
+def _collect_events():
+    """Apply worker reports to the job records; replace workers that died."""
+    while True:
+        try:
+            kind, index, job_id, changes = _pool["events"].get(timeout=WORKER_CHECK_SECONDS)
+        except queue.Empty:
+            pass
+        else:
+            worker = _pool["workers"][index]
+            worker["job_id"] = job_id if kind == "running" else None
+            with _jobs_lock:
+                record = _jobs.get(job_id)
+                if record is not None:
+                    record.update(changes, status=changes.get("status", "running"), worker=index)
+        for index, worker in list(_pool["workers"].items()):
+            if worker["process"].is_alive():
+                continue
+            print(f"Worker {index} exited (code {worker['process'].exitcode}); starting a new one.")
+            with _jobs_lock:
+                record = _jobs.get(worker["job_id"])
+                if record is not None and record["status"] == "running":
+                    record.update(status="failed", error="Worker process died", finished=time.time())
+            _start_worker(index)
+
+def start_workers(workers, profile_codes, warm=True):
+    """Start the worker processes and the thread collecting their reports."""
+    _pool.update(jobs=_context.Queue(maxsize=DAEMON_QUEUE_SIZE), events=_context.Queue(),
+                 profiles=list(profile_codes), warm=warm)
+    for index in range(workers):
+        _start_worker(index)
+    threading.Thread(target=_collect_events, name="daemon-collector", daemon=True).start()
+
+def stop_workers(timeout=10):
+    for _ in _pool["workers"]:
+        try:
+            _pool["jobs"].put_nowait(None)
+        except queue.Full:
+            break
+    for worker in _pool["workers"].values():
+        worker["process"].join(timeout)
+        if worker["process"].is_alive():
+            worker["process"].terminate()
+
+# ---------------------------------------------------------------
+# HTTP API
+# ---------------------------------------------------------------
+class JobAPIHandler(BaseHTTPRequestHandler):
+    server_version = "RedditVideoDaemon/1"
+
+    def _send_json(self, status, body, headers=None):
+        payload = json.dumps(body, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_GET(self):
+        path = self.path.rstrip("/")
+        if path == "/health":
+            self._send_json(200, {
+                "queued": _count("queued"), "running": _count("running"), "capacity": DAEMON_QUEUE_SIZE,
+                "workers": len(_pool["workers"]), "uptime_s": round(time.time() - _started, 1),
+            })
+        elif path == "/jobs":
+            with _jobs_lock:
+                jobs = [_public(r) for r in _jobs.values()]
+            self._send_json(200, {"jobs": jobs})
+        elif path.startswith("/jobs/"):
+            with _jobs_lock:
+                record = _jobs.get(path[len("/jobs/"):])
+                body = _public(record) if record else None
+            if body is None:
+                self._send_json(404, {"error": "Unknown job"})
+            else:
+                self._send_json(200, body)
+        else:
+            self._send_json(404, {"error": "Not found"})
+
+    def do_POST(self):
+        if self.path.rstrip("/") != "/jobs":
+            self._send_json(404, {"error": "Not found"})
+            return
+        length = int(self.headers.get("Content-Length") or 0)
+        if length > MAX_REQUEST_BYTES:
+            self._send_json(413, {"error": "Request too large"})
+            return
+        try:
+            request = json.loads(self.rfile.read(length) or b"{}")
+            validate_request(request)
+        except ValueError as e:
+            self._send_json(400, {"error": str(e)})
+            return
+        record = submit_job(request)
+        if record is None:
+            self._send_json(429, {"error": "Queue full, try again later", "capacity": DAEMON_QUEUE_SIZE},
+                            headers={"Retry-After": str(RETRY_AFTER_SECONDS)})
+            return
+        self._send_json(202, dict(_public(record), queued_ahead=_count("queued") - 1))
+
+    def address_string(self):
+        # Unix socket clients have no (host, port)
+        return self.client_address[0] if isinstance(self.client_address, tuple) else "local"
+
+    def log_message(self, format, *args):
+        print(f"[api] {self.address_string()} {format % args}")
+
+if hasattr(socketserver, "UnixStreamServer"):
+    class UnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+        daemon_threads = True
+
+        def server_bind(self):
+            socketserver.UnixStreamServer.server_bind(self)
+            self.server_name, self.server_port = "localhost", 0
+
+def serve(host=DAEMON_HOST, port=DAEMON_PORT, socket_path=None, profile_codes=None, warm=True,
+          workers=DAEMON_WORKERS):
+    """Start the (warming up) workers and serve the job API until interrupted."""
+    global _default_profiles
+    profile_codes = profile_codes or engine.DEFAULT_PROFILES
+    _default_profiles = list(profile_codes)
+    start_workers(workers, profile_codes, warm)
+
+    if socket_path:
+        if os.path.exists(socket_path):
+            os.remove(socket_path)
+        server = UnixHTTPServer(socket_path, JobAPIHandler)
+        where = f"unix:{socket_path}"
+    else:
+        server = ThreadingHTTPServer((host, port), JobAPIHandler)
+        where = f"http://{host}:{port}"
+    print(f"Daemon listening on {where} ({workers} worker(s), queue capacity {DAEMON_QUEUE_SIZE}).")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("Shutting down.")
+    finally:
+        server.server_close()
+        stop_workers()
+        if socket_path and os.path.exists(socket_path):
+            os.remove(socket_path)
+
+def main():
+    global DAEMON_QUEUE_SIZE
+    parser = argparse.ArgumentParser(description="Keep the generator warm and take jobs over a local API.")
+    parser.add_argument("--host", default=DAEMON_HOST)
+    parser.add_argument("--port", type=int, default=DAEMON_PORT)
+    parser.add_argument("--socket", help="Listen on this Unix socket instead of TCP.")
+    parser.add_argument("--profiles", default=",".join(engine.DEFAULT_PROFILES),
+                        help="Default language profiles for jobs (and models to warm up).")
+    parser.add_argument("--workers", type=int, default=DAEMON_WORKERS,
+                        help="Worker processes running jobs side by side (each keeps its own warm models).")
+    parser.add_argument("--queue-size", type=int, default=DAEMON_QUEUE_SIZE,
+                        help="Jobs allowed to wait for a worker before new ones get 429.")
+    parser.add_argument("--no-warm-up", action="store_true", help="Load everything lazily on the first job instead.")
+    args = parser.parse_args()
+    if args.workers < 1 or args.queue_size < 1:
+        parser.error("--workers and --queue-size must be at least 1")
+    DAEMON_QUEUE_SIZE = args.queue_size
+    serve(args.host, args.port, args.socket, [c.strip() for c in args.profiles.split(",") if c.strip()],
+          warm=not args.no_warm_up, workers=args.workers)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+# ---------------------------------------------------------------
+# Duration Planner ⏱️
+# ---------------------------------------------------------------
+# Guesses how long a piece of text will be once it's been through
+# TTS, speed-up and silence trimming, so we can pick which comments
+# go into a video *before* paying for any audio.
+#
+# Estimates are characters-per-second rates per voice + speed. They
+# start from a rough prior and get calibrated from every real
+# synthesis, persisted in tts_calibration.json between runs.
+# ---------------------------------------------------------------
+
+import json
+import os
+
+CALIBRATION_FILE = "tts_calibration.json"
+
+# Rough speaking rates (spoken characters per second at speaking_rate 1.0,
+# playback speed 1.0). Only used until we have real syntheses to learn from.
+DEFAULT_CHARS_PER_SECOND = {
+    "en-US": 14.5,
+    "pl-PL": 13.0,
+}
+FALLBACK_CHARS_PER_SECOND = 14.0
+
+# How many seconds of "prior" audio the defaults are worth. Real samples
+# quickly outweigh it, but a single odd synthesis can't swing the estimate.
+PRIOR_WEIGHT_SECONDS = 30.0
+
+# Until we've heard the real transition sound, assume it's this long
+TRANSITION_DURATION_ESTIMATE = 0.4
+
+def spoken_length(text):
+    """Count the characters the TTS will actually pronounce (letters and digits)."""
+    return sum(1 for ch in text or "" if ch.isalnum())
+
+def calibration_key(voice_name, speaking_rate, speed):
+    """One calibration bucket per voice, TTS speaking rate and playback speed."""
+    return f"{voice_name}|{speaking_rate:.2f}|{speed:.2f}"
+
+def load_calibration(path=CALIBRATION_FILE):
+    """Load the per-voice calibration samples (empty if we've never synthesized)."""
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"Warning: Could not read TTS calibration '{path}': {e}. Starting fresh.")
+        return {}
+
+def save_calibration(calibration, path=CALIBRATION_FILE):
+    """Persist the calibration samples so the next run starts well-tuned."""
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(calibration, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, path)
+
+def chars_per_second(calibration, key, language_code, speaking_rate=1.0, speed=1.0):
+    """
+    Blend the prior rate with everything we've measured for this voice/speed.
+    """
+    prior_cps = DEFAULT_CHARS_PER_SECOND.get(language_code, FALLBACK_CHARS_PER_SECOND) * speaking_rate * speed
+    sample = calibration.get(key, {})
+    total_chars = sample.get("chars", 0) + prior_cps * PRIOR_WEIGHT_SECONDS
+    total_seconds = sample.get("seconds", 0.0) + PRIOR_WEIGHT_SECONDS
+    return total_chars / total_seconds
+
+def estimate_duration(text, cps):
+    """Estimated seconds of final (sped-up, trimmed) audio for `text`."""
+    return spoken_length(text) / cps if cps > 0 else 0.0
+
+def record_synthesis(calibration, key, text, duration):
+    """Feed a real synthesis back into the calibration for its voice/speed."""
+    chars = spoken_length(text)
+    if chars <= 0 or duration <= 0:
+        return
+    sample = calibration.setdefault(key, {"chars": 0, "seconds": 0.0, "count": 0})
+    sample["chars"] += chars
+    sample["seconds"] += duration
+    sample["count"] += 1
+
+def plan_comments(comment_durations, title_duration, transition_duration, max_duration, min_duration=0):
+    """
+    Pick which comments to synthesize, keeping their original order.
+    Comments that would push the video past `max_duration` are skipped, but
+    shorter ones after them still get a chance to fill the gap.
+    Returns (selected_indices, estimated_total). The total includes the title
+    and one transition per clip, just like create_video lays them out.
+    An empty selection means the thread can't reach `min_duration`.
+    """
+    total = title_duration + transition_duration if title_duration > 0 else 0.0
+    selected = []
+    for idx, duration in enumerate(comment_durations):
+        if duration <= 0:
+            continue
+        projected = total + duration + transition_duration
+        if projected > max_duration:
+            continue
+        selected.append(idx)
+        total = projected
+    if total < min_duration:
+        return [], total
+    return selected, total
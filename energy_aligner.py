@@ -0,0 +1,121 @@
+# ---------------------------------------------------------------
+# Energy-Envelope Word Timing ⚡
+# ---------------------------------------------------------------
+# A Whisper-free way to time captions for our own TTS clips: the audio
+# is clean, single-speaker, already silence-trimmed, and we know the
+# exact transcript. So instead of recognizing speech we only find
+# *where* there is speech:
+#
+#   1. RMS energy per 10 ms frame -> speech runs vs pauses
+#   2. every word gets a weight (syllables, roughly)
+#   3. words are laid out along the speech runs by cumulative weight,
+#      skipping the pauses, so no caption sits in a silence
+#
+# Pure NumPy, a few milliseconds per clip. Returns the same
+# {"word", "start", "end"} dicts as get_word_timestamps.
+# ---------------------------------------------------------------
+
+import re
+
+import numpy as np
+
+import audio_mixer
+
+ENERGY_SAMPLE_RATE = 16000
+FRAME_SECONDS = 0.01
+# Frames quieter than this (relative to the loud frames) are pauses
+SILENCE_DB = -30.0
+# Pauses shorter than this are just gaps between syllables
+MIN_PAUSE_SECONDS = 0.08
+# Speech blips shorter than this are clicks/breaths
+MIN_RUN_SECONDS = 0.05
+
+VOWEL_GROUPS = re.compile(r"[aeiouyąęóàáâäèéêëìíîïòôöùúûü]+", re.IGNORECASE)
+
+def word_weight(word):
+    """Rough spoken length of a word: its syllables (digits count one each)."""
+    digits = sum(ch.isdigit() for ch in word)
+    syllables = len(VOWEL_GROUPS.findall(word))
+    return max(1, syllables + digits)
+
+def speech_runs(samples, sample_rate, silence_db=SILENCE_DB,
+                min_pause=MIN_PAUSE_SECONDS, min_run=MIN_RUN_SECONDS):
+    """(start, end) seconds of every stretch of speech in a mono signal."""
+    frame = max(1, int(FRAME_SECONDS * sample_rate))
+    n_frames = len(samples) // frame
+    if n_frames == 0:
+        return []
+    frames = samples[:n_frames * frame].reshape(n_frames, frame)
+    rms = np.sqrt(np.mean(frames.astype(np.float64) ** 2, axis=1)) + 1e-9
+    db = 20 * np.log10(rms)
+    reference = np.percentile(db, 95)  # "loud" level, robust to single peaks
+    voiced = db > reference + silence_db
+
+    # Edges of voiced stretches, as frame indices
+    padded = np.concatenate([[False], voiced, [False]]).astype(np.int8)
+    edges = np.flatnonzero(np.diff(padded))
+    runs = [[int(s), int(e)] for s, e in zip(edges[::2], edges[1::2])]
+
+    # Bridge short pauses, then drop blips
+    merged = []
+    for run in runs:
+        if merged and (run[0] - merged[-1][1]) * FRAME_SECONDS < min_pause:
+            merged[-1][1] = run[1]
+        else:
+            merged.append(run)
+    return [(s * FRAME_SECONDS, e * FRAME_SECONDS) for s, e in merged
+            if (e - s) * FRAME_SECONDS >= min_run]
+
+def _speech_time_to_clock(runs, speech_time, word_start=False):
+    """
+    Map a position on the concatenated speech runs back to clip time.
+    At a run boundary, a word start goes to the next run (not the pause).
+    """
+    elapsed = 0.0
+    for start, end in runs:
+        length = end - start
+        if speech_time < elapsed + length or (not word_start and speech_time <= elapsed + length):
+            return start + (speech_time - elapsed)
+        elapsed += length
+    return runs[-1][1]
+
+def layout_words(words, runs):
+    """Spread words over the speech runs by cumulative weight, skipping pauses."""
+    if not words or not runs:
+        return []
+    weights = [word_weight(w) for w in words]
+    total_weight = float(sum(weights))
+    total_speech = sum(end - start for start, end in runs)
+
+    timings = []
+    cumulative = 0.0
+    for word, weight in zip(words, weights):
+        start = _speech_time_to_clock(runs, total_speech * cumulative / total_weight, word_start=True)
+        cumulative += weight
+        end = _speech_time_to_clock(runs, total_speech * cumulative / total_weight)
+        timings.append({"word": word, "start": start, "end": max(start, end)})
+    return timings
+
+def _clip_runs(runs, start, end):
+    return [(max(s, start), min(e, end)) for s, e in runs if e > start and s < end]
+
+def estimate_word_timings(audio_path, words, sample_rate=ENERGY_SAMPLE_RATE, windows=None):
+    """
+    Time `words` (the exact text spoken in `audio_path`) from the energy
+    envelope alone. `windows` ((start, end, n_words) per TTS chunk) keep
+    each chunk's words inside its own stretch of audio.
+    Returns [] if no speech was found.
+    """
+    if not words:
+        return []
+    samples = audio_mixer.decode_pcm(audio_path, sample_rate, channels=1)[:, 0]
+    runs = speech_runs(samples, sample_rate)
+    if not windows:
+        return layout_words(words, runs)
+
+    timings, first = [], 0
+    for start, end, n_words in windows:
+        chunk_runs = _clip_runs(runs, start, end) or [(start, end)]
+        timings.extend(layout_words(words[first:first + n_words], chunk_runs))
+        first += n_words
+    return timings if runs else []
@@ -0,0 +1,209 @@
+# ---------------------------------------------------------------
+# Job Manifests (checkpoints) 💾
+# ---------------------------------------------------------------
+# Every fetched thread gets a jobs/<job_id>/manifest.json that is
+# rewritten after each stage: the source thread, each language's
+# rewritten script, every synthesized audio file (with its hash and
+# word timings), the timeline and the rendered output.
+#
+# If a run crashes, the next one resumes unfinished jobs at their
+# first incomplete stage, so the paid OpenAI rewrite and the TTS
+# audio are never redone. Transient TTS/LLM errors are retried with
+# exponential backoff before a stage gives up.
+# ---------------------------------------------------------------
+
+import hashlib
+import json
+import os
+import random
+import time
+
+JOBS_DIR = "jobs"
+MANIFEST_VERSION = 1
+
+# A job that keeps crashing is given up on after this many attempts
+MAX_JOB_ATTEMPTS = 3
+
+# Retry settings for transient API errors
+RETRY_ATTEMPTS = 4
+RETRY_BASE_DELAY = 2.0   # seconds, doubled every retry
+RETRY_MAX_DELAY = 30.0
+
+# Exception class names that mean "try again later" for Google Cloud,
+# OpenAI and plain network errors (matched by name so we don't have to
+# import every client library here).
+TRANSIENT_ERROR_NAMES = {
+    "ServiceUnavailable", "DeadlineExceeded", "ResourceExhausted", "InternalServerError",
+    "TooManyRequests", "GatewayTimeout", "BadGateway", "RetryError",
+    "RateLimitError", "APIConnectionError", "APITimeoutError",
+    "ConnectionError", "ConnectionResetError", "TimeoutError",
+}
+
+# ---------------------------------------------------------------
+# Retry with backoff
+# ---------------------------------------------------------------
+def is_transient_error(error):
+    """True for throttling/timeouts/5xx-style errors worth retrying."""
+    return any(cls.__name__ in TRANSIENT_ERROR_NAMES for cls in type(error).__mro__)
+
+def retry_transient(fn, *args, retries=None, base_delay=None, max_delay=None, label="", **kwargs):
+    """
+    Call fn(*args, **kwargs), retrying transient errors with jittered
+    exponential backoff. Anything else (or the last failure) is raised.
+    """
+    retries = RETRY_ATTEMPTS if retries is None else retries
+    base_delay = RETRY_BASE_DELAY if base_delay is None else base_delay
+    max_delay = RETRY_MAX_DELAY if max_delay is None else max_delay
+    for attempt in range(1, retries + 1):
+        try:
+            return fn(*args, **kwargs)
+        except Exception as e:
+            if attempt >= retries or not is_transient_error(e):
+                raise
+            delay = min(max_delay, base_delay * 2 ** (attempt - 1)) * random.uniform(0.8, 1.2)
+            print(f"Transient error in {label or getattr(fn, '__name__', 'call')} ({type(e).__name__}: {e}). "
+                  f"Retry {attempt}/{retries - 1} in {delay:.1f}s...")
+            time.sleep(delay)
+
+# ---------------------------------------------------------------
+# Manifests
+# ---------------------------------------------------------------
+def file_sha256(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+def job_id_for_thread(title):
+    """Stable id for a thread, so the same thread always maps to the same job."""
+    return hashlib.sha1(title.strip().encode("utf-8")).hexdigest()[:12]
+
+def manifest_path(job_id):
+    return os.path.join(JOBS_DIR, job_id, "manifest.json")
+
+def save_manifest(manifest):
+    """Atomically rewrite the manifest (a crash mid-write can't corrupt it)."""
+    manifest["updated"] = time.time()
+    path = manifest_path(manifest["job_id"])
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2, ensure_ascii=False)
+    os.replace(tmp_path, path)
+    return path
+
+def load_manifest(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+def create_manifest(title, selftext, comments, subreddit_name, profile_codes):
+    """Start a job for a freshly fetched thread (stage 'fetch' is done)."""
+    job_id = job_id_for_thread(title or " ".join(comments))
+    manifest = {
+        "version": MANIFEST_VERSION,
+        "job_id": job_id,
+        "status": "running",
+        "attempts": 1,
+        "created": time.time(),
+        "profiles": list(profile_codes),
+        "thread": {
+            "title": title,
+            "selftext": selftext,
+            "comments": list(comments),
+            "subreddit": subreddit_name,
+        },
+        "background": None,
+        "variants": {},
+    }
+    save_manifest(manifest)
+    return manifest
+
+def incomplete_jobs():
+    """Manifests of jobs a previous run didn't finish, oldest first."""
+    if not os.path.isdir(JOBS_DIR):
+        return []
+    manifests = []
+    for job_id in os.listdir(JOBS_DIR):
+        path = manifest_path(job_id)
+        if not os.path.exists(path):
+            continue
+        try:
+            manifest = load_manifest(path)
+        except (OSError, ValueError) as e:
+            print(f"Warning: Skipping unreadable job manifest {path}: {e}")
+            continue
+        if manifest.get("status") not in ("done", "failed"):
+            manifests.append(manifest)
+    return sorted(manifests, key=lambda m: m.get("created", 0))
+
+def job_counts():
+    """How many job manifests there are per status."""
+    counts = {}
+    if not os.path.isdir(JOBS_DIR):
+        return counts
+    for job_id in os.listdir(JOBS_DIR):
+        path = manifest_path(job_id)
+        if not os.path.exists(path):
+            continue
+        try:
+            status = load_manifest(path).get("status", "unknown")
+        except (OSError, ValueError):
+            status = "unreadable"
+        counts[status] = counts.get(status, 0) + 1
+    return counts
+
+def finish_job(manifest, status="done"):
+    manifest["status"] = status
+    save_manifest(manifest)
+
+def variant_record(manifest, code):
+    """The manifest section for one language variant (created on first use)."""
+    return manifest["variants"].setdefault(code, {
+        "stages": {},
+        "script": None,
+        "plan": None,
+        "timeline_dir": None,
+        "artifacts": {},
+    })
+
+def stage_done(manifest, code, stage):
+    return manifest["variants"].get(code, {}).get("stages", {}).get(stage, {}).get("status") == "done"
+
+def mark_stage(manifest, code, stage, status="done", **info):
+    """Record a stage outcome for a variant and checkpoint the manifest."""
+    variant_record(manifest, code)["stages"][stage] = {"status": status, "at": time.time(), **info}
+    save_manifest(manifest)
+
+# ---------------------------------------------------------------
+# Audio artifacts
+# ---------------------------------------------------------------
+def record_artifact(manifest, code, key, path, text, duration, captions=None, chunks=None):
+    """Checkpoint one synthesized clip: its file hash, length, TTS chunks and word timings."""
+    variant_record(manifest, code)["artifacts"][key] = {
+        "file": os.path.basename(path),
+        "sha256": file_sha256(path),
+        "text": text,
+        "duration": duration,
+        "chunks": chunks,
+        "captions": captions,
+    }
+    save_manifest(manifest)
+
+def record_captions(manifest, code, key, captions):
+    """Checkpoint the word timings for an already recorded clip."""
+    variant_record(manifest, code)["artifacts"][key]["captions"] = captions
+    save_manifest(manifest)
+
+def reusable_artifact(manifest, code, key, timeline_dir, text):
+    """
+    A previously synthesized clip for `key`, if its file is still there,
+    unchanged, and was made from the same text. Otherwise None.
+    """
+    artifact = manifest["variants"].get(code, {}).get("artifacts", {}).get(key)
+    if not artifact or artifact.get("text") != text:
+        return None
+    path = os.path.join(timeline_dir, artifact["file"])
+    if not os.path.exists(path) or file_sha256(path) != artifact["sha256"]:
+        return None
+    return artifact
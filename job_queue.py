@@ -0,0 +1,468 @@
+# ---------------------------------------------------------------
+# Shared Job Queue (several render machines, one batch) 🏭
+# ---------------------------------------------------------------
+# A batch is a number of "slots" in a queue. Workers on any machine
+# claim a slot under a lease, fetch a thread, claim that thread
+# atomically (so two nodes never render the same one), render it and
+# complete the slot. While a job runs, a heartbeat keeps extending the
+# lease and reports progress; if a worker dies, its lease runs out and
+# the slot goes back to the queue for someone else - together with
+# the thread it had claimed, so the next worker carries on with it.
+#
+# The broker is pluggable: anything with the methods of SQLiteBroker
+# works. Two come built in:
+#   sqlite:<path>       one file, safe across processes on ONE machine.
+#                       Don't put it on a network share - SQLite locking
+#                       over NFS/SMB is unreliable (open_broker warns).
+#   http://<host>:<port> for several machines: one node serves its
+#                       SQLite queue with serve_broker() (the engine's
+#                       `queue-server` command), the others talk to it
+#                       over HTTP. It listens on localhost only unless
+#                       given another address, and then needs a shared
+#                       secret in JOB_QUEUE_TOKEN on every node (or an
+#                       explicit insecure=True).
+# For Postgres/Redis implement the same methods and register them in
+# BROKERS.
+#
+#   broker = job_queue.open_broker("sqlite:job_queue.sqlite3")
+#   job_queue.submit_batch(broker, 30, {"profiles": ["en", "pl"]})
+#   job = broker.claim("host-1:1234")
+#   job_queue.serve_broker(broker, "0.0.0.0", 8766)      # on the queue node, with JOB_QUEUE_TOKEN set
+#   job_queue.open_broker("http://queue-node:8766")      # on the others (same JOB_QUEUE_TOKEN)
+# ---------------------------------------------------------------
+
+import ipaddress
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+import traceback
+import urllib.error
+import urllib.request
+import uuid
+from contextlib import closing
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+DEFAULT_QUEUE_URL = "sqlite:job_queue.sqlite3"
+# A worker that hasn't sent a heartbeat for this long is presumed dead
+LEASE_SECONDS = 120
+HEARTBEAT_SECONDS = 30
+# A slot that failed (or lost its worker) this many times is given up on
+MAX_SLOT_ATTEMPTS = 3
+# How long an idle worker waits before asking for work again
+POLL_SECONDS = 5
+# HTTP broker: default port of `queue-server`, client timeout, and the
+# environment variable holding the optional shared secret
+QUEUE_SERVER_PORT = 8766
+HTTP_TIMEOUT_SECONDS = 30
+QUEUE_TOKEN_ENV = "JOB_QUEUE_TOKEN"
+# Filesystems SQLite can't lock reliably (from /proc/mounts)
+NETWORK_FILESYSTEMS = {"nfs", "nfs4", "cifs", "smb3", "smbfs", "fuse.sshfs", "afs", "ceph", "glusterfs", "9p"}
+
+def worker_name():
+    """Unique id for this worker process: host, pid and a short random tag."""
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+
+# ---------------------------------------------------------------
+# SQLite broker
+# ---------------------------------------------------------------
+class SQLiteBroker:
+    """
+    Job queue + thread claims in one SQLite file. Every method opens its
+    own connection, so the heartbeat thread can use the broker too.
+    Jobs are dicts: {"job_id", "payload", "status", "worker",
+    "lease_expires", "attempts", "progress", "result"}.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with closing(self._connect()) as conn:
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS jobs (
+                    job_id TEXT PRIMARY KEY,
+                    batch_id TEXT,
+                    payload TEXT NOT NULL,
+                    status TEXT NOT NULL DEFAULT 'queued',
+                    worker TEXT,
+                    lease_expires REAL,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    progress TEXT,
+                    result TEXT,
+                    created REAL NOT NULL,
+                    updated REAL NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, created);
+                CREATE TABLE IF NOT EXISTS thread_claims (
+                    title TEXT PRIMARY KEY,
+                    job_id TEXT,
+                    worker TEXT,
+                    claimed REAL NOT NULL
+                );
+            """)
+
+    def _connect(self):
+        # isolation_level=None: we issue BEGIN IMMEDIATE ourselves, which
+        # takes the write lock up front so two claimers can't interleave.
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    @staticmethod
+    def _job(row):
+        job = dict(row)
+        for key in ("payload", "progress", "result"):
+            job[key] = json.loads(job[key]) if job[key] else None
+        return job
+
+    def enqueue(self, payload, job_id=None, batch_id=None):
+        job_id = job_id or uuid.uuid4().hex[:12]
+        now = time.time()
+        with closing(self._connect()) as conn:
+            conn.execute(
+                "INSERT INTO jobs (job_id, batch_id, payload, created, updated) VALUES (?, ?, ?, ?, ?)",
+                (job_id, batch_id, json.dumps(payload), now, now)
+            )
+        return job_id
+
+    def requeue_expired(self, now=None):
+        """Put jobs whose worker stopped heartbeating back in the queue. Returns how many."""
+        now = now or time.time()
+        with closing(self._connect()) as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            failed = conn.execute(
+                "UPDATE jobs SET status = 'failed', worker = NULL, lease_expires = NULL, updated = ? "
+                "WHERE status = 'leased' AND lease_expires < ? AND attempts >= ?",
+                (now, now, MAX_SLOT_ATTEMPTS)
+            ).rowcount
+            requeued = conn.execute(
+                "UPDATE jobs SET status = 'queued', worker = NULL, lease_expires = NULL, updated = ? "
+                "WHERE status = 'leased' AND lease_expires < ?",
+                (now, now)
+            ).rowcount
+            conn.execute("COMMIT")
+        if failed:
+            print(f"Gave up on {failed} job(s) whose workers kept dying.")
+        return requeued
+
+    def claim(self, worker, lease_seconds=LEASE_SECONDS):
+        """Lease the oldest queued job to `worker`. Returns the job, or None if there's no work."""
+        self.requeue_expired()
+        now = time.time()
+        with closing(self._connect()) as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute(
+                "SELECT job_id FROM jobs WHERE status = 'queued' ORDER BY created LIMIT 1"
+            ).fetchone()
+            if row is None:
+                conn.execute("COMMIT")
+                return None
+            conn.execute(
+                "UPDATE jobs SET status = 'leased', worker = ?, lease_expires = ?, "
+                "attempts = attempts + 1, updated = ? WHERE job_id = ?",
+                (worker, now + lease_seconds, now, row["job_id"])
+            )
+            job = self._job(conn.execute("SELECT * FROM jobs WHERE job_id = ?", (row["job_id"],)).fetchone())
+            conn.execute("COMMIT")
+        return job
+
+    def heartbeat(self, job_id, worker, progress=None, lease_seconds=LEASE_SECONDS):
+        """Extend the lease (and store progress). False if the worker no longer holds it."""
+        now = time.time()
+        with closing(self._connect()) as conn:
+            if progress is None:
+                updated = conn.execute(
+                    "UPDATE jobs SET lease_expires = ?, updated = ? "
+                    "WHERE job_id = ? AND worker = ? AND status = 'leased'",
+                    (now + lease_seconds, now, job_id, worker)
+                ).rowcount
+            else:
+                updated = conn.execute(
+                    "UPDATE jobs SET lease_expires = ?, progress = ?, updated = ? "
+                    "WHERE job_id = ? AND worker = ? AND status = 'leased'",
+                    (now + lease_seconds, json.dumps(progress), now, job_id, worker)
+                ).rowcount
+        return updated == 1
+
+    def complete(self, job_id, worker, result=None, status="done"):
+        """Finish a leased job as "done" or "failed". False if the lease was lost meanwhile."""
+        now = time.time()
+        with closing(self._connect()) as conn:
+            updated = conn.execute(
+                "UPDATE jobs SET status = ?, result = ?, worker = NULL, lease_expires = NULL, updated = ? "
+                "WHERE job_id = ? AND worker = ? AND status = 'leased'",
+                (status, json.dumps(result), now, job_id, worker)
+            ).rowcount
+        return updated == 1
+
+    def release(self, job_id, worker, progress=None):
+        """Hand a leased job back to the queue (e.g. this worker is shutting down)."""
+        now = time.time()
+        with closing(self._connect()) as conn:
+            if progress is None:
+                updated = conn.execute(
+                    "UPDATE jobs SET status = 'queued', worker = NULL, lease_expires = NULL, updated = ? "
+                    "WHERE job_id = ? AND worker = ? AND status = 'leased'",
+                    (now, job_id, worker)
+                ).rowcount
+            else:
+                updated = conn.execute(
+                    "UPDATE jobs SET status = 'queued', worker = NULL, lease_expires = NULL, progress = ?, "
+                    "updated = ? WHERE job_id = ? AND worker = ? AND status = 'leased'",
+                    (json.dumps(progress), now, job_id, worker)
+                ).rowcount
+        return updated == 1
+
+    def claim_thread(self, title, job_id, worker):
+        """Atomically claim a Reddit thread for a job. False if another job already has it."""
+        with closing(self._connect()) as conn:
+            try:
+                conn.execute(
+                    "INSERT INTO thread_claims (title, job_id, worker, claimed) VALUES (?, ?, ?, ?)",
+                    (title.strip(), job_id, worker, time.time())
+                )
+            except sqlite3.IntegrityError:
+                row = conn.execute("SELECT job_id FROM thread_claims WHERE title = ?", (title.strip(),)).fetchone()
+                return row is not None and row["job_id"] == job_id
+        return True
+
+    def claimed_threads(self):
+        with closing(self._connect()) as conn:
+            return {row["title"] for row in conn.execute("SELECT title FROM thread_claims")}
+
+    def counts(self, batch_id=None):
+        """Jobs per status, optionally for one batch."""
+        query = "SELECT status, COUNT(*) AS n FROM jobs"
+        args = ()
+        if batch_id:
+            query += " WHERE batch_id = ?"
+            args = (batch_id,)
+        with closing(self._connect()) as conn:
+            return {row["status"]: row["n"] for row in conn.execute(query + " GROUP BY status", args)}
+
+    def jobs(self, status=None):
+        query, args = "SELECT * FROM jobs", ()
+        if status:
+            query, args = query + " WHERE status = ?", (status,)
+        with closing(self._connect()) as conn:
+            return [self._job(row) for row in conn.execute(query + " ORDER BY created", args)]
+
+def network_filesystem(path):
+    """The network filesystem type `path` lives on ("nfs", "cifs", "unc"...), or None if it's local."""
+    if path.startswith(("\\\\", "//")):
+        return "unc"
+    try:
+        with open("/proc/mounts", "r", encoding="utf-8") as f:
+            mounts = [line.split()[1:3] for line in f if len(line.split()) >= 3]
+    except OSError:
+        return None  # Not Linux; can't tell
+    real = os.path.realpath(path)
+    best = ("", None)
+    for mount_point, fs_type in mounts:
+        mount_point = mount_point.replace("\\040", " ")
+        inside = real == mount_point or real.startswith(mount_point.rstrip("/") + "/")
+        if inside and len(mount_point) > len(best[0]):
+            best = (mount_point, fs_type)
+    return best[1] if best[1] in NETWORK_FILESYSTEMS else None
+
+def _open_sqlite(location):
+    directory = os.path.dirname(location)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    fs_type = network_filesystem(location)
+    if fs_type:
+        print(f"Warning: Queue file {location} is on a network filesystem ({fs_type}). SQLite locking "
+              f"isn't reliable there, so workers may claim the same job. For several machines run "
+              f"`queue-server` on one node and use an http:// queue URL instead.")
+    return SQLiteBroker(location)
+
+# ---------------------------------------------------------------
+# HTTP broker (one node serves the queue, the others connect)
+# ---------------------------------------------------------------
+# Broker methods callable over HTTP: POST /<method> with the keyword
+# arguments as a JSON object, answered with {"result": ...}
+BROKER_METHODS = ("enqueue", "requeue_expired", "claim", "heartbeat", "complete", "release",
+                  "claim_thread", "claimed_threads", "counts", "jobs")
+
+class HTTPBroker:
+    """Client for a broker served by serve_broker(); same methods as SQLiteBroker."""
+
+    def __init__(self, base_url, token=None, timeout=HTTP_TIMEOUT_SECONDS):
+        self.base_url = base_url.rstrip("/")
+        self.token = token if token is not None else os.environ.get(QUEUE_TOKEN_ENV)
+        self.timeout = timeout
+
+    def _call(self, method, **kwargs):
+        request = urllib.request.Request(
+            f"{self.base_url}/{method}", data=json.dumps(kwargs).encode("utf-8"), method="POST",
+            headers={"Content-Type": "application/json"}
+        )
+        if self.token:
+            request.add_header("Authorization", f"Bearer {self.token}")
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                return json.loads(response.read())["result"]
+        except urllib.error.HTTPError as e:
+            message = e.read().decode("utf-8", errors="replace")
+            raise OSError(f"Queue server {self.base_url} answered {e.code} to {method}: {message}") from None
+
+    def enqueue(self, payload, job_id=None, batch_id=None):
+        return self._call("enqueue", payload=payload, job_id=job_id, batch_id=batch_id)
+
+    def requeue_expired(self, now=None):
+        return self._call("requeue_expired", now=now)
+
+    def claim(self, worker, lease_seconds=LEASE_SECONDS):
+        return self._call("claim", worker=worker, lease_seconds=lease_seconds)
+
+    def heartbeat(self, job_id, worker, progress=None, lease_seconds=LEASE_SECONDS):
+        return self._call("heartbeat", job_id=job_id, worker=worker, progress=progress, lease_seconds=lease_seconds)
+
+    def complete(self, job_id, worker, result=None, status="done"):
+        return self._call("complete", job_id=job_id, worker=worker, result=result, status=status)
+
+    def release(self, job_id, worker, progress=None):
+        return self._call("release", job_id=job_id, worker=worker, progress=progress)
+
+    def claim_thread(self, title, job_id, worker):
+        return self._call("claim_thread", title=title, job_id=job_id, worker=worker)
+
+    def claimed_threads(self):
+        return set(self._call("claimed_threads"))
+
+    def counts(self, batch_id=None):
+        return self._call("counts", batch_id=batch_id)
+
+    def jobs(self, status=None):
+        return self._call("jobs", status=status)
+
+class BrokerRequestHandler(BaseHTTPRequestHandler):
+    server_version = "JobQueue/1"
+
+    def _send_json(self, status, body):
+        payload = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_POST(self):
+        token = self.server.token
+        if token and self.headers.get("Authorization") != f"Bearer {token}":
+            self._send_json(401, {"error": "Bad or missing token"})
+            return
+        method = self.path.strip("/")
+        if method not in BROKER_METHODS:
+            self._send_json(404, {"error": f"Unknown method '{method}'"})
+            return
+        try:
+            kwargs = json.loads(self.rfile.read(int(self.headers.get("Content-Length") or 0)) or b"{}")
+            result = getattr(self.server.broker, method)(**kwargs)
+        except (TypeError, ValueError) as e:
+            self._send_json(400, {"error": str(e)})
+            return
+        except Exception as e:
+            traceback.print_exc()
+            self._send_json(500, {"error": f"{type(e).__name__}: {e}"})
+            return
+        self._send_json(200, {"result": sorted(result) if isinstance(result, set) else result})
+
+    def log_message(self, format, *args):
+        pass  # Heartbeats would flood the console
+
+def _is_loopback(host):
+    try:
+        return ipaddress.ip_address(socket.gethostbyname(host)).is_loopback
+    except (OSError, ValueError):
+        return False
+
+def serve_broker(broker, host="127.0.0.1", port=QUEUE_SERVER_PORT, token=None, insecure=False):
+    """
+    Serve `broker` to HTTPBroker clients until interrupted. Listening
+    beyond localhost needs a token (default: $JOB_QUEUE_TOKEN), or
+    insecure=True to let anyone who can reach the port change the queue.
+    """
+    token = token if token is not None else os.environ.get(QUEUE_TOKEN_ENV)
+    if not token and not _is_loopback(host):
+        if not insecure:
+            raise ValueError(f"Refusing to serve the queue on {host} without a token: set {QUEUE_TOKEN_ENV} "
+                             f"on every node, or pass insecure=True (--insecure).")
+        print(f"Warning: Anyone who can reach {host}:{port} can change the queue.")
+    server = ThreadingHTTPServer((host, port), BrokerRequestHandler)
+    server.broker = broker
+    server.token = token
+    print(f"Serving the job queue on http://{host}:{port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("Shutting down.")
+    finally:
+        server.server_close()
+
+# scheme -> opener(location); add your own broker here
+BROKERS = {
+    "sqlite": _open_sqlite,
+    "http": lambda location: HTTPBroker("http:" + location),
+    "https": lambda location: HTTPBroker("https:" + location),
+}
+
+def open_broker(url=None):
+    """A broker from a "scheme:location" URL, e.g. "sqlite:job_queue.sqlite3" or "http://node:8766"."""
+    url = url or DEFAULT_QUEUE_URL
+    scheme, _, location = url.partition(":")
+    if scheme not in BROKERS:
+        raise ValueError(f"Unknown queue broker '{scheme}'. Choose from: {', '.join(BROKERS)}")
+    return BROKERS[scheme](location)
+
+# ---------------------------------------------------------------
+# Submitting & working
+# ---------------------------------------------------------------
+def submit_batch(broker, size, payload):
+    """Queue `size` slots (each becomes one thread's videos). Returns the batch id."""
+    batch_id = uuid.uuid4().hex[:8]
+    for i in range(size):
+        broker.enqueue(dict(payload), job_id=f"{batch_id}-{i:04d}", batch_id=batch_id)
+    return batch_id
+
+class Heartbeat:
+    """
+    Keep a job's lease alive from a background thread while it runs.
+    Update `progress` (a dict) from the job; it's sent with every beat.
+    """
+
+    def __init__(self, broker, job, worker, interval=HEARTBEAT_SECONDS):
+        self.broker, self.job_id, self.worker, self.interval = broker, job["job_id"], worker, interval
+        self.progress = dict(job.get("progress") or {})
+        self.lost = False
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=f"heartbeat-{self.job_id}", daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.beat()
+
+    def beat(self):
+        try:
+            if not self.broker.heartbeat(self.job_id, self.worker, dict(self.progress)):
+                if not self.lost:
+                    print(f"Warning: Lost the lease on job {self.job_id}; another worker may take it over.")
+                self.lost = True
+        except (sqlite3.Error, OSError) as e:
+            print(f"Warning: Heartbeat for job {self.job_id} failed: {e}")
+
+    def update(self, **progress):
+        """Record progress and send it right away."""
+        self.progress.update(progress)
+        self.beat()
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        return False
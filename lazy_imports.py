@@ -0,0 +1,55 @@
+# ---------------------------------------------------------------
+# Lazy Imports ⏱️
+# ---------------------------------------------------------------
+# MoviePy, faster-whisper, OpenAI, praw, pydub, the Google TTS client
+# and NumPy (with our modules built on it: audio_mixer, energy_aligner,
+# overlay_cache) take seconds to import between them, and most commands
+# need only some of them (looking up used threads needs none). So
+# they're imported on first use, through load(), which also remembers
+# how long each import took:
+#
+#   mpy = lazy_imports.load("moviepy.editor")
+#   clip = mpy.VideoFileClip(path)
+#
+# The CLI prints report() at the end of every command.
+# ---------------------------------------------------------------
+
+import importlib
+import sys
+import time
+
+_import_seconds = {}  # module name -> seconds its first import took
+# Heavy libraries our own modules import at the top, loaded (and timed)
+# first so the report shows them on their own
+DEPENDENCIES = {
+    "audio_mixer": ("numpy",),
+    "energy_aligner": ("numpy",),
+    "overlay_cache": ("numpy",),
+}
+
+def load(name):
+    """Import `name` (once) and return the module, timing the first import."""
+    module = sys.modules.get(name)
+    if module is not None:
+        return module
+    for dependency in DEPENDENCIES.get(name, ()):
+        load(dependency)
+    start = time.perf_counter()
+    module = importlib.import_module(name)
+    _import_seconds[name] = time.perf_counter() - start
+    return module
+
+def import_seconds():
+    return dict(_import_seconds)
+
+def report(startup_seconds=None):
+    """One line: how long startup took and which heavy imports a command paid for."""
+    parts = []
+    if startup_seconds is not None:
+        parts.append(f"startup {startup_seconds:.2f}s")
+    loaded = sorted(_import_seconds.items(), key=lambda item: -item[1])
+    if loaded:
+        parts.append("on-demand imports: " + ", ".join(f"{name} {seconds:.2f}s" for name, seconds in loaded))
+    else:
+        parts.append("no heavy imports")
+    print("Import time: " + "; ".join(parts))
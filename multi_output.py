@@ -0,0 +1,148 @@
+# ---------------------------------------------------------------
+# Single-Pass Multi-Output Encoding 📦
+# ---------------------------------------------------------------
+# The same video goes to TikTok, YouTube Shorts and a low-bitrate
+# archive. Instead of compositing it once per platform (or re-encoding
+# the finished MP4), the composited frames are generated once and piped
+# into a single ffmpeg process that splits them into every output:
+#
+#   frames -> ffmpeg -filter_complex "split=3 -> scale each" -> tiktok.mp4
+#                                                            -> shorts.mp4
+#                                                            -> archive.mkv
+#
+# An output spec is a dict; missing keys come from the render profile:
+#   {"name": "archive", "suffix": "_archive", "width": 540, "height": 960,
+#    "video_bitrate": "800k" (or "crf": 28), "preset": "slow",
+#    "container": "mkv", "audio_bitrate": "64k"}
+# Codecs default per container (CONTAINER_CODECS); set "video_codec" /
+# "audio_codec" to override.
+#
+# Frames are composed at the render profile's size, so make that the
+# biggest output; smaller outputs are scaled down inside ffmpeg.
+# ---------------------------------------------------------------
+
+import os
+import subprocess
+import tempfile
+
+import lazy_imports
+
+# container -> (video codec, audio codec)
+CONTAINER_CODECS = {
+    "mp4": ("libx264", "aac"),
+    "mov": ("libx264", "aac"),
+    "mkv": ("libx264", "aac"),
+    "webm": ("libvpx-vp9", "libopus"),
+}
+FASTSTART_CONTAINERS = {"mp4", "mov"}
+X264_CODECS = {"libx264", "libx265"}
+
+def resolve_specs(specs, render_profile):
+    """Fill every spec's missing settings from the render profile."""
+    resolved = []
+    for i, spec in enumerate(specs or [{}]):
+        container = spec.get("container", "mp4")
+        if container not in CONTAINER_CODECS:
+            raise ValueError(f"Unknown container '{container}'. Choose from: {', '.join(CONTAINER_CODECS)}")
+        video_codec, audio_codec = CONTAINER_CODECS[container]
+        full = {
+            "name": spec.get("name", f"output{i}"),
+            "suffix": spec.get("suffix", "" if i == 0 else f"_{spec.get('name', i)}"),
+            "width": spec.get("width", render_profile["width"]),
+            "height": spec.get("height", render_profile["height"]),
+            "preset": spec.get("preset", render_profile["preset"]),
+            "container": container,
+            "video_codec": spec.get("video_codec", video_codec),
+            "audio_codec": spec.get("audio_codec", audio_codec),
+            "audio_bitrate": spec.get("audio_bitrate", render_profile["audio_bitrate"]),
+        }
+        if "video_bitrate" in spec:
+            full["video_bitrate"] = spec["video_bitrate"]
+        else:
+            full["crf"] = spec.get("crf", render_profile["crf"])
+        resolved.append(full)
+    if len({spec["suffix"] + "." + spec["container"] for spec in resolved}) != len(resolved):
+        raise ValueError("Output specs need distinct suffixes (or containers)")
+    return resolved
+
+def output_path(base_filename, spec):
+    """<base><suffix>.<container>, e.g. video_shorts.mp4"""
+    return f"{os.path.splitext(base_filename)[0]}{spec['suffix']}.{spec['container']}"
+
+def video_args(spec, threads=None):
+    args = ["-c:v", spec["video_codec"], "-pix_fmt", "yuv420p"]
+    if "video_bitrate" in spec:
+        args += ["-b:v", spec["video_bitrate"]]
+    else:
+        args += ["-crf", str(spec["crf"])]
+        if spec["video_codec"] == "libvpx-vp9":
+            args += ["-b:v", "0"]  # Constant quality mode
+    if spec["video_codec"] in X264_CODECS:
+        args += ["-preset", spec["preset"]]
+    if threads:
+        args += ["-threads", str(threads)]
+    return args
+
+def audio_args(spec, source_codec=None, source_bitrate=None):
+    """Copy the soundtrack if it's already what the output wants, else re-encode it."""
+    if (spec["audio_codec"], spec["audio_bitrate"]) == (source_codec, source_bitrate):
+        return ["-c:a", "copy"]
+    return ["-c:a", spec["audio_codec"], "-b:a", spec["audio_bitrate"]]
+
+def container_args(spec):
+    return ["-movflags", "+faststart"] if spec["container"] in FASTSTART_CONTAINERS else []
+
+def build_command(ffmpeg, size, fps, specs, paths, soundtrack=None, soundtrack_format=(None, None), threads=None):
+    """
+    ffmpeg reading raw RGB frames from stdin (and the soundtrack, if any)
+    and writing one file per spec.
+    """
+    width, height = size
+    command = [ffmpeg, "-y", "-v", "error",
+               "-f", "rawvideo", "-pix_fmt", "rgb24", "-s", f"{width}x{height}", "-r", str(fps), "-i", "-"]
+    if soundtrack:
+        command += ["-i", soundtrack]
+    labels = [f"s{i}" for i in range(len(specs))]
+    graph = [f"[0:v]split={len(specs)}" + "".join(f"[{label}]" for label in labels)] if len(specs) > 1 else []
+    for i, spec in enumerate(specs):
+        source = f"[{labels[i]}]" if len(specs) > 1 else "[0:v]"
+        if (spec["width"], spec["height"]) == (width, height):
+            graph.append(f"{source}null[v{i}]")
+        else:
+            graph.append(f"{source}scale={spec['width']}:{spec['height']}:flags=lanczos[v{i}]")
+    command += ["-filter_complex", ";".join(graph)]
+    per_output_threads = max(1, threads // len(specs)) if threads else None
+    for i, (spec, path) in enumerate(zip(specs, paths)):
+        command += ["-map", f"[v{i}]"] + video_args(spec, per_output_threads)
+        if soundtrack:
+            command += ["-map", "1:a:0"] + audio_args(spec, *soundtrack_format) + ["-shortest"]
+        command += container_args(spec) + [path]
+    return command
+
+def encode(clip, specs, paths, fps, soundtrack=None, soundtrack_format=(None, None), threads=None):
+    """
+    Generate the clip's frames once and encode them to every spec's path
+    in a single ffmpeg run. `soundtrack` (an audio file) is muxed into
+    each output; without it the outputs are video only.
+    """
+    ffmpeg = lazy_imports.load("moviepy.config").get_setting("FFMPEG_BINARY")
+    for path in paths:
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+    command = build_command(ffmpeg, clip.size, fps, specs, paths, soundtrack, soundtrack_format, threads)
+    with tempfile.TemporaryFile() as errors:
+        process = subprocess.Popen(command, stdin=subprocess.PIPE, stderr=errors)
+        try:
+            for frame in clip.iter_frames(fps=fps, dtype="uint8"):
+                process.stdin.write(frame.tobytes())
+        except BrokenPipeError:
+            pass  # ffmpeg quit; its error message follows
+        finally:
+            process.stdin.close()
+            returncode = process.wait()
+        if returncode != 0:
+            errors.seek(0)
+            message = errors.read().decode("utf-8", errors="replace").strip()
+            raise RuntimeError(f"ffmpeg multi-output encode failed: {message}")
+    return paths
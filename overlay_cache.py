@@ -0,0 +1,97 @@
+# ---------------------------------------------------------------
+# Cached Overlay Compositing 🧅
+# ---------------------------------------------------------------
+# Only the background really moves: the title card stays put for the
+# whole video, a subtitle word for a few hundred ms, and the follow
+# animation freezes on its last frame once it's done. Yet a plain
+# CompositeVideoClip re-blends every layer for every frame.
+#
+# Here the overlay layers are pre-blended into one cached stack (colour
+# + transparency) that is only rebuilt when a layer's content changes,
+# i.e. a word appears/disappears or an animated layer advances a frame.
+# Each frame is then one blend of the stack over the background, and
+# only inside the stack's bounding box (the "dirty region").
+# ---------------------------------------------------------------
+
+import numpy as np
+
+import lazy_imports
+
+def _layer_key(clip, t, static):
+    """What a layer shows at time t: None if inactive, else a content key."""
+    if t < clip.start or (clip.end is not None and t >= clip.end):
+        return None
+    if static:
+        return 0  # An image: the same for as long as it's on screen
+    local_t = t - clip.start
+    frame_key = getattr(clip, "frame_key", None)  # e.g. memoized overlays
+    if frame_key is not None:
+        return frame_key(local_t)
+    return int(round(local_t * (getattr(clip, "fps", None) or 1000)))
+
+def _build_stack(overlays, keys, t, size):
+    """
+    Blend the active overlays over black and over white. From the two we
+    get the premultiplied colour and the per-pixel transparency.
+    """
+    width, height = size
+    on_black = np.zeros((height, width, 3), dtype=np.float32)
+    on_white = np.full((height, width, 3), 255.0, dtype=np.float32)
+    for clip, key in zip(overlays, keys):
+        if key is not None:
+            on_black = clip.blit_on(on_black, t)
+            on_white = clip.blit_on(on_white, t)
+    transparency = ((on_white - on_black) / 255.0).astype(np.float32)
+    covered = (transparency < 1.0).any(axis=2)
+    rows, cols = np.flatnonzero(covered.any(axis=1)), np.flatnonzero(covered.any(axis=0))
+    if not len(rows):
+        return None  # Nothing on screen
+    y0, y1 = rows[0], rows[-1] + 1
+    x0, x1 = cols[0], cols[-1] + 1
+    return {
+        "box": (y0, y1, x0, x1),
+        "color": on_black[y0:y1, x0:x1].astype(np.float32),
+        "transparency": transparency[y0:y1, x0:x1],
+    }
+
+def cached_composite(background, overlays, size, duration):
+    """
+    A clip showing `overlays` (in stacking order, with their own start,
+    end, position and mask) over `background`, re-blending the overlay
+    stack only when its content changes. The returned clip's
+    `overlay_cache_stats` counts frames, cache hits and rebuilds.
+    """
+    width, height = size
+    image_clip = lazy_imports.load("moviepy.video.VideoClip").ImageClip
+    static = [isinstance(clip, image_clip) for clip in overlays]
+    cache = {"key": object(), "stack": None}
+    stats = {"frames": 0, "hits": 0, "rebuilds": 0}
+
+    def make_frame(t):
+        frame = background.get_frame(t)
+        if frame.shape[:2] != (height, width):
+            frame = background.blit_on(np.zeros((height, width, 3), dtype=np.float32), t)
+        key = tuple(_layer_key(clip, t, is_static) for clip, is_static in zip(overlays, static))
+        stats["frames"] += 1
+        if key == cache["key"]:
+            stats["hits"] += 1
+        else:
+            cache["key"] = key
+            cache["stack"] = _build_stack(overlays, key, t, size)
+            stats["rebuilds"] += 1
+
+        stack = cache["stack"]
+        if stack is None:
+            return frame
+        y0, y1, x0, x1 = stack["box"]
+        out = np.array(frame, dtype=np.uint8, copy=True)
+        region = frame[y0:y1, x0:x1].astype(np.float32)
+        out[y0:y1, x0:x1] = np.clip(stack["color"] + region * stack["transparency"], 0, 255).astype(np.uint8)
+        return out
+
+    clip = lazy_imports.load("moviepy.video.VideoClip").VideoClip(make_frame, duration=duration)
+    clip.overlay_cache_stats = stats
+    return clip
+
+def hit_rate(stats):
+    return stats["hits"] / stats["frames"] if stats["frames"] else 0.0
@@ -0,0 +1,186 @@
+# ---------------------------------------------------------------
+# Rate Limits for External Services 🚦
+# ---------------------------------------------------------------
+# Every call to Reddit, OpenAI and Google TTS goes through call():
+#
+#   response = rate_limits.call("openai", client.responses.create, model=..., input=...)
+#
+# Per service there is
+#   - a token bucket (steady requests/second + a burst allowance), so
+#     we pace ourselves under the quota instead of hitting it, and
+#   - an adaptive concurrency limit (AIMD): it's halved whenever the
+#     service throttles us (429 / RESOURCE_EXHAUSTED / RateLimitError)
+#     and creeps back up by one after a run of successes.
+#
+# A throttled call still raises, so job_manifest.retry_transient backs
+# off and retries it; the limiter just makes sure the other threads
+# slow down too. Limits are per process. Time spent waiting is counted
+# per service; see stats() / print_report().
+# ---------------------------------------------------------------
+
+import threading
+import time
+
+# rate: requests/second, burst: requests allowed back to back,
+# concurrency: starting in-flight limit (adapts between 1 and max_concurrency)
+SERVICE_LIMITS = {
+    "reddit": {"rate": 1.0, "burst": 10, "concurrency": 2, "max_concurrency": 4},
+    "openai": {"rate": 1.0, "burst": 3, "concurrency": 2, "max_concurrency": 8},
+    "google_tts": {"rate": 10.0, "burst": 10, "concurrency": 4, "max_concurrency": 8},
+}
+# Raise the concurrency limit by one after this many successes in a row
+INCREASE_AFTER_SUCCESSES = 10
+
+THROTTLE_ERROR_NAMES = {"TooManyRequests", "ResourceExhausted", "RateLimitError"}
+THROTTLE_MARKERS = ("429", "RESOURCE_EXHAUSTED", "rate limit", "ratelimit")
+
+class TokenBucket:
+    """Thread-safe token bucket; take() blocks until a token is available, try_take() doesn't."""
+
+    def __init__(self, rate, burst):
+        self.rate, self.burst = rate, burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def take(self):
+        """Take one token. Returns the seconds spent waiting for it."""
+        waited = 0.0
+        while True:
+            with self._lock:
+                self._refill(time.monotonic())
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return waited
+                delay = (1 - self.tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+    def try_take(self):
+        """Take one token if there is one right now. Returns whether it did."""
+        with self._lock:
+            self._refill(time.monotonic())
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return True
+            return False
+
+    def drain(self):
+        """Throttled: spend what's left, so the next call waits a full interval."""
+        with self._lock:
+            self._refill(time.monotonic())
+            self.tokens = min(self.tokens, 0.0)
+
+class AdaptiveLimit:
+    """In-flight call limit that halves on throttling and grows by one after successes."""
+
+    def __init__(self, initial, maximum, increase_after=INCREASE_AFTER_SUCCESSES):
+        self.limit, self.maximum, self.increase_after = float(initial), maximum, increase_after
+        self.active = 0
+        self.successes = 0
+        self._cond = threading.Condition()
+
+    def acquire(self):
+        """Wait for a free slot. Returns the seconds spent waiting."""
+        start = time.monotonic()
+        with self._cond:
+            while self.active >= max(1, int(self.limit)):
+                self._cond.wait()
+            self.active += 1
+        return time.monotonic() - start
+
+    def release(self, throttled=False):
+        with self._cond:
+            self.active -= 1
+            if throttled:
+                self.limit = max(1.0, self.limit / 2)
+                self.successes = 0
+            else:
+                self.successes += 1
+                if self.successes >= self.increase_after and self.limit < self.maximum:
+                    self.limit += 1
+                    self.successes = 0
+            self._cond.notify_all()
+
+_services = {}  # name -> {"bucket", "limit", "stats"}
+_services_lock = threading.Lock()
+
+def _service(name):
+    with _services_lock:
+        if name not in _services:
+            config = SERVICE_LIMITS[name]
+            _services[name] = {
+                "bucket": TokenBucket(config["rate"], config["burst"]),
+                "limit": AdaptiveLimit(config["concurrency"], config["max_concurrency"]),
+                "stats": {"calls": 0, "throttled": 0, "errors": 0, "wait_s": 0.0},
+                "lock": threading.Lock(),
+            }
+        return _services[name]
+
+def reset(service=None):
+    """
+    Forget a service's limiter state and stats (every service's if None),
+    e.g. after changing SERVICE_LIMITS; the next call starts afresh.
+    """
+    with _services_lock:
+        if service is None:
+            _services.clear()
+        else:
+            _services.pop(service, None)
+
+def is_throttle_error(error):
+    """True for "slow down" responses: HTTP 429, gRPC RESOURCE_EXHAUSTED, OpenAI RateLimitError."""
+    if any(cls.__name__ in THROTTLE_ERROR_NAMES for cls in type(error).__mro__):
+        return True
+    for attr in ("code", "status", "status_code"):
+        if getattr(error, attr, None) == 429:
+            return True
+    message = str(error)
+    return any(marker.lower() in message.lower() for marker in THROTTLE_MARKERS)
+
+def call(service, fn, *args, **kwargs):
+    """
+    fn(*args, **kwargs), paced by the service's token bucket and
+    concurrency limit. Services without an entry in SERVICE_LIMITS
+    (e.g. local TTS engines) are called straight away.
+    """
+    if service not in SERVICE_LIMITS:
+        return fn(*args, **kwargs)
+    state = _service(service)
+    waited = state["limit"].acquire()
+    throttled = False
+    try:
+        waited += state["bucket"].take()
+        return fn(*args, **kwargs)
+    except Exception as e:
+        throttled = is_throttle_error(e)
+        if throttled:
+            state["bucket"].drain()
+        with state["lock"]:
+            state["stats"]["throttled" if throttled else "errors"] += 1
+        raise
+    finally:
+        state["limit"].release(throttled)
+        with state["lock"]:
+            state["stats"]["calls"] += 1
+            state["stats"]["wait_s"] += waited
+
+def stats():
+    """Per service: calls, throttled, errors, seconds waited and the current concurrency limit."""
+    with _services_lock:
+        services = dict(_services)
+    report = {}
+    for name, state in services.items():
+        with state["lock"]:
+            report[name] = dict(state["stats"], wait_s=round(state["stats"]["wait_s"], 2),
+                                concurrency=round(state["limit"].limit, 1))
+    return report
+
+def print_report():
+    for name, service_stats in sorted(stats().items()):
+        print(f"[{name}] {service_stats['calls']} calls, {service_stats['throttled']} throttled, "
+              f"{service_stats['wait_s']:.1f}s waiting, concurrency limit {service_stats['concurrency']}")
@@ -0,0 +1,212 @@
+# ---------------------------------------------------------------
+# On-Demand Sampling Profiler 🔬
+# ---------------------------------------------------------------
+# When a render suddenly takes 3x longer, telemetry tells you which
+# stage got slow; this tells you why (frame blending, mask_color,
+# ImageMagick spawns, waiting on ffmpeg...). It's off by default.
+# Switch it on for some stages and/or jobs:
+#
+#   stage_profiler.configure(stages={"encode", "subtitle_build"})
+#   stage_profiler.configure(jobs={"attempt3*"})          # every stage
+#   python Redditcontentlocal.py --profile-stages encode batch 5
+#
+# While a chosen telemetry stage runs, a background thread samples
+# every thread's Python stack (wall clock, PROFILE_INTERVAL apart).
+# Each video then gets, next to its _telemetry.json:
+#   <name>_profile.folded            flamegraph.pl / speedscope input
+#   <name>_profile.speedscope.json   open at https://www.speedscope.app
+#
+# Stacks start with the stage name, then the thread. Segments encoded
+# in worker processes are sampled there and merged in. When nothing is
+# configured, a stage pays two emptiness checks.
+# ---------------------------------------------------------------
+
+import fnmatch
+import json
+import os
+import sys
+import threading
+import time
+from collections import Counter
+
+PROFILE_STAGES = set()  # Telemetry stage names, e.g. {"encode", "subtitle_build"}
+PROFILE_JOBS = set()    # fnmatch patterns over telemetry job names, e.g. {"attempt3*"}
+PROFILE_INTERVAL = 0.005  # Seconds between samples
+
+_active = None  # The sampler running right now (stages nest; the outer one covers them)
+
+def configure(stages=None, jobs=None, interval=None):
+    """Choose what to profile. Empty stages and jobs switch profiling off."""
+    global PROFILE_INTERVAL
+    PROFILE_STAGES.clear()
+    PROFILE_STAGES.update(stages or ())
+    PROFILE_JOBS.clear()
+    PROFILE_JOBS.update(jobs or ())
+    if interval:
+        PROFILE_INTERVAL = interval
+
+def settings():
+    """The current switch, to hand to worker processes (see apply())."""
+    return {"stages": sorted(PROFILE_STAGES), "jobs": sorted(PROFILE_JOBS), "interval": PROFILE_INTERVAL}
+
+def apply(config):
+    configure(config["stages"], config["jobs"], config["interval"])
+
+def _job_names(job_record):
+    while job_record is not None:
+        yield job_record["name"]
+        job_record = job_record["parent"]
+
+def wanted(stage_name, job_record):
+    """Should this stage be profiled? Stages and jobs must both match if both are given."""
+    if not PROFILE_STAGES and not PROFILE_JOBS:
+        return False
+    if PROFILE_STAGES and stage_name not in PROFILE_STAGES:
+        return False
+    if PROFILE_JOBS:
+        return any(fnmatch.fnmatch(name, pattern) for name in _job_names(job_record) for pattern in PROFILE_JOBS)
+    return True
+
+def start(stage_name, job_record):
+    """A running Sampler if this stage should be profiled, else None."""
+    if _active is not None or not wanted(stage_name, job_record):
+        return None
+    return Sampler(root=f"stage {stage_name}", job_record=job_record)
+
+def active():
+    return _active
+
+# ---------------------------------------------------------------
+# Sampling
+# ---------------------------------------------------------------
+def _frame_label(code):
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+class Sampler:
+    """
+    Samples every other thread's stack until stopped. Use as a context
+    manager; on exit the samples are added to `job_record["profile"]`
+    (a Counter of root-first stack tuples -> sample count).
+    """
+
+    def __init__(self, root=None, job_record=None, interval=None):
+        global _active
+        self.root, self.job_record = root, job_record
+        self.interval = interval or PROFILE_INTERVAL
+        self.counts = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="stage-profiler", daemon=True)
+        _active = self
+        self._thread.start()
+
+    def _run(self):
+        own = threading.get_ident()
+        prefix = (self.root,) if self.root else ()
+        while not self._stop.wait(self.interval):
+            names = {t.ident: t.name for t in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                stack = []
+                while frame is not None:
+                    stack.append(_frame_label(frame.f_code))
+                    frame = frame.f_back
+                stack.append(f"thread {names.get(ident, ident)}")
+                self.counts[prefix + tuple(reversed(stack))] += 1
+
+    def add(self, counts, prefix=()):
+        """Merge samples taken elsewhere (e.g. a segment's worker process)."""
+        for stack, count in counts.items():
+            self.counts[(self.root,) + tuple(prefix) + tuple(stack)] += count
+
+    def stop(self):
+        global _active
+        self._stop.set()
+        self._thread.join()
+        if _active is self:
+            _active = None
+        if self.job_record is not None:
+            self.job_record.setdefault("profile", Counter()).update(self.counts)
+        return self.counts
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+        return False
+
+# ---------------------------------------------------------------
+# Writing profiles
+# ---------------------------------------------------------------
+def job_samples(job_record):
+    """A job's samples, including its parent jobs' shared stages."""
+    counts = Counter()
+    while job_record is not None:
+        counts.update(job_record.get("profile") or {})
+        job_record = job_record["parent"]
+    return counts
+
+def write_folded(counts, path):
+    """Collapsed stacks ("a;b;c 42" per line): flamegraph.pl, speedscope, inferno..."""
+    with open(path, "w", encoding="utf-8") as f:
+        for stack, count in sorted(counts.items()):
+            f.write(";".join(frame.replace(";", ",") for frame in stack) + f" {count}\n")
+    return path
+
+def write_speedscope(counts, path, name, interval=None):
+    """A speedscope file with one sampled profile per thread (weights in seconds)."""
+    interval = interval or PROFILE_INTERVAL
+    frames, frame_index = [], {}
+    per_thread = {}
+    for stack, count in counts.items():
+        # (stage, thread, frames...) -> the thread picks the profile
+        thread = next((frame for frame in stack if frame.startswith("thread ")), "thread ?")
+        indices = []
+        for frame in stack:
+            if frame == thread:
+                continue
+            if frame not in frame_index:
+                frame_index[frame] = len(frames)
+                frames.append({"name": frame})
+            indices.append(frame_index[frame])
+        samples, weights = per_thread.setdefault(thread, ([], []))
+        samples.append(indices)
+        weights.append(round(count * interval, 6))
+    profiles = []
+    for thread, (samples, weights) in sorted(per_thread.items(), key=lambda item: -sum(item[1][1])):
+        profiles.append({
+            "type": "sampled",
+            "name": f"{name} - {thread}",
+            "unit": "seconds",
+            "startValue": 0,
+            "endValue": round(sum(weights), 6),
+            "samples": samples,
+            "weights": weights,
+        })
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "shared": {"frames": frames},
+            "profiles": profiles,
+            "name": name,
+            "exporter": "stage_profiler",
+            "activeProfileIndex": 0,
+        }, f)
+    return path
+
+def write_job_profile(job_record, base_path):
+    """
+    Write <base_path>_profile.folded and _profile.speedscope.json if the
+    job has samples. Returns the written paths ([] if nothing was profiled).
+    """
+    counts = job_samples(job_record)
+    if not counts:
+        return []
+    name = f"{job_record['name']} ({time.strftime('%Y-%m-%d %H:%M', time.localtime(job_record['started']))})"
+    paths = [
+        write_folded(counts, f"{base_path}_profile.folded"),
+        write_speedscope(counts, f"{base_path}_profile.speedscope.json", name),
+    ]
+    print(f"Profile written to {paths[1]} ({sum(counts.values())} samples).")
+    return paths
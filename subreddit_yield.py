@@ -0,0 +1,175 @@
+# ---------------------------------------------------------------
+# Subreddit Yield 🎯
+# ---------------------------------------------------------------
+# Some subreddits keep serving image posts, walls of text or threads
+# too short for a video, and every miss costs a whole attempt of API
+# calls. So we keep score per subreddit, persisted in
+# subreddit_yield.json between runs:
+#
+#   attempts, candidates (posts fetched), rejections by reason,
+#   successes (threads that became videos), videos, seconds spent
+#
+# and pick the next subreddit by Thompson sampling: draw a plausible
+# success rate for each one from its record (a Beta distribution) and
+# take the best draw. Good sources win most of the time, while ones we
+# know little about (or that had a bad week) still get tried. Recent
+# attempts count more than old ones (YIELD_DECAY), since "top of the
+# week" changes every week.
+#
+# Queue workers on the same machine share the file: record() holds an
+# exclusive lock on subreddit_yield.json.lock while it reads, updates
+# and rewrites it (POSIX only; elsewhere concurrent updates can be lost).
+# ---------------------------------------------------------------
+
+import contextlib
+import json
+import os
+import random
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+YIELD_FILE = "subreddit_yield.json"
+# Weight of older attempts in the selector: each new attempt multiplies
+# the subreddit's past counts by this (0.97 -> roughly the last 30 count)
+YIELD_DECAY = 0.97
+# Monte Carlo draws for the "attempts saved" estimate
+SHARE_DRAWS = 2000
+
+# Rejection reasons recorded by the engine:
+#   no_posts, all_used, no_comment_list, not_enough_comments, too_short
+#   (fetch_reddit_post), long_title, claimed, no_video, error (process_thread)
+
+def load_yield(path=None):
+    """Per-subreddit records (empty if nothing was recorded yet)."""
+    path = path or YIELD_FILE
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"Warning: Could not read subreddit yield '{path}': {e}. Starting fresh.")
+        return {}
+
+def save_yield(stats, path=None):
+    path = path or YIELD_FILE
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(stats, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, path)
+
+def _entry(stats, subreddit):
+    return stats.setdefault(subreddit, {
+        "attempts": 0, "candidates": 0, "rejections": {}, "successes": 0, "videos": 0, "seconds": 0.0,
+        "recent_attempts": 0.0, "recent_successes": 0.0,
+    })
+
+@contextlib.contextmanager
+def _locked(path):
+    """Hold an exclusive lock on <path>.lock (a no-op without fcntl)."""
+    if fcntl is None:
+        yield
+        return
+    with open(path + ".lock", "a") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+def record(subreddit, attempts=0, candidates=0, rejection=None, videos=0, seconds=0.0, path=None):
+    """
+    Add to a subreddit's record and save it. The file is re-read under a
+    lock, so several worker processes can share it.
+    """
+    path = path or YIELD_FILE
+    with _locked(path):
+        stats = load_yield(path)
+        entry = _entry(stats, subreddit)
+        for _ in range(attempts):
+            entry["attempts"] += 1
+            entry["recent_attempts"] = entry["recent_attempts"] * YIELD_DECAY + 1
+            entry["recent_successes"] *= YIELD_DECAY
+        entry["candidates"] += candidates
+        if rejection:
+            entry["rejections"][rejection] = entry["rejections"].get(rejection, 0) + 1
+        if videos:
+            entry["successes"] += 1
+            entry["videos"] += videos
+            entry["recent_successes"] = min(entry["recent_attempts"], entry["recent_successes"] + 1)
+        entry["seconds"] = round(entry["seconds"] + seconds, 2)
+        save_yield(stats, path)
+    return entry
+
+def success_rate(entry):
+    """Expected share of attempts that become videos (with a uniform prior)."""
+    if not entry:
+        return 0.5
+    return (entry["recent_successes"] + 1) / (entry["recent_attempts"] + 2)
+
+def _draw(entry, rng):
+    successes = entry["recent_successes"] if entry else 0.0
+    failures = max(0.0, entry["recent_attempts"] - successes) if entry else 0.0
+    return rng.betavariate(successes + 1, failures + 1)
+
+def choose(choices, stats=None, rng=random):
+    """Thompson sampling: the subreddit with the best draw from its success-rate distribution."""
+    stats = load_yield() if stats is None else stats
+    return max(choices, key=lambda name: _draw(stats.get(name), rng))
+
+def selection_shares(choices, stats, draws=SHARE_DRAWS, rng=None):
+    """How often choose() would pick each subreddit right now."""
+    rng = rng or random.Random(0)
+    wins = dict.fromkeys(choices, 0)
+    for _ in range(draws):
+        wins[max(choices, key=lambda name: _draw(stats.get(name), rng))] += 1
+    return {name: count / draws for name, count in wins.items()}
+
+def summary(choices, stats=None):
+    """
+    Per subreddit: the record, its success rate and selection share.
+    Overall: attempts per video observed so far, and the expected
+    attempts per video picking uniformly vs picking by yield.
+    """
+    stats = load_yield() if stats is None else stats
+    shares = selection_shares(choices, stats)
+    rates = {name: success_rate(stats.get(name)) for name in choices}
+    attempts = sum(stats.get(name, {}).get("attempts", 0) for name in choices)
+    successes = sum(stats.get(name, {}).get("successes", 0) for name in choices)
+    seconds = sum(stats.get(name, {}).get("seconds", 0.0) for name in choices)
+    uniform = 1 / (sum(rates.values()) / len(rates))
+    adaptive = 1 / sum(shares[name] * rates[name] for name in choices)
+    return {
+        "subreddits": {
+            name: dict(stats.get(name) or {}, success_rate=round(rates[name], 3), share=round(shares[name], 3))
+            for name in choices
+        },
+        "attempts": attempts,
+        "successes": successes,
+        "attempts_per_video": round(attempts / successes, 2) if successes else None,
+        "seconds_per_success": round(seconds / successes, 1) if successes else None,
+        "expected_attempts_per_video_uniform": round(uniform, 2),
+        "expected_attempts_per_video_adaptive": round(adaptive, 2),
+        "attempts_saved_per_video": round(uniform - adaptive, 2),
+    }
+
+def print_report(choices, stats=None):
+    report = summary(choices, stats)
+    print("Subreddit yield (share = how often it's picked now):")
+    rows = sorted(report["subreddits"].items(), key=lambda item: -item[1]["share"])
+    for name, entry in rows:
+        rejections = ", ".join(f"{reason} {n}" for reason, n in sorted(entry.get("rejections", {}).items(),
+                                                                    key=lambda item: -item[1]))
+        per_success = (f", {entry['seconds'] / entry['successes']:.0f}s/success"
+                       if entry.get("successes") else "")
+        print(f"  r/{name:<20} {entry['share']:>5.0%} share, {entry.get('successes', 0)}/{entry.get('attempts', 0)} "
+              f"attempts succeeded ({entry['success_rate']:.0%} recent){per_success}"
+              + (f"; rejected: {rejections}" if rejections else ""))
+    observed = report["attempts_per_video"]
+    print(f"Attempts per video: {observed if observed is not None else '-'} so far; expected "
+          f"{report['expected_attempts_per_video_adaptive']} picking by yield vs "
+          f"{report['expected_attempts_per_video_uniform']} uniformly "
+          f"(saves {report['attempts_saved_per_video']} per video).")
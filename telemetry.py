@@ -0,0 +1,264 @@
+# ---------------------------------------------------------------
+# Job Telemetry 📈
+# ---------------------------------------------------------------
+# Structured timing + resource numbers for every stage of a video
+# job: wall time, CPU time (ours and our ffmpeg children's), peak
+# RSS, open file descriptors and live child processes.
+#
+# Every finished stage is appended to telemetry.jsonl, and each video
+# gets a <name>_telemetry.json summary next to its _tags.txt file.
+#
+#   with telemetry.job("thread3_en"):
+#       with telemetry.stage("tts", index=2):
+#           ...
+#
+# Uses /proc on Linux; install psutil for the same numbers elsewhere.
+# ---------------------------------------------------------------
+
+import json
+import os
+import time
+from contextlib import contextmanager, nullcontext
+
+import stage_profiler  # Optional sampling profiles for chosen stages/jobs
+
+try:
+    import resource  # Not available on Windows
+except ImportError:
+    resource = None
+
+try:
+    import psutil  # Optional: open files/children/RSS on Windows & macOS
+except ImportError:
+    psutil = None
+
+TELEMETRY_ENABLED = True
+TELEMETRY_LOG = "telemetry.jsonl"
+
+_job_stack = []    # Innermost job last
+_stage_stack = []  # Stages currently running (for nested peak RSS)
+
+# ---------------------------------------------------------------
+# Resource probes (each returns None if the platform can't tell us)
+# ---------------------------------------------------------------
+def _read_proc_status_kb(field):
+    try:
+        with open("/proc/self/status", "r") as f:
+            for line in f:
+                if line.startswith(field + ":"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return None
+
+def reset_peak_rss():
+    """Reset the kernel's peak-RSS counter (Linux only). Returns True on success."""
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+        return True
+    except OSError:
+        return False
+
+def peak_rss_mb():
+    """Peak resident memory in MB since the last reset (or process start)."""
+    hwm = _read_proc_status_kb("VmHWM")
+    if hwm is not None:
+        return hwm / 1024
+    if resource is not None:
+        # ru_maxrss is KB on Linux, bytes on macOS
+        maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return maxrss / (1024 * 1024) if os.uname().sysname == "Darwin" else maxrss / 1024
+    if psutil is not None:
+        info = psutil.Process().memory_info()
+        return getattr(info, "peak_wset", info.rss) / (1024 * 1024)
+    return None
+
+def rss_mb():
+    """Current resident memory in MB."""
+    rss = _read_proc_status_kb("VmRSS")
+    if rss is not None:
+        return rss / 1024
+    if psutil is not None:
+        return psutil.Process().memory_info().rss / (1024 * 1024)
+    return None
+
+def open_fd_count():
+    """Open file descriptors (handles on Windows)."""
+    try:
+        return len(os.listdir("/proc/self/fd"))
+    except OSError:
+        pass
+    if psutil is not None:
+        proc = psutil.Process()
+        return proc.num_handles() if hasattr(proc, "num_handles") else proc.num_fds()
+    return None
+
+def child_process_count():
+    """Child processes still alive (e.g. ffmpeg readers MoviePy left open)."""
+    if psutil is not None:
+        return len(psutil.Process().children(recursive=True))
+    pid = str(os.getpid())
+    try:
+        entries = os.listdir("/proc")
+    except OSError:
+        return None
+    count = 0
+    for entry in entries:
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat", "r") as f:
+                # Field 4 is the parent pid; the name (field 2) may contain spaces
+                if f.read().rsplit(")", 1)[1].split()[1] == pid:
+                    count += 1
+        except (OSError, IndexError):
+            continue
+    return count
+
+def _cpu_times():
+    times = os.times()
+    return times.user + times.system, times.children_user + times.children_system
+
+# ---------------------------------------------------------------
+# Jobs & stages
+# ---------------------------------------------------------------
+def _append_log(record):
+    try:
+        with open(TELEMETRY_LOG, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+    except OSError as e:
+        print(f"Warning: Could not write telemetry: {e}")
+
+def current_job():
+    return _job_stack[-1] if _job_stack else None
+
+@contextmanager
+def job(name, **meta):
+    """
+    Group stages under a job (one video, or one fetched thread). Jobs nest:
+    a video's summary also includes its parent thread's shared stages.
+    """
+    record = {
+        "name": name,
+        "parent": current_job(),
+        "meta": meta,
+        "stages": [],
+        "started": time.time(),
+        "wall_start": time.perf_counter(),
+    }
+    _job_stack.append(record)
+    try:
+        yield record
+    finally:
+        record["wall_seconds"] = time.perf_counter() - record["wall_start"]
+        _job_stack.pop()
+
+@contextmanager
+def stage(name, **fields):
+    """
+    Time one stage of the current job and log it, even if it raises.
+    Extra keyword fields (comment index, chars, ...) go into the record.
+    Stages chosen in stage_profiler are sampled while they run.
+    """
+    with stage_profiler.start(name, current_job()) or nullcontext(), _timed_stage(name, **fields) as record:
+        yield record
+
+@contextmanager
+def _timed_stage(name, **fields):
+    if not TELEMETRY_ENABLED:
+        yield None
+        return
+    record = {"stage": name, **fields}
+    active = {"inner_peak": None}
+    # Outer stages keep the highest peak any inner stage saw, since each
+    # stage resets the kernel's counter when it starts.
+    if _stage_stack:
+        outer = _stage_stack[-1]
+        outer_peak = peak_rss_mb()
+        if outer_peak is not None:
+            outer["inner_peak"] = max(outer["inner_peak"] or 0, outer_peak)
+    _stage_stack.append(active)
+    reset_peak_rss()
+    wall_start = time.perf_counter()
+    cpu_start, child_cpu_start = _cpu_times()
+    try:
+        yield record
+        record["ok"] = True
+    except BaseException as e:
+        record["ok"] = False
+        record["error"] = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        cpu_end, child_cpu_end = _cpu_times()
+        peak = peak_rss_mb()
+        if active["inner_peak"] is not None:
+            peak = max(peak or 0, active["inner_peak"])
+        _stage_stack.pop()
+        if _stage_stack and peak is not None:
+            _stage_stack[-1]["inner_peak"] = max(_stage_stack[-1]["inner_peak"] or 0, peak)
+        job_record = current_job()
+        current_rss = rss_mb()
+        record.update({
+            "ts": time.time(),
+            "job": job_record["name"] if job_record else None,
+            "wall_s": round(time.perf_counter() - wall_start, 4),
+            "cpu_s": round(cpu_end - cpu_start, 4),
+            "child_cpu_s": round(child_cpu_end - child_cpu_start, 4),
+            "peak_rss_mb": round(peak, 1) if peak is not None else None,
+            "rss_mb": round(current_rss, 1) if current_rss is not None else None,
+            "open_fds": open_fd_count(),
+            "children": child_process_count(),
+        })
+        if job_record is not None:
+            job_record["stages"].append(record)
+        _append_log(record)
+
+def log_event(event, **fields):
+    """Log a one-off event (e.g. batch progress) to the JSON-lines log."""
+    if TELEMETRY_ENABLED:
+        _append_log({"ts": time.time(), "event": event, **fields})
+
+def summarize_job(job_record):
+    """Per-stage totals for a job, including its parent jobs' shared stages."""
+    stages = list(job_record["stages"])
+    parent = job_record["parent"]
+    while parent is not None:
+        stages = [dict(s, shared=True) for s in parent["stages"]] + stages
+        parent = parent["parent"]
+
+    per_stage = {}
+    for s in stages:
+        total = per_stage.setdefault(s["stage"], {
+            "count": 0, "wall_s": 0.0, "cpu_s": 0.0, "child_cpu_s": 0.0,
+            "peak_rss_mb": None, "max_open_fds": None, "max_children": None, "failures": 0,
+        })
+        total["count"] += 1
+        total["wall_s"] += s["wall_s"]
+        total["cpu_s"] += s["cpu_s"]
+        total["child_cpu_s"] += s["child_cpu_s"]
+        for key, value_key in (("peak_rss_mb", "peak_rss_mb"), ("max_open_fds", "open_fds"), ("max_children", "children")):
+            if s.get(value_key) is not None:
+                total[key] = max(total[key] or 0, s[value_key])
+        if not s.get("ok", True):
+            total["failures"] += 1
+    for total in per_stage.values():
+        for key in ("wall_s", "cpu_s", "child_cpu_s"):
+            total[key] = round(total[key], 4)
+
+    return {
+        "job": job_record["name"],
+        "meta": job_record["meta"],
+        "started": job_record["started"],
+        "wall_seconds": round(time.perf_counter() - job_record["wall_start"], 4),
+        "stages": per_stage,
+        "records": stages,
+    }
+
+def write_job_summary(job_record, path):
+    """Write a job's summary JSON (e.g. next to the video's _tags.txt)."""
+    if not TELEMETRY_ENABLED:
+        return None
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(summarize_job(job_record), f, indent=2, ensure_ascii=False)
+    return path
@@ -0,0 +1,59 @@
+import pytest
+
+import duration_planner
+
+# Redditcontentlocal.MIN_VIDEO_DURATION / MAX_VIDEO_DURATION (importing the engine needs its dependencies)
+MIN_VIDEO_DURATION = 30
+MAX_VIDEO_DURATION = 120
+KEY = duration_planner.calibration_key("en-US-Wavenet-D", 1.0, 1.0)
+PRIOR = duration_planner.DEFAULT_CHARS_PER_SECOND["en-US"]
+
+def test_prior_without_samples():
+    assert duration_planner.chars_per_second({}, KEY, "en-US") == pytest.approx(PRIOR)
+    assert duration_planner.chars_per_second({}, KEY, "xx-XX", speaking_rate=1.2, speed=1.5) == pytest.approx(
+        duration_planner.FALLBACK_CHARS_PER_SECOND * 1.2 * 1.5)
+
+def test_prior_dominates_a_few_samples_and_data_wins_with_many():
+    calibration = {}
+    text = "a" * 100  # 100 spoken characters, synthesized at 20 chars/s
+    duration_planner.record_synthesis(calibration, KEY, text, 5.0)
+    few = duration_planner.chars_per_second(calibration, KEY, "en-US")
+    assert PRIOR < few < (PRIOR + 20.0) / 2  # One odd synthesis barely moves it
+
+    for _ in range(200):
+        duration_planner.record_synthesis(calibration, KEY, text, 5.0)
+    many = duration_planner.chars_per_second(calibration, KEY, "en-US")
+    assert many == pytest.approx(20.0, abs=0.2)
+    assert calibration[KEY]["count"] == 201
+
+def test_empty_or_silent_syntheses_are_ignored():
+    calibration = {}
+    duration_planner.record_synthesis(calibration, KEY, "...", 2.0)
+    duration_planner.record_synthesis(calibration, KEY, "hello", 0.0)
+    assert calibration == {}
+
+def test_calibration_round_trip(tmp_path):
+    path = str(tmp_path / "tts_calibration.json")
+    calibration = {}
+    duration_planner.record_synthesis(calibration, KEY, "hello there", 1.0)
+    duration_planner.save_calibration(calibration, path)
+    assert duration_planner.load_calibration(path) == calibration
+    assert duration_planner.load_calibration(str(tmp_path / "missing.json")) == {}
+
+def test_plan_stays_inside_the_window():
+    durations = [40, 50, 45, 10, 5, 30]
+    selected, total = duration_planner.plan_comments(durations, 6.0, 0.5, MAX_VIDEO_DURATION, MIN_VIDEO_DURATION)
+    assert MIN_VIDEO_DURATION <= total <= MAX_VIDEO_DURATION
+    # 45 doesn't fit after 40 + 50, but the shorter comments after it still do
+    assert selected == [0, 1, 3, 4]
+    assert total == pytest.approx(6.0 + 0.5 + sum(durations[i] + 0.5 for i in selected))
+
+def test_plan_skips_comments_that_would_overrun():
+    selected, total = duration_planner.plan_comments([200, 20, 0, 15], 5.0, 0.5, MAX_VIDEO_DURATION, MIN_VIDEO_DURATION)
+    assert selected == [1, 3]
+    assert total <= MAX_VIDEO_DURATION
+
+def test_plan_reports_a_thread_too_short_to_fill_the_window():
+    selected, total = duration_planner.plan_comments([5, 4, 3], 3.0, 0.5, MAX_VIDEO_DURATION, MIN_VIDEO_DURATION)
+    assert selected == []
+    assert total < MIN_VIDEO_DURATION
@@ -0,0 +1,89 @@
+import threading
+
+import pytest
+
+import job_queue
+
+@pytest.fixture
+def queue_path(tmp_path):
+    return str(tmp_path / "job_queue.sqlite3")
+
+def expire_leases(broker):
+    """Act as if every lease ran out."""
+    return broker.requeue_expired(now=9e12)
+
+def test_two_brokers_never_claim_the_same_job_or_thread(queue_path):
+    first, second = job_queue.SQLiteBroker(queue_path), job_queue.SQLiteBroker(queue_path)
+    job_queue.submit_batch(first, 20, {"profiles": ["en"]})
+    claimed = {"a": [], "b": []}
+
+    def work(broker, name):
+        while True:
+            job = broker.claim(name)
+            if job is None:
+                return
+            claimed[name].append(job["job_id"])
+
+    threads = [threading.Thread(target=work, args=(broker, name))
+               for broker, name in ((first, "a"), (second, "b"))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(claimed["a"]) + len(claimed["b"]) == 20
+    assert not set(claimed["a"]) & set(claimed["b"])
+
+    # One broker may have drained the queue alone; any two claimed jobs will do
+    job_a, job_b = (claimed["a"] + claimed["b"])[:2]
+    assert first.claim_thread("What's the best movie you've ever seen?", job_a, "a")
+    assert not second.claim_thread("What's the best movie you've ever seen?", job_b, "b")
+    assert second.claimed_threads() == {"What's the best movie you've ever seen?"}
+
+def test_expired_lease_returns_the_job_with_its_thread(queue_path):
+    broker = job_queue.SQLiteBroker(queue_path)
+    job_queue.submit_batch(broker, 2, {})
+    job = broker.claim("dead-worker")
+    assert broker.claim_thread("Some thread", job["job_id"], "dead-worker")
+
+    assert expire_leases(broker) == 1
+    assert broker.counts() == {"queued": 2}
+    # The dead worker lost the job
+    assert not broker.heartbeat(job["job_id"], "dead-worker")
+    assert not broker.complete(job["job_id"], "dead-worker")
+
+    retried = broker.claim("new-worker")
+    assert retried["job_id"] == job["job_id"]
+    assert retried["attempts"] == 2
+    # The thread goes with the job: its new worker may carry on with it, nobody else may take it
+    assert broker.claim_thread("Some thread", retried["job_id"], "new-worker")
+    other = broker.claim("other-worker")
+    assert not broker.claim_thread("Some thread", other["job_id"], "other-worker")
+    assert broker.complete(retried["job_id"], "new-worker", result={"videos": []})
+
+def test_job_fails_after_max_attempts(queue_path):
+    broker = job_queue.SQLiteBroker(queue_path)
+    job_queue.submit_batch(broker, 1, {})
+    for attempt in range(job_queue.MAX_SLOT_ATTEMPTS):
+        job = broker.claim(f"worker-{attempt}")
+        assert job is not None and job["attempts"] == attempt + 1
+        expire_leases(broker)
+    assert broker.counts() == {"failed": 1}
+    assert broker.claim("worker-last") is None
+
+def test_heartbeat_notices_a_lost_lease(queue_path):
+    broker = job_queue.SQLiteBroker(queue_path)
+    job_queue.submit_batch(broker, 1, {})
+    job = broker.claim("worker")
+    heartbeat = job_queue.Heartbeat(broker, job, "worker", interval=60)
+    heartbeat.update(stage="tts")
+    assert not heartbeat.lost
+    assert broker.jobs("leased")[0]["progress"] == {"stage": "tts"}
+
+    expire_leases(broker)
+    heartbeat.beat()
+    assert heartbeat.lost
+
+def test_queue_server_needs_a_token_beyond_localhost(queue_path, monkeypatch):
+    monkeypatch.delenv(job_queue.QUEUE_TOKEN_ENV, raising=False)
+    with pytest.raises(ValueError):
+        job_queue.serve_broker(job_queue.SQLiteBroker(queue_path), host="0.0.0.0", port=0)
@@ -0,0 +1,79 @@
+import pytest
+
+import multi_output
+
+RENDER_PROFILE = {"width": 1080, "height": 1920, "preset": "medium", "crf": 20, "audio_bitrate": "192k"}
+
+def option(args, flag):
+    return args[args.index(flag) + 1]
+
+def output_args(command, path):
+    """The arguments of the output ending at `path` (from its -map onwards)."""
+    end = command.index(path)
+    start = max(i for i in range(end) if command[i] == "-map" and command[i + 1].startswith("[v"))
+    return command[start:end]
+
+def test_missing_settings_come_from_the_render_profile():
+    first, second = multi_output.resolve_specs([{"name": "tiktok"}, {"name": "archive", "container": "webm"}],
+                                               RENDER_PROFILE)
+    assert first == {
+        "name": "tiktok", "suffix": "", "width": 1080, "height": 1920, "preset": "medium", "container": "mp4",
+        "video_codec": "libx264", "audio_codec": "aac", "audio_bitrate": "192k", "crf": 20,
+    }
+    assert (second["suffix"], second["video_codec"], second["audio_codec"]) == ("_archive", "libvpx-vp9", "libopus")
+    assert second["crf"] == 20 and "video_bitrate" not in second
+
+def test_spec_settings_override_the_profile():
+    (spec,) = multi_output.resolve_specs([{"name": "small", "width": 540, "height": 960, "video_bitrate": "800k",
+                                           "preset": "slow", "audio_bitrate": "64k"}], RENDER_PROFILE)
+    assert (spec["width"], spec["height"], spec["preset"], spec["audio_bitrate"]) == (540, 960, "slow", "64k")
+    assert spec["video_bitrate"] == "800k" and "crf" not in spec
+
+def test_specs_need_distinct_paths_and_known_containers():
+    with pytest.raises(ValueError):
+        multi_output.resolve_specs([{"suffix": "_a"}, {"suffix": "_a"}], RENDER_PROFILE)
+    with pytest.raises(ValueError):
+        multi_output.resolve_specs([{"container": "avi"}], RENDER_PROFILE)
+
+def test_one_split_with_a_scaled_label_per_output():
+    specs = multi_output.resolve_specs([
+        {"name": "tiktok"},
+        {"name": "shorts", "crf": 23, "preset": "fast"},
+        {"name": "archive", "width": 540, "height": 960, "video_bitrate": "800k", "container": "mkv",
+         "audio_bitrate": "64k"},
+    ], RENDER_PROFILE)
+    paths = [multi_output.output_path("out/video.mp4", spec) for spec in specs]
+    assert paths == ["out/video.mp4", "out/video_shorts.mp4", "out/video_archive.mkv"]
+    command = multi_output.build_command("ffmpeg", (1080, 1920), 30, specs, paths, soundtrack="mix.m4a",
+                                         soundtrack_format=("aac", "192k"), threads=6)
+
+    assert option(command, "-s") == "1080x1920" and option(command, "-r") == "30"
+    graph = option(command, "-filter_complex").split(";")
+    assert graph == [
+        "[0:v]split=3[s0][s1][s2]",
+        "[s0]null[v0]",
+        "[s1]null[v1]",
+        "[s2]scale=540:960:flags=lanczos[v2]",
+    ]
+
+    tiktok, shorts, archive = (output_args(command, path) for path in paths)
+    assert option(tiktok, "-map") == "[v0]"
+    assert (option(tiktok, "-crf"), option(tiktok, "-preset"), option(tiktok, "-threads")) == ("20", "medium", "2")
+    assert option(tiktok, "-c:a") == "copy"  # The soundtrack is already AAC at this bitrate
+    assert "+faststart" in tiktok
+
+    assert option(shorts, "-map") == "[v1]"
+    assert (option(shorts, "-crf"), option(shorts, "-preset")) == ("23", "fast")
+
+    assert option(archive, "-map") == "[v2]"
+    assert option(archive, "-b:v") == "800k" and "-crf" not in archive
+    assert (option(archive, "-c:a"), option(archive, "-b:a")) == ("aac", "64k")
+    assert "-movflags" not in archive  # mkv has no faststart
+    assert archive.count("-map") == 2 and "1:a:0" in archive
+
+def test_single_output_has_no_split():
+    specs = multi_output.resolve_specs([{"container": "webm"}], RENDER_PROFILE)
+    command = multi_output.build_command("ffmpeg", (1080, 1920), 30, specs, ["video.webm"])
+    assert option(command, "-filter_complex") == "[0:v]null[v0]"
+    assert option(command, "-c:v") == "libvpx-vp9" and option(command, "-b:v") == "0"
+    assert "-c:a" not in command  # No soundtrack, no audio
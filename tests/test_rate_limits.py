@@ -0,0 +1,112 @@
+import threading
+
+import pytest
+
+import rate_limits
+
+class FakeClock:
+    """Stands in for time.monotonic/time.sleep so pacing is exact and instant."""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(rate_limits.time, "monotonic", fake.monotonic)
+    monkeypatch.setattr(rate_limits.time, "sleep", fake.sleep)
+    return fake
+
+class TooManyRequests(Exception):
+    pass
+
+def test_token_bucket_allows_a_burst_then_paces(clock):
+    bucket = rate_limits.TokenBucket(rate=2.0, burst=3)
+    assert [bucket.take() for _ in range(3)] == [0.0, 0.0, 0.0]
+    start = clock.now
+    for _ in range(4):
+        bucket.take()
+    assert clock.now - start == pytest.approx(2.0)  # 4 more tokens at 2/s
+
+def test_try_take_never_waits(clock):
+    bucket = rate_limits.TokenBucket(rate=1.0, burst=2)
+    assert bucket.try_take() and bucket.try_take()
+    assert not bucket.try_take()
+    clock.now += 1.0
+    assert bucket.try_take()
+
+def test_drain_makes_the_next_call_wait_a_full_interval(clock):
+    bucket = rate_limits.TokenBucket(rate=4.0, burst=4)
+    bucket.drain()
+    assert bucket.take() == pytest.approx(0.25)
+
+def test_adaptive_limit_halves_on_throttling_and_grows_back():
+    limit = rate_limits.AdaptiveLimit(initial=8, maximum=8, increase_after=3)
+    limit.acquire()
+    limit.release(throttled=True)
+    assert limit.limit == 4
+    limit.acquire()
+    limit.release(throttled=True)
+    assert limit.limit == 2
+    for _ in range(3):
+        limit.acquire()
+        limit.release()
+    assert limit.limit == 3
+    for _ in range(100):
+        limit.acquire()
+        limit.release()
+    assert limit.limit == 8  # Never above the maximum
+
+def test_adaptive_limit_never_drops_below_one():
+    limit = rate_limits.AdaptiveLimit(initial=2, maximum=4)
+    for _ in range(5):
+        limit.acquire()
+        limit.release(throttled=True)
+    assert limit.limit == 1
+
+def test_adaptive_limit_caps_calls_in_flight():
+    limit = rate_limits.AdaptiveLimit(initial=1, maximum=1)
+    limit.acquire()
+    acquired = threading.Event()
+    waiter = threading.Thread(target=lambda: (limit.acquire(), acquired.set()))
+    waiter.start()
+    assert not acquired.wait(0.05)
+    limit.release()
+    assert acquired.wait(1)
+    waiter.join()
+
+def test_call_counts_throttling_and_reset_forgets_it(clock, monkeypatch):
+    monkeypatch.setitem(rate_limits.SERVICE_LIMITS, "test_service",
+                        {"rate": 100.0, "burst": 10, "concurrency": 4, "max_concurrency": 4})
+    rate_limits.reset("test_service")
+
+    def throttled():
+        raise TooManyRequests("slow down")
+
+    assert rate_limits.call("test_service", lambda x: x * 2, 21) == 42
+    with pytest.raises(TooManyRequests):
+        rate_limits.call("test_service", throttled)
+    stats = rate_limits.stats()["test_service"]
+    assert (stats["calls"], stats["throttled"], stats["concurrency"]) == (2, 1, 2.0)
+
+    rate_limits.reset("test_service")
+    assert "test_service" not in rate_limits.stats()
+
+def test_unknown_services_are_not_limited():
+    assert rate_limits.call("espeak_tts", lambda: "ok") == "ok"
+    assert "espeak_tts" not in rate_limits.stats()
+
+@pytest.mark.parametrize("error, expected", [
+    (TooManyRequests(), True),
+    (RuntimeError("HTTP 429 Too Many Requests"), True),
+    (RuntimeError("RESOURCE_EXHAUSTED: quota"), True),
+    (RuntimeError("connection reset"), False),
+])
+def test_is_throttle_error(error, expected):
+    assert rate_limits.is_throttle_error(error) is expected
@@ -0,0 +1,46 @@
+import pytest
+
+import title_index
+
+THRESHOLD = 0.75  # Redditcontentlocal.NEAR_DUPLICATE_THRESHOLD (importing the engine needs its dependencies)
+
+def similarity(a, b):
+    return title_index.jaccard(title_index.shingles(a), title_index.shingles(b))
+
+@pytest.mark.parametrize("used, candidate", [
+    ("What's the best movie you've ever seen?", "What's the worst movie you've ever seen?"),
+    ("What's the most useful talent you have?", "What's the most useless talent you have?"),
+    ("What is your most useful talent?", "What is your most useless talent?"),
+    ("What's the most overrated food?", "What's the most underrated food?"),
+])
+def test_one_changed_word_is_a_different_thread(used, candidate):
+    assert similarity(used, candidate) < THRESHOLD
+    index = title_index.TitleIndex(path="unused.json")
+    index.add(used)
+    assert index.query(candidate, THRESHOLD) is None
+
+@pytest.mark.parametrize("used, candidate", [
+    ("What's the most useless talent you have?", "What is the most useless talent that you have?"),
+    ("What's the best movie you've ever seen?", "What is the best movie you have ever seen?"),
+    ("What's something you'll never do again?", "What is something you will never do again?"),
+    ("What's the best movie you've ever seen?", "Reddit, what's the best movie you've ever seen?"),
+])
+def test_reworded_repost_matches(used, candidate):
+    assert similarity(used, candidate) >= THRESHOLD
+    index = title_index.TitleIndex(path="unused.json")
+    index.add(used)
+    assert index.query(candidate, THRESHOLD) == (used, pytest.approx(similarity(used, candidate)))
+
+def test_index_syncs_and_persists(tmp_path):
+    history = tmp_path / "used_threads.txt"
+    history.write_text("What's the best movie you've ever seen?\n", encoding="utf-8")
+    index_path = str(tmp_path / "title_index.json")
+    index = title_index.open_index([str(history)], path=index_path)
+    assert len(index) == 1
+
+    with open(history, "a", encoding="utf-8") as f:
+        f.write("What's the most useless talent you have?\n")
+    index = title_index.open_index([str(history)], path=index_path)
+    assert len(index) == 2
+    assert title_index.TitleIndex.load(index_path).query("What is the most useless talent that you have?",
+                                                         THRESHOLD) is not None
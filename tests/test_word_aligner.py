@@ -0,0 +1,52 @@
+import pytest
+
+import word_aligner
+
+def heard(*words):
+    """Recognizer output: one word per 0.5 s slot, 0.4 s long."""
+    return [{"word": w, "start": i * 0.5, "end": i * 0.5 + 0.4} for i, w in enumerate(words)]
+
+def times(timed):
+    return [(round(w["start"], 3), round(w["end"], 3)) for w in timed]
+
+def test_exact_match_keeps_the_recognizer_timings():
+    script = ["Don't", "stop", "believing"]
+    timed, confidence = word_aligner.align_words(script, heard("dont", "stop", "believing"))
+    assert [w["word"] for w in timed] == script
+    assert times(timed) == [(0.0, 0.4), (0.5, 0.9), (1.0, 1.4)]
+    assert all(w["matched"] for w in timed)
+    assert confidence == 1.0
+
+def test_dropped_word_is_interpolated_between_its_neighbours():
+    script = ["the", "quick", "brown", "fox"]
+    timed, confidence = word_aligner.align_words(script, heard("the", "brown", "fox"))
+    assert times(timed)[0] == (0.0, 0.4)
+    # "quick" fills the gap between "the" and "brown"; the words after it keep their own timing
+    assert times(timed)[1] == (0.4, 0.5)
+    assert not timed[1]["matched"]
+    assert times(timed)[2:] == [(0.5, 0.9), (1.0, 1.4)]
+    assert confidence == pytest.approx(0.75)
+
+def test_extra_heard_word_is_ignored():
+    script = ["the", "brown", "fox"]
+    timed, confidence = word_aligner.align_words(script, heard("the", "uh", "brown", "fox"))
+    # Without the alignment, "brown" and "fox" would shift onto "uh" and "brown"
+    assert times(timed) == [(0.0, 0.4), (1.0, 1.4), (1.5, 1.9)]
+    assert confidence == 1.0
+
+def test_substitution_borrows_the_misheard_word_timing():
+    script = ["I", "saw", "a", "cat", "today"]
+    timed, confidence = word_aligner.align_words(script, heard("I", "saw", "a", "hat", "today"))
+    assert times(timed)[3] == (1.5, 1.9)
+    assert timed[3]["word"] == "cat" and not timed[3]["matched"]
+    assert times(timed)[4] == (2.0, 2.4)
+    assert confidence == pytest.approx(0.8)
+
+def test_chunks_are_aligned_within_their_windows():
+    script = ["one", "two", "three", "four"]
+    words = heard("one", "two", "four")  # "three" was never heard
+    timed, confidence = word_aligner.align_chunks(script, words, [(0.0, 1.0, 2), (1.0, 2.0, 2)])
+    assert times(timed)[:2] == [(0.0, 0.4), (0.5, 0.9)]
+    # "three" is interpolated inside the second chunk, before "four"
+    assert 1.0 <= timed[2]["start"] <= timed[2]["end"] <= timed[3]["start"]
+    assert confidence == pytest.approx(0.75)
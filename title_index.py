@@ -0,0 +1,206 @@
+# ---------------------------------------------------------------
+# Near-Duplicate Title Index 🧬
+# ---------------------------------------------------------------
+# used_threads.txt matches titles exactly, so the same AskReddit
+# question reposted with slightly different wording slips through.
+# Comparing every candidate against every used title gets slow as the
+# history grows, so titles go into a MinHash/LSH index instead:
+#
+#   - each title becomes a set of word shingles (its words and word
+#     pairs, with contractions spelled out so "What's" == "What is"),
+#   - MinHash turns that set into NUM_PERM numbers that agree with
+#     another title's numbers about as often as their shingle sets
+#     overlap (Jaccard similarity),
+#   - the numbers are cut into BANDS bands; titles sharing any band
+#     land in the same bucket, so a lookup only compares the handful of
+#     titles in its buckets, and confirms them with the exact Jaccard.
+#
+# The index is saved to TITLE_INDEX_FILE and kept in sync with the
+# used-thread files incrementally: only lines appended since the last
+# sync are read (a file that shrank is re-read from the start).
+#
+# Words rather than characters, so that changing the one word that
+# matters ("best" -> "worst", "useful" -> "useless") costs a word and
+# two pairs: in titles up to ~10 words that's enough to fall below 0.75.
+#
+#   index = title_index.open_index(["used_threads.txt"])
+#   match = index.query("What is the most useless talent that you have?", 0.75)
+#   # -> ("What's the most useless talent you have?", 0.78) or None
+# ---------------------------------------------------------------
+
+import json
+import os
+import random
+import re
+import unicodedata
+import zlib
+
+TITLE_INDEX_FILE = "title_index.json"
+INDEX_VERSION = 2
+SHINGLE_WORDS = 2  # Words and word pairs
+NUM_PERM = 60
+# 20 bands x 3 rows: titles 65% similar share a bucket >99% of the time,
+# unrelated ones (~10%) almost never
+BANDS = 20
+_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+
+def _permutations(num_perm, seed=1):
+    rng = random.Random(seed)
+    return [(rng.randrange(1, _PRIME), rng.randrange(0, _PRIME)) for _ in range(num_perm)]
+
+_PERMUTATIONS = _permutations(NUM_PERM)
+
+# English contractions spelled out, so rewordings like "What's" / "What is"
+# don't count as changed words
+_CONTRACTIONS = [
+    (r"\b(what|that|it|there|here|who|where|how|he|she)'s\b", r"\1 is"),
+    (r"\bcan't\b", "can not"),
+    (r"\bwon't\b", "will not"),
+    (r"(\w)n't\b", r"\1 not"),
+    (r"(\w)'ve\b", r"\1 have"),
+    (r"(\w)'ll\b", r"\1 will"),
+    (r"(\w)'re\b", r"\1 are"),
+    (r"(\w)'d\b", r"\1 would"),
+    (r"\bi'm\b", "i am"),
+]
+
+def normalize(title):
+    """Lowercase, contractions spelled out, accents and punctuation stripped, whitespace collapsed."""
+    text = unicodedata.normalize("NFKD", title.lower())
+    text = "".join(ch for ch in text if not unicodedata.combining(ch))
+    text = re.sub(r"[’`]", "'", text)
+    for pattern, replacement in _CONTRACTIONS:
+        text = re.sub(pattern, replacement, text)
+    text = text.replace("'", "")
+    return " ".join(re.sub(r"[^\w]+", " ", text).split())
+
+def shingles(title, n=SHINGLE_WORDS):
+    """Every run of 1..n consecutive words."""
+    words = normalize(title).split()
+    return {" ".join(words[i:i + k]) for k in range(1, n + 1) for i in range(len(words) - k + 1)}
+
+def jaccard(a, b):
+    return len(a & b) / len(a | b) if a or b else 0.0
+
+def signature(shingle_set):
+    """MinHash signature: for each permutation, the smallest hash over the shingles."""
+    hashes = [zlib.crc32(s.encode("utf-8")) for s in shingle_set] or [0]
+    return [min((a * h + b) % _PRIME for h in hashes) & _MAX_HASH for a, b in _PERMUTATIONS]
+
+def _band_keys(sig):
+    rows = NUM_PERM // BANDS
+    return [(band, tuple(sig[band * rows:(band + 1) * rows])) for band in range(BANDS)]
+
+class TitleIndex:
+    """MinHash signatures of used titles, with LSH buckets for fast lookups."""
+
+    def __init__(self, path=None):
+        self.path = path or TITLE_INDEX_FILE
+        self.titles = []
+        self.signatures = []
+        self.sources = {}  # history file -> bytes already indexed
+        self._known = set()
+        self._buckets = {}
+        self.dirty = False
+
+    def _index(self, position):
+        for key in _band_keys(self.signatures[position]):
+            self._buckets.setdefault(key, []).append(position)
+
+    def add(self, title):
+        """Index a title (no-op for one already in). Returns True if it was new."""
+        title = title.strip()
+        if not title or title in self._known:
+            return False
+        self._known.add(title)
+        self.titles.append(title)
+        self.signatures.append(signature(shingles(title)))
+        self._index(len(self.titles) - 1)
+        self.dirty = True
+        return True
+
+    def query(self, title, threshold):
+        """
+        The most similar indexed title with Jaccard similarity >= threshold,
+        as (title, similarity), or None.
+        """
+        title = title.strip()
+        if title in self._known:
+            return title, 1.0
+        query_shingles = shingles(title)
+        candidates = set()
+        for key in _band_keys(signature(query_shingles)):
+            candidates.update(self._buckets.get(key, ()))
+        best = None
+        for position in candidates:
+            similarity = jaccard(query_shingles, shingles(self.titles[position]))
+            if similarity >= threshold and (best is None or similarity > best[1]):
+                best = (self.titles[position], similarity)
+        return best
+
+    def sync(self, paths):
+        """Index the lines appended to the history files since the last sync. Returns how many were new."""
+        added = 0
+        for path in dict.fromkeys(paths):
+            if not os.path.exists(path):
+                continue
+            offset = self.sources.get(path, 0)
+            if os.path.getsize(path) < offset:
+                offset = 0  # Rewritten/truncated: read it again (known titles are skipped)
+            with open(path, "rb") as f:
+                f.seek(offset)
+                data = f.read()
+            # Leave a half-written last line for next time
+            complete = data[:data.rfind(b"\n") + 1]
+            for line in complete.decode("utf-8", errors="replace").splitlines():
+                added += self.add(line)
+            if offset + len(complete) != self.sources.get(path):
+                self.sources[path] = offset + len(complete)
+                self.dirty = True
+        return added
+
+    def save(self):
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({
+                "version": INDEX_VERSION,
+                "shingle_words": SHINGLE_WORDS,
+                "num_perm": NUM_PERM,
+                "sources": self.sources,
+                "titles": self.titles,
+                "signatures": self.signatures,
+            }, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+        self.dirty = False
+
+    @classmethod
+    def load(cls, path=None):
+        """The saved index, or an empty one if it's missing, unreadable or built with other settings."""
+        index = cls(path)
+        try:
+            with open(index.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return index
+        settings = (data.get("version"), data.get("shingle_words"), data.get("num_perm"))
+        if settings != (INDEX_VERSION, SHINGLE_WORDS, NUM_PERM):
+            print("Title index was built with other settings; rebuilding it.")
+            return index
+        index.titles, index.signatures = data["titles"], data["signatures"]
+        index.sources = data.get("sources", {})
+        index._known = set(index.titles)
+        for position in range(len(index.titles)):
+            index._index(position)
+        return index
+
+    def __len__(self):
+        return len(self.titles)
+
+def open_index(history_paths, path=None):
+    """Load the index, catch up with the history files and save it if anything changed."""
+    index = TitleIndex.load(path)
+    index.sync(history_paths)
+    if index.dirty:
+        index.save()
+    return index
@@ -0,0 +1,227 @@
+# ---------------------------------------------------------------
+# TTS Backends 🗣️
+# ---------------------------------------------------------------
+# Every backend is a function (text, filename, profile) that writes an
+# MP3 to `filename` or raises. Language profiles pick one by name with
+# "tts_backend":
+#
+#   "google" - Google Cloud WaveNet (needs credentials + network)
+#   "espeak" - espeak-ng on the local CPU: instant, free, robotic, and
+#              deterministic, so it's a handy stand-in for testing
+#   "piper"  - Piper neural voices on the local CPU ("piper_model")
+#
+# Add your own by writing a function and registering it in TTS_BACKENDS.
+#
+# Long texts (OP messages!) are split at sentence boundaries into chunks
+# under a byte budget, synthesized in parallel and stitched back
+# together; see synthesize_chunked().
+# ---------------------------------------------------------------
+
+import os
+import re
+import shutil
+import subprocess
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import lazy_imports
+
+# espeak-ng's default speed in words per minute (speaking_rate 1.0)
+ESPEAK_BASE_WPM = 175
+LOCAL_TTS_TIMEOUT = 120  # seconds
+
+# Chunked synthesis: Google rejects inputs over 5000 bytes, and shorter
+# requests come back faster, so long texts are split well below that.
+TTS_CHUNK_BYTES = 1000
+TTS_CHUNK_WORKERS = 4
+# Chunks are trimmed to their speech and joined with this natural pause
+CHUNK_PAUSE_MS = 150
+CHUNK_EDGE_PADDING_MS = 30
+
+SENTENCE_BOUNDARY = re.compile(r"(?<=[.!?…])\s+")
+
+_google_client = None
+_google_client_lock = threading.Lock()  # Chunks are synthesized from several threads
+
+# ---------------------------------------------------------------
+# Google Cloud TTS
+# ---------------------------------------------------------------
+def google_tts(text, filename, profile):
+    """Google Cloud TTS with the profile's WaveNet voice (natural and clear!)."""
+    global _google_client
+    try:
+        texttospeech = lazy_imports.load("google.cloud.texttospeech")  # Only this backend needs it
+    except ImportError:
+        raise RuntimeError("google-cloud-texttospeech is not installed")
+    if _google_client is None:
+        with _google_client_lock:
+            if _google_client is None:  # Another chunk's thread may have made it meanwhile
+                _google_client = texttospeech.TextToSpeechClient()
+
+    synthesis_input = texttospeech.SynthesisInput(text=text)
+    voice = texttospeech.VoiceSelectionParams(
+        language_code=profile["tts_language_code"],
+        name=profile["tts_voice_name"]
+    )
+    audio_config = texttospeech.AudioConfig(
+        audio_encoding=texttospeech.AudioEncoding.MP3,
+        speaking_rate=profile["tts_speaking_rate"]
+    )
+    response = _google_client.synthesize_speech(
+        input=synthesis_input,
+        voice=voice,
+        audio_config=audio_config
+    )
+    with open(filename, "wb") as out:
+        out.write(response.audio_content)
+
+# ---------------------------------------------------------------
+# Local engines (command-line, no network)
+# ---------------------------------------------------------------
+def _find_command(*names):
+    for name in names:
+        path = shutil.which(name)
+        if path:
+            return path
+    raise RuntimeError(f"None of {', '.join(names)} found on PATH")
+
+def _run_to_mp3(cmd, text, filename):
+    """Run a local TTS command (ending in its output-file flag) reading text from stdin, then convert to MP3."""
+    wav_path = filename + ".wav"
+    try:
+        result = subprocess.run(
+            cmd + [wav_path],
+            input=text.encode("utf-8"),
+            capture_output=True,
+            timeout=LOCAL_TTS_TIMEOUT
+        )
+        if result.returncode != 0 or not os.path.exists(wav_path):
+            raise RuntimeError(f"{os.path.basename(cmd[0])} failed: {result.stderr.decode('utf-8', 'replace').strip()}")
+        lazy_imports.load("pydub").AudioSegment.from_wav(wav_path).export(filename, format="mp3")
+    finally:
+        if os.path.exists(wav_path):
+            os.remove(wav_path)
+
+def espeak_tts(text, filename, profile):
+    """espeak-ng (or espeak) with the profile's espeak_voice, e.g. "en-us" or "pl"."""
+    command = _find_command("espeak-ng", "espeak")
+    wpm = int(round(ESPEAK_BASE_WPM * profile["tts_speaking_rate"]))
+    _run_to_mp3([command, "-v", profile["espeak_voice"], "-s", str(wpm), "--stdin", "-w"], text, filename)
+
+def piper_tts(text, filename, profile):
+    """Piper with the profile's piper_model (.onnx voice file)."""
+    command = _find_command("piper")
+    model = profile.get("piper_model")
+    if not model or not os.path.exists(model):
+        raise RuntimeError(f"Piper voice model '{model}' not found; set piper_model in the profile")
+    length_scale = 1.0 / profile["tts_speaking_rate"]
+    _run_to_mp3(
+        [command, "--model", model, "--length_scale", f"{length_scale:.3f}", "--output_file"],
+        text, filename
+    )
+
+TTS_BACKENDS = {
+    "google": google_tts,
+    "espeak": espeak_tts,
+    "piper": piper_tts,
+}
+
+def get_backend(profile):
+    name = profile.get("tts_backend", "google")
+    if name not in TTS_BACKENDS:
+        raise ValueError(f"Unknown TTS backend '{name}'. Choose from: {', '.join(TTS_BACKENDS)}")
+    return TTS_BACKENDS[name]
+
+def voice_id(profile):
+    """Which voice a profile actually speaks with (keys the duration calibration)."""
+    name = profile.get("tts_backend", "google")
+    if name == "espeak":
+        return f"espeak:{profile['espeak_voice']}"
+    if name == "piper":
+        return f"piper:{os.path.basename(profile.get('piper_model') or '')}"
+    return profile["tts_voice_name"]
+
+# ---------------------------------------------------------------
+# Chunked synthesis
+# ---------------------------------------------------------------
+def split_sentences(text):
+    return [sentence for sentence in SENTENCE_BOUNDARY.split(text.strip()) if sentence]
+
+def _split_words(sentence, max_bytes):
+    """Fallback for a single sentence over the budget: split between words."""
+    pieces, current = [], ""
+    for word in sentence.split():
+        candidate = f"{current} {word}" if current else word
+        if current and len(candidate.encode("utf-8")) > max_bytes:
+            pieces.append(current)
+            current = word
+        else:
+            current = candidate
+    if current:
+        pieces.append(current)
+    return pieces
+
+def chunk_text(text, max_bytes=TTS_CHUNK_BYTES):
+    """Pack whole sentences into chunks of at most `max_bytes` UTF-8 bytes."""
+    chunks, current = [], ""
+    for sentence in split_sentences(text):
+        pieces = [sentence] if len(sentence.encode("utf-8")) <= max_bytes else _split_words(sentence, max_bytes)
+        for piece in pieces:
+            candidate = f"{current} {piece}" if current else piece
+            if current and len(candidate.encode("utf-8")) > max_bytes:
+                chunks.append(current)
+                current = piece
+            else:
+                current = candidate
+    if current:
+        chunks.append(current)
+    return chunks or [text]
+
+def _trim_to_speech(segment):
+    """Cut a chunk's leading/trailing silence (and MP3 encoder padding)."""
+    ranges = lazy_imports.load("pydub.silence").detect_nonsilent(segment, min_silence_len=100, silence_thresh=-40)
+    if not ranges:
+        return segment
+    start = max(0, ranges[0][0] - CHUNK_EDGE_PADDING_MS)
+    end = min(len(segment), ranges[-1][1] + CHUNK_EDGE_PADDING_MS)
+    return segment[start:end]
+
+def synthesize_chunked(text, filename, profile, synthesize, call=None,
+                       max_bytes=TTS_CHUNK_BYTES, workers=TTS_CHUNK_WORKERS):
+    """
+    Synthesize `text` into one MP3 at `filename`, in sentence chunks
+    synthesized in parallel when it's long. `call(fn, *args)` wraps each
+    backend call (e.g. with retries).
+    Returns the chunks as [{"text", "start", "end"}] in seconds of the
+    stitched audio, so captions can be aligned chunk by chunk.
+    """
+    AudioSegment = lazy_imports.load("pydub").AudioSegment
+    call = call or (lambda fn, *args: fn(*args))
+    chunks = chunk_text(text, max_bytes)
+    if len(chunks) == 1:
+        call(synthesize, chunks[0], filename, profile)
+        return [{"text": chunks[0], "start": 0.0, "end": len(AudioSegment.from_file(filename)) / 1000.0}]
+
+    base, _ = os.path.splitext(filename)
+    chunk_paths = [f"{base}.part{i}.mp3" for i in range(len(chunks))]
+    try:
+        with ThreadPoolExecutor(max_workers=min(workers, len(chunks))) as pool:
+            futures = [pool.submit(call, synthesize, chunk, path, profile) for chunk, path in zip(chunks, chunk_paths)]
+            for future in futures:
+                future.result()
+
+        stitched = AudioSegment.empty()
+        offsets = []
+        for i, (chunk, path) in enumerate(zip(chunks, chunk_paths)):
+            segment = _trim_to_speech(AudioSegment.from_file(path))
+            if i:
+                stitched += AudioSegment.silent(duration=CHUNK_PAUSE_MS, frame_rate=segment.frame_rate)
+            start = len(stitched) / 1000.0
+            stitched += segment
+            offsets.append({"text": chunk, "start": start, "end": len(stitched) / 1000.0})
+        stitched.export(filename, format="mp3")
+        return offsets
+    finally:
+        for path in chunk_paths:
+            if os.path.exists(path):
+                os.remove(path)
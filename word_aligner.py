@@ -0,0 +1,159 @@
+# ---------------------------------------------------------------
+# Word Aligner 🧷
+# ---------------------------------------------------------------
+# Maps the words Whisper heard onto the script we actually sent to TTS.
+#
+# We already know the exact text, so the recognizer is only needed for
+# *timing*. Instead of pairing words up by position (one missed or
+# extra word shifts every caption after it), the two sequences are
+# aligned with edit distance: exact matches anchor the timings, 1:1
+# substitutions borrow the misheard word's timing, and script words the
+# recognizer dropped are interpolated between their neighbours.
+#
+# The alignment confidence (share of script words heard, exactly or
+# nearly) tells us how much to trust the timings, and lets us compare
+# model sizes.
+# ---------------------------------------------------------------
+
+import difflib
+import unicodedata
+
+# Substitutions whose spelling is at least this similar count as a
+# (fuzzy) match for confidence, e.g. "colour"/"color", "dont"/"don't"
+FUZZY_MATCH_RATIO = 0.8
+
+def normalize_word(word):
+    """Lowercase and drop punctuation, so "Don't," compares equal to "dont"."""
+    word = unicodedata.normalize("NFKC", word or "").lower()
+    return "".join(ch for ch in word if ch.isalnum())
+
+def _similarity(a, b):
+    if a == b:
+        return 1.0
+    if not a or not b:
+        return 0.0
+    return difflib.SequenceMatcher(None, a, b).ratio()
+
+def _edit_alignment(script, heard):
+    """
+    Levenshtein alignment of two normalized word lists. Substituting costs
+    1 - similarity, so near-misses are preferred over insert + delete.
+    Returns a list of (script_idx or None, heard_idx or None) pairs.
+    """
+    n, m = len(script), len(heard)
+    cost = [[0.0] * (m + 1) for _ in range(n + 1)]
+    for i in range(1, n + 1):
+        cost[i][0] = float(i)
+    for j in range(1, m + 1):
+        cost[0][j] = float(j)
+    similarity = {}
+    for i in range(1, n + 1):
+        for j in range(1, m + 1):
+            sim = _similarity(script[i - 1], heard[j - 1])
+            similarity[i, j] = sim
+            cost[i][j] = min(
+                cost[i - 1][j - 1] + (1.0 - sim),
+                cost[i - 1][j] + 1.0,   # script word not heard
+                cost[i][j - 1] + 1.0,   # extra word heard
+            )
+
+    pairs = []
+    i, j = n, m
+    while i > 0 or j > 0:
+        if i > 0 and j > 0 and cost[i][j] == cost[i - 1][j - 1] + (1.0 - similarity[i, j]):
+            pairs.append((i - 1, j - 1))
+            i, j = i - 1, j - 1
+        elif i > 0 and cost[i][j] == cost[i - 1][j] + 1.0:
+            pairs.append((i - 1, None))
+            i -= 1
+        else:
+            pairs.append((None, j - 1))
+            j -= 1
+    pairs.reverse()
+    return pairs
+
+def _interpolate(timed, script_words, start_bound, end_bound):
+    """Fill in start/end for unmatched words, spreading gaps by word length."""
+    i = 0
+    while i < len(timed):
+        if timed[i]["start"] is not None:
+            i += 1
+            continue
+        j = i
+        while j < len(timed) and timed[j]["start"] is None:
+            j += 1
+        gap_start = timed[i - 1]["end"] if i > 0 else start_bound
+        gap_end = timed[j]["start"] if j < len(timed) else end_bound
+        gap_end = max(gap_start, gap_end)
+        weights = [max(1, len(script_words[k])) for k in range(i, j)]
+        total = float(sum(weights))
+        t = gap_start
+        for k, weight in zip(range(i, j), weights):
+            span = (gap_end - gap_start) * weight / total
+            timed[k]["start"], timed[k]["end"] = t, t + span
+            t += span
+        i = j
+    return timed
+
+def align_words(script_words, word_timings, duration=None):
+    """
+    Time every script word from the recognizer's `word_timings`
+    ({"word", "start", "end"} dicts, as get_word_timestamps returns).
+    Returns (timed, confidence): one {"word", "start", "end", "matched"}
+    dict per script word, and the share of script words heard
+    (exactly or nearly) in [0, 1].
+    """
+    if not script_words:
+        return [], 1.0
+    if not word_timings:
+        return [], 0.0
+
+    script = [normalize_word(w) for w in script_words]
+    heard = [normalize_word(w["word"]) for w in word_timings]
+    timed = [{"word": w, "start": None, "end": None, "matched": False} for w in script_words]
+
+    matched = 0.0
+    for s_idx, h_idx in _edit_alignment(script, heard):
+        if s_idx is None or h_idx is None:
+            continue
+        timed[s_idx]["start"] = word_timings[h_idx]["start"]
+        timed[s_idx]["end"] = word_timings[h_idx]["end"]
+        sim = _similarity(script[s_idx], heard[h_idx])
+        if sim >= FUZZY_MATCH_RATIO:
+            timed[s_idx]["matched"] = True
+            matched += 1.0 if sim == 1.0 else sim
+
+    start_bound = word_timings[0]["start"]
+    end_bound = word_timings[-1]["end"] if duration is None else max(duration, word_timings[-1]["end"])
+    _interpolate(timed, script, start_bound, end_bound)
+
+    # Recognizer timestamps can overlap slightly; keep captions in order
+    for prev, cur in zip(timed, timed[1:]):
+        if cur["start"] < prev["start"]:
+            cur["start"] = prev["start"]
+        cur["end"] = max(cur["end"], cur["start"])
+
+    return timed, matched / len(script_words)
+
+def align_chunks(script_words, word_timings, windows):
+    """
+    Like align_words, but per TTS chunk: `windows` are (start, end, n_words)
+    in order, and each chunk's script words are only matched against the
+    words heard inside its window. Confidence is word-weighted overall.
+    """
+    timed, matched, first = [], 0.0, 0
+    for start, end, n_words in windows:
+        chunk_words = script_words[first:first + n_words]
+        first += n_words
+        heard = [w for w in word_timings if start <= (w["start"] + w["end"]) / 2 < end]
+        if heard:
+            chunk_timed, confidence = align_words(chunk_words, heard, duration=end)
+        else:
+            chunk_timed, confidence = [], 0.0
+        if not chunk_timed:
+            # Nothing heard here: spread the chunk's words over its window
+            chunk_timed = [{"word": w, "start": None, "end": None, "matched": False} for w in chunk_words]
+            _interpolate(chunk_timed, [normalize_word(w) for w in chunk_words], start, end)
+        timed.extend(chunk_timed)
+        matched += confidence * len(chunk_words)
+    return timed, (matched / len(script_words) if script_words else 1.0)